@@ -0,0 +1,118 @@
+"""
+Kullanıcı profilinde kalıcı client önbelleği (snapshot'lar, lookup tabloları, kurallar).
+
+Açılışta pencere bu dosyalardan kurulur; sunucudaki sürümlerle karşılaştırma ve değişenlerin indirilmesi
+arka planda yapılır (bkz. storage.revalidate_disk_cache). Her kayıt, indirildiği andaki sunucu sürümüyle
+birlikte saklanır.
+
+  UZMANRAPOR_DISK_CACHE=0          kapalı (her şey eskisi gibi ağdan)
+  UZMANRAPOR_DISK_CACHE_DIR        kök klasör (varsayılan %LOCALAPPDATA%\\UzmanRapor\\cache,
+                                   Windows dışında ~/.cache/uzmanrapor)
+
+Her API adresi ayrı alt klasör kullanır (test ve canlı sunucu karışmasın). Dosyalar pickle'dır; sadece bu
+kullanıcının yazdığı dosyalar okunur. Okunamayan/bozuk dosya yok sayılır.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Any
+
+from app.sql_api_client import get_sql_connection
+
+# dosya içeriğinin biçimi; değişirse eski dosyalar okunmaz
+FORMAT = 1
+
+
+def _env(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value.strip() if value else default
+
+
+ENABLED = _env("UZMANRAPOR_DISK_CACHE", "1").lower() not in {"0", "false", "no"}
+
+_dir: str | None = None
+
+
+def cache_dir() -> str:
+    global _dir
+    if _dir is None:
+        root = _env("UZMANRAPOR_DISK_CACHE_DIR", "")
+        if not root:
+            base = os.getenv("LOCALAPPDATA")
+            root = (
+                os.path.join(base, "UzmanRapor", "cache")
+                if base
+                else os.path.join(os.path.expanduser("~"), ".cache", "uzmanrapor")
+            )
+        server = hashlib.sha1(get_sql_connection().base_url.encode("utf-8")).hexdigest()[:12]
+        _dir = os.path.join(root, server)
+    return _dir
+
+
+def _path(name: str) -> str:
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+    return os.path.join(cache_dir(), f"{safe}.pkl")
+
+
+def read(name: str) -> tuple[str | None, float, Any] | None:
+    """(sunucu sürümü, kayıt zamanı [epoch sn], değer) veya None."""
+    if not ENABLED:
+        return None
+    try:
+        with open(_path(name), "rb") as f:
+            entry = pickle.load(f)
+        if not isinstance(entry, dict) or entry.get("format") != FORMAT or entry.get("name") != name:
+            return None
+        return entry.get("version"), float(entry.get("saved_at") or 0), entry.get("value")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[DISK CACHE] {name}: okunamadı -> {e!r}")
+        return None
+
+
+def write(name: str, version: str | None, value: Any) -> None:
+    """Atomik yazım: geçici dosya + os.replace (yarım dosya okunmaz)."""
+    if not ENABLED:
+        return
+    try:
+        path = _path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"format": FORMAT, "name": name, "version": version, "saved_at": time.time(), "value": value}
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+    except Exception as e:
+        print(f"[DISK CACHE] {name}: yazılamadı -> {e!r}")
+
+
+def remove(name: str) -> None:
+    try:
+        os.remove(_path(name))
+    except OSError:
+        pass
+
+
+def clear() -> None:
+    """Bu sunucunun tüm kayıtlarını siler."""
+    try:
+        for fn in os.listdir(cache_dir()):
+            if fn.endswith(".pkl") or fn.startswith(".tmp-"):
+                try:
+                    os.remove(os.path.join(cache_dir(), fn))
+                except OSError:
+                    pass
+    except OSError:
+        pass
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import re
+import threading
 import pandas as pd
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo  # <-- Istanbul TZ
@@ -8,7 +9,7 @@ from PySide6.QtWidgets import (
     QLabel, QTabWidget, QMessageBox, QLineEdit, QScrollArea, QGridLayout,
     QTableView, QHeaderView, QToolButton, QSizePolicy, QTextEdit, QDialog
 )
-from PySide6.QtCore import Qt, QTimer, QSettings
+from PySide6.QtCore import Qt, QTimer, QSettings, QObject, Signal
 from typing import Any
 
 from app.itema_tab import ItemaAyarTab
@@ -290,6 +291,11 @@ class LoomListEditor(QDialog):
 # ============================================================
 
 
+class _DiskCacheSignal(QObject):
+    # arka plan doğrulamasında içeriği değişen disk kayıtları (ad -> değer)
+    done = Signal(object)
+
+
 class MainWindow(QMainWindow):
     def __init__(self, user: User | None = None):
         super().__init__()
@@ -306,9 +312,10 @@ class MainWindow(QMainWindow):
         self.df_dinamik_full = None
         self.df_running = None
 
-        # Kalıcı kurallar ve son güncelleme
-        self._note_rules: list[dict] = storage.load_rules()
-        self._last_update: datetime | None = storage.load_last_update()
+        # Kalıcı kurallar ve son güncelleme (disk önbelleğinden; sunucuyla doğrulama arka planda)
+        storage.seed_lookup_cache_from_disk()
+        self._note_rules: list[dict] = storage.load_rules_cached()
+        self._last_update: datetime | None = storage.load_last_update_cached()
 
         tabs = QTabWidget()
         tabs.addTab(self.build_dugum_tab(), "DÜĞÜM TAKIM LİSTESİ")
@@ -340,6 +347,11 @@ class MainWindow(QMainWindow):
         # Başlangıçta kullanıcının yetkisine göre butonları ayarla
         self._apply_permissions()
 
+        # Disk önbelleğini sunucuyla doğrula; değişen varsa ekran güncellenir
+        self._disk_signal = _DiskCacheSignal(self)
+        self._disk_signal.done.connect(self._on_disk_cache_revalidated)
+        QTimer.singleShot(0, self._start_disk_revalidate)
+
     # -------------------------
     # Yetki kontrol yardımcıları
     # -------------------------
@@ -1608,13 +1620,13 @@ class MainWindow(QMainWindow):
     def _restore_last_state(self):
         """Uygulama açıldığında snapshot'lardan DF'leri yükle, görünümü kur, filtreleri boş başlat."""
         try:
-            ddf = storage.load_df_snapshot("dinamik")
+            ddf = storage.load_df_snapshot_cached("dinamik")
             if ddf is not None and not ddf.empty:
                 self.df_dinamik_full = ddf
                 self._apply_notes_and_autonotes()
                 self._refresh_dugum_view(rebuild_filters=True)
 
-            rdf = storage.load_df_snapshot("running")
+            rdf = storage.load_df_snapshot_cached("running")
             if rdf is not None and not rdf.empty:
                 # *** TEK NOKTADAN DÜZELTME (snapshot için de uygula) ***
                 rdf = normalize_df_running(rdf)
@@ -1664,6 +1676,40 @@ class MainWindow(QMainWindow):
         if hasattr(self, "team_flow"):
             self.team_flow.refresh_sources()
 
+    def _start_disk_revalidate(self):
+        signal = self._disk_signal
+
+        def work():
+            try:
+                changed = storage.revalidate_disk_cache()
+            except Exception as e:
+                print("[DISK CACHE] doğrulama hatası:", e)
+                changed = {}
+            try:
+                signal.done.emit(changed)
+            except RuntimeError:
+                # pencere kapandı
+                pass
+
+        threading.Thread(target=work, name="disk-cache-revalidate", daemon=True).start()
+
+    def _on_disk_cache_revalidated(self, changed: dict):
+        if not changed:
+            return
+        if "last_update" in changed:
+            self._last_update = changed["last_update"]
+        if "rules" in changed and isinstance(changed["rules"], list):
+            self._note_rules = changed["rules"]
+
+        # bu oturumda butonla yüklenen/planlanan veri sunucudaki snapshot'tan yenidir; ezilmez
+        session_data = self._did_click_load_dinamik or self._did_click_load_running or self._did_planlama
+        if not session_data and ({"snapshot:dinamik", "snapshot:running", "rules"} & set(changed)):
+            self._restore_last_state()
+        else:
+            # lookup tabloları bellek önbelleğine yazıldı; onları kullanan ekranları tazele
+            self._refresh_kusbakisi()
+            self._refresh_status_label()
+
     # -------------------------
     # USTA DEFTERİ ENTEGRASYONU — Yardımcılar
     # -------------------------
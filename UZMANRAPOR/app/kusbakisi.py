@@ -171,11 +171,10 @@ def _yesterday_shift_windows(ref: datetime | None = None):
 def _compute_yesterday_totals() -> tuple[int, int, str]:
     """Dünün üç vardiyasını toplayıp (DÜĞÜM, TAKIM, tarih_str) döndürür."""
     wins = _yesterday_shift_windows()
-    total_dugum = 0
-    total_takim = 0
-    for (s,e) in wins:
-        total_dugum += storage.count_usta_between(s, e, what="DÜĞÜM", direction="ALINDI")
-        total_takim += storage.count_usta_between(s, e, what="TAKIM",  direction="ALINDI")
+    # tek sorgu: dün 07:00 -> bugün 07:00 penceresi, vardiya x iş tanımı kırılımı
+    counts = storage.count_usta_by_shift(wins[0][0], wins[-1][1])
+    total_dugum = sum(n for (_vardiya, what), n in counts.items() if what == "DÜĞÜM")
+    total_takim = sum(n for (_vardiya, what), n in counts.items() if what == "TAKIM")
     date_str = wins[0][0].strftime("%d.%m.%Y")
     return total_dugum, total_takim, date_str
 
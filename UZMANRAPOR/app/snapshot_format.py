@@ -0,0 +1,194 @@
+"""
+Snapshots.Data ikili biçimi (sürümlü).
+
+  b"URSNAP" + biçim baytı + gövde
+    1: Arrow IPC dosyası (Feather v2), kolon bazlı sıkıştırma (varsayılan zstd seviye 1). Şema metadata'sında pandas
+       dtype/index bilgisi ve "uzmanrapor" anahtarı altında {format, rows, columns, dtypes, pickled, created}.
+       Arrow'a çevrilemeyen karışık tipli object kolonlar hücre başına pickle'lanıp binary kolon olarak yazılır
+       ("pickled" listesi).
+    2: pickle + zlib (pyarrow kurulu değilse veya çerçeve Arrow'a hiç çevrilemiyorsa, ör. tekrarlı kolon adı)
+
+Eski kayıtlar (Snapshots.DataHex: pickle -> zlib -> hex metin) decode_legacy_hex ile okunur. Eski client'lar
+zlib(9) yazar; geçiş döneminde bu modül zlib(1) yazar (açan taraf için fark yok).
+
+  UZMANRAPOR_SNAPSHOT_CODEC   zstd (varsayılan) | lz4 | none
+  UZMANRAPOR_SNAPSHOT_LEVEL   codec seviyesi (boş = zstd için 1, lz4 için codec varsayılanı)
+
+Ölçüm: `python bench.py snapshot` (UZMANRAPOR_API). Dinamik çerçevesinde zstd(1) eski hex kaydın yarısı boyutunda,
+yazması ~100 kat hızlı; lz4 metin kolonlarında zayıf sıkıştırır.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import pickle
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import pandas as pd
+
+try:  # opsiyonel: kolon bazlı biçim
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow yoksa pickle biçimi yazılır
+    pa = None
+
+MAGIC = b"URSNAP"
+FORMAT_ARROW = 1
+FORMAT_PICKLE = 2
+
+_META_KEY = b"uzmanrapor"
+_PICKLE_ZLIB_LEVEL = 1
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def _env(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value.strip() if value else default
+
+
+CODEC = _env("UZMANRAPOR_SNAPSHOT_CODEC", "zstd").lower()
+LEVEL: Optional[int] = int(_env("UZMANRAPOR_SNAPSHOT_LEVEL", "0")) or None
+# zstd'nin kendi varsayılanı (3) burada daha yavaş, boyut aynı
+_DEFAULT_LEVELS = {"zstd": 1}
+
+
+# ============================================================
+#  YAZMA
+# ============================================================
+
+def _write_options(codec: str, level: Optional[int]) -> Any:
+    if codec in ("", "none", "uncompressed"):
+        return pa.ipc.IpcWriteOptions(compression=None)
+    # IPC'de lz4 = lz4_frame
+    level = level if level is not None else _DEFAULT_LEVELS.get(codec)
+    return pa.ipc.IpcWriteOptions(compression=pa.Codec(codec, compression_level=level))
+
+
+def _to_table(df: pd.DataFrame) -> tuple[Any, list[str]]:
+    """DataFrame -> Arrow tablosu; Arrow'un kabul etmediği object kolonlar hücre başına pickle'lanır."""
+    try:
+        return pa.Table.from_pandas(df), []
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        pass
+
+    pickled: list[str] = []
+    work = df.copy(deep=False)
+    for i, col in enumerate(df.columns):
+        if df.dtypes.iloc[i] != object:
+            continue
+        try:
+            pa.array(df.iloc[:, i], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            blobs = [pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL) for v in df.iloc[:, i]]
+            work.isetitem(i, pd.Series(blobs, index=df.index, dtype=object))
+            pickled.append(str(col))
+    # kalan hata (ör. tekrarlı kolon adı) çağırana çıkar
+    return pa.Table.from_pandas(work), pickled
+
+
+def _encode_arrow(df: pd.DataFrame, codec: str, level: Optional[int]) -> bytes:
+    table, pickled = _to_table(df)
+    meta = {
+        "format": FORMAT_ARROW,
+        "rows": len(df),
+        "columns": [str(c) for c in df.columns],
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "pickled": pickled,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    schema = table.schema.with_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(meta).encode()})
+    table = table.replace_schema_metadata(schema.metadata)
+
+    # IPC dosyası kendi ofsetlerini tutar; başlık sonradan eklenir
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema, options=_write_options(codec, level)) as writer:
+        writer.write_table(table)
+    return MAGIC + bytes([FORMAT_ARROW]) + sink.getvalue().to_pybytes()
+
+
+def _encode_pickle(df: pd.DataFrame) -> bytes:
+    raw = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    return MAGIC + bytes([FORMAT_PICKLE]) + zlib.compress(raw, level=_PICKLE_ZLIB_LEVEL)
+
+
+def encode(df: pd.DataFrame, codec: Optional[str] = None, level: Optional[int] = None) -> bytes:
+    """DataFrame -> Snapshots.Data. codec/level verilmezse UZMANRAPOR_SNAPSHOT_CODEC / _LEVEL."""
+    if pa is not None:
+        try:
+            return _encode_arrow(df, CODEC if codec is None else codec, LEVEL if level is None else level)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            print(f"[SNAPSHOT] Arrow biçimine çevrilemedi, pickle yazılıyor -> {e!r}")
+    return _encode_pickle(df)
+
+
+def encode_legacy_hex(df: pd.DataFrame) -> str:
+    """Eski DataHex biçimi (geçiş döneminde eski client'lar için). Eski okuyucu seviyeden bağımsız açar."""
+    buf = io.BytesIO()
+    df.to_pickle(buf)
+    return zlib.compress(buf.getvalue(), level=_PICKLE_ZLIB_LEVEL).hex()
+
+
+# ============================================================
+#  OKUMA
+# ============================================================
+
+def _decode_arrow(body: memoryview) -> pd.DataFrame:
+    if pa is None:
+        raise SnapshotFormatError("Arrow snapshot'ı için pyarrow gerekli")
+    table = pa.ipc.open_file(pa.py_buffer(body)).read_all()
+    meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+    if meta.get("rows", table.num_rows) != table.num_rows:
+        raise SnapshotFormatError(f"satır sayısı uyuşmuyor: {table.num_rows} != {meta.get('rows')}")
+    df = table.to_pandas()
+    pickled = set(meta.get("pickled") or [])
+    dtypes = meta.get("dtypes") or {}
+    for i, col in enumerate(df.columns):
+        if str(col) in pickled:
+            values = [None if b is None else pickle.loads(b) for b in df.iloc[:, i]]
+            df.isetitem(i, pd.Series(values, index=df.index, dtype=object))
+        elif dtypes.get(str(col)) == "object" and df.dtypes.iloc[i] != object:
+            # pandas'ın sürümüne göre metin kolonları string dtype ile döner; yazıldığı gibi object (None'lar dahil)
+            values = table.column(str(col)).to_pylist()
+            df.isetitem(i, pd.Series(values, index=df.index, dtype=object))
+    return df
+
+
+def decode(data: bytes) -> pd.DataFrame:
+    """Snapshots.Data -> DataFrame."""
+    view = memoryview(data)
+    if bytes(view[: len(MAGIC)]) != MAGIC or len(view) <= len(MAGIC):
+        raise SnapshotFormatError("snapshot başlığı tanınmadı")
+    fmt = view[len(MAGIC)]
+    body = view[len(MAGIC) + 1:]
+    if fmt == FORMAT_ARROW:
+        return _decode_arrow(body)
+    if fmt == FORMAT_PICKLE:
+        df = pickle.loads(zlib.decompress(body))
+        if not isinstance(df, pd.DataFrame):
+            raise SnapshotFormatError("pickle snapshot DataFrame değil")
+        return df
+    raise SnapshotFormatError(f"bilinmeyen snapshot biçimi: {fmt}")
+
+
+def decode_legacy_hex(data_hex: str) -> pd.DataFrame | None:
+    """Eski DataHex kaydı (pickle -> zlib -> hex)."""
+    df = pd.read_pickle(io.BytesIO(zlib.decompress(bytes.fromhex(data_hex))))
+    return df if isinstance(df, pd.DataFrame) else None
+
+
+def describe(data: bytes) -> dict[str, Any]:
+    """Başlık/metadata bilgisi (tanı ve bench için); gövde açılmaz."""
+    view = memoryview(data)
+    if bytes(view[: len(MAGIC)]) != MAGIC or len(view) <= len(MAGIC):
+        return {"format": None, "bytes": len(view)}
+    fmt = view[len(MAGIC)]
+    out: dict[str, Any] = {"format": fmt, "bytes": len(view)}
+    if fmt == FORMAT_ARROW and pa is not None:
+        reader = pa.ipc.open_file(pa.py_buffer(view[len(MAGIC) + 1:]))
+        out.update(json.loads((reader.schema.metadata or {}).get(_META_KEY, b"{}")))
+    return out
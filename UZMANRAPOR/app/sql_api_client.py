@@ -1,14 +1,42 @@
 from __future__ import annotations
 
+import base64
+import datetime as dt
+import getpass
+import http.client
+import io
 import json
+import logging
 import os
-import urllib.error
-import urllib.request
-from typing import Any, Iterable, Optional
+import re
+import select
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+try:  # opsiyonel: columnar (Arrow IPC) cevaplar
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow yoksa JSON kullanılır
+    pa = None
+
+logger = logging.getLogger("uzmanrapor.client")
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
 
 
 class SqlApiError(RuntimeError):
-    pass
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        # HTTP durum kodu (bağlantı/format hatalarında None)
+        self.status = status
 
 
 def _env(name: str, default: str) -> str:
@@ -16,6 +44,426 @@ def _env(name: str, default: str) -> str:
     return value.strip() if value else default
 
 
+def _json_param(value: Any) -> Any:
+    """json.dumps default: bytes parametre -> {"$binary": base64} (sunucu bytes'a çevirir, ör. varbinary kolon)."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$binary": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _clean_query(query: str) -> str:
+    q = (query or "").strip()
+    if q.endswith(";"):
+        q = q[:-1].rstrip()
+    return q
+
+
+_READ_QUERY = re.compile(r"^\s*select\b", re.IGNORECASE)
+
+
+def _is_read_query(query: str) -> bool:
+    """Tekrar gönderilmesi güvenli (yan etkisiz) sorgu mu."""
+    return bool(_READ_QUERY.match(query or ""))
+
+
+# ============================================================
+#  KABUL KONTROLÜ
+#  Sunucu eşzamanlı ağır sorguları sınırlar ve adilliği client kimliğine göre sağlar (tüm client'lar
+#  aynı token'ı kullanır). Meşgulse 429 + Retry-After döner; burada kısa bir süre bekleyip tekrar denenir.
+# ============================================================
+
+def _default_client_id() -> str:
+    try:
+        return f"{getpass.getuser()}@{socket.gethostname()}"
+    except Exception:
+        return socket.gethostname() or "uzmanrapor"
+
+
+CLIENT_ID = _env("UZMANRAPOR_CLIENT_ID", "") or _default_client_id()
+BUSY_RETRIES = int(_env("UZMANRAPOR_API_BUSY_RETRIES", "2"))
+# Retry-After bundan uzunsa bu kadar beklenir
+BUSY_MAX_WAIT = float(_env("UZMANRAPOR_API_BUSY_MAX_WAIT_SEC", "5"))
+
+
+def _retry_after(resp: http.client.HTTPResponse) -> float:
+    try:
+        wait = float(resp.getheader("Retry-After") or 1)
+    except ValueError:
+        wait = 1.0
+    return max(0.0, min(wait, BUSY_MAX_WAIT))
+
+
+# ============================================================
+#  HTTP KEEP-ALIVE HAVUZU
+#  urlopen her çağrıda yeni TCP bağlantısı açar. Havuz, base URL başına HTTP/1.1 bağlantılarını
+#  tüm get_sql_connection() kullanıcıları arasında paylaştırır (thread-safe, LIFO).
+# ============================================================
+
+HTTP_POOL_SIZE = int(_env("UZMANRAPOR_HTTP_POOL_SIZE", "8"))
+# Sunucunun keep-alive süresinden kısa tutulmalı (uvicorn: --timeout-keep-alive)
+HTTP_IDLE_SEC = float(_env("UZMANRAPOR_HTTP_IDLE_SEC", "50"))
+
+def _peer_closed(conn: http.client.HTTPConnection) -> bool:
+    """Boştaki bağlantıda okunacak bir şey varsa (EOF/RST) sunucu kapatmıştır; istek gönderilmeden anlaşılır."""
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+# Tekrar kullanılan bağlantı sunucu tarafından kapatılmışsa (bayat keep-alive) görülen hatalar
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class _HttpPool:
+    def __init__(self, base_url: str, size: int, idle_sec: float) -> None:
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.size = max(1, size)
+        self.idle_sec = idle_sec
+        self._idle: list[tuple[http.client.HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "created": 0, "reused": 0, "discarded": 0, "stale_retries": 0}
+
+    def _new(self, timeout: float) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def acquire(self, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        stale: list[http.client.HTTPConnection] = []
+        conn: Optional[http.client.HTTPConnection] = None
+        with self._lock:
+            self._stats["requests"] += 1
+            while self._idle:
+                c, since = self._idle.pop()
+                if now - since <= self.idle_sec and not _peer_closed(c):
+                    conn = c
+                    self._stats["reused"] += 1
+                    break
+                stale.append(c)
+                self._stats["discarded"] += 1
+            if conn is None:
+                self._stats["created"] += 1
+        for c in stale:
+            c.close()
+
+        if conn is None:
+            return self._new(timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+            self._stats["discarded"] += 1
+        conn.close()
+
+    def discard(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._stats["discarded"] += 1
+        conn.close()
+
+    def note_retry(self) -> None:
+        with self._lock:
+            self._stats["stale_retries"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["idle"] = len(self._idle)
+            out["size"] = self.size
+        return out
+
+
+_HTTP_POOLS: dict[str, _HttpPool] = {}
+_HTTP_POOLS_LOCK = threading.Lock()
+
+
+def _http_pool(base_url: str) -> _HttpPool:
+    key = base_url.lower()
+    with _HTTP_POOLS_LOCK:
+        pool = _HTTP_POOLS.get(key)
+        if pool is None:
+            pool = _HttpPool(base_url, HTTP_POOL_SIZE, HTTP_IDLE_SEC)
+            _HTTP_POOLS[key] = pool
+        return pool
+
+
+def http_pool_stats() -> dict[str, dict[str, Any]]:
+    """Base URL başına bağlantı tekrar kullanım metrikleri."""
+    with _HTTP_POOLS_LOCK:
+        pools = dict(_HTTP_POOLS)
+    return {url: pool.stats() for url, pool in pools.items()}
+
+
+# ============================================================
+#  CEVAP SIKIŞTIRMA
+#  Sunucu (GZipMiddleware) büyük cevapları gzip ile gönderir; burada şeffaf olarak açılır.
+#  Akışlı cevaplarda da parça parça açılır (read1), tüm gövde beklenmez.
+# ============================================================
+
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+class _DecodingReader(io.RawIOBase):
+    def __init__(self, resp: http.client.HTTPResponse, encoding: str) -> None:
+        self._resp = resp
+        # gzip: 16+MAX_WBITS, deflate: önce zlib sarmalı dene, olmazsa ham deflate
+        self._wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+        self._dec = zlib.decompressobj(self._wbits)
+        self._raw_deflate_tried = encoding == "gzip"
+        self._pending = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _decompress(self, chunk: bytes) -> bytes:
+        try:
+            return self._dec.decompress(chunk)
+        except zlib.error:
+            if self._raw_deflate_tried:
+                raise
+            self._raw_deflate_tried = True
+            self._dec = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._dec.decompress(chunk)
+
+    def readinto(self, b) -> int:
+        while not self._pending and not self._eof:
+            chunk = self._resp.read1(64 * 1024)
+            if not chunk:
+                # Content-Length'li cevapta read1 bağlantıyı kapatmaz; read() ile tamamla
+                self._resp.read()
+                self._eof = True
+                self._pending = self._dec.flush()
+                break
+            self._pending = self._decompress(chunk)
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _decoded(resp: http.client.HTTPResponse) -> Any:
+    """Content-Encoding'e göre açılmış okunabilir gövde (sıkıştırma yoksa resp'in kendisi)."""
+    encoding = (resp.headers.get("Content-Encoding") or "").strip().lower()
+    if encoding in {"gzip", "x-gzip", "deflate"}:
+        return io.BufferedReader(_DecodingReader(resp, "deflate" if encoding == "deflate" else "gzip"))
+    return resp
+
+
+# ============================================================
+#  KOŞULLU İSTEK (ETag)
+#  Sunucu SELECT cevaplarında ETag döner. Aynı sorgu tekrar geldiğinde If-None-Match gönderilir;
+#  tablolar değişmediyse sunucu DB'ye gitmeden 304 döner ve burada saklanan sonuç kullanılır.
+# ============================================================
+
+ETAG_CACHE_SIZE = int(_env("UZMANRAPOR_API_ETAG_CACHE", "128"))
+# büyük sonuçlar client belleğinde tutulmaz
+ETAG_MAX_ROWS = int(_env("UZMANRAPOR_API_ETAG_MAX_ROWS", "5000"))
+
+
+class _EtagCache:
+    def __init__(self, size: int) -> None:
+        self.size = max(0, size)
+        self._entries: OrderedDict[Any, tuple[str, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"conditional": 0, "not_modified": 0, "stores": 0}
+
+    def get(self, key: Any) -> Optional[tuple[str, dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["conditional"] += 1
+            return entry
+
+    def put(self, key: Any, etag: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (etag, data)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def note_not_modified(self) -> None:
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["entries"] = len(self._entries)
+        return out
+
+
+_ETAG_CACHE = _EtagCache(ETAG_CACHE_SIZE)
+
+
+def etag_cache_stats() -> dict[str, Any]:
+    """If-None-Match ile gönderilen / 304 alınan istek sayıları."""
+    return _ETAG_CACHE.stats()
+
+
+# ============================================================
+#  PROFİL (Server-Timing)
+#  Sunucu her cevapta aşama sürelerini (validate, borrow, execute, fetch, encode, serialize, total)
+#  Server-Timing başlığıyla döner. Burada istek başına duvar saati ile birlikte saklanır;
+#  network = duvar - sunucu toplamı (aktarım + kuyruk + client tarafı açma).
+# ============================================================
+
+PROFILE_SIZE = int(_env("UZMANRAPOR_API_PROFILE_SIZE", "256"))
+# >0 ise bu süreyi aşan istekler konsola yazılır
+PROFILE_SLOW_MS = float(_env("UZMANRAPOR_API_PROFILE_SLOW_MS", "0"))
+
+
+def _parse_server_timing(value: Optional[str]) -> dict[str, float]:
+    """`execute;dur=12.3, total;dur=15` -> {"execute": 12.3, "total": 15.0} (ms)."""
+    out: dict[str, float] = {}
+    for part in (value or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        for param in params.split(";"):
+            key, _, val = param.strip().partition("=")
+            if key.lower() == "dur":
+                try:
+                    out[name] = out.get(name, 0.0) + float(val.strip('"'))
+                except ValueError:
+                    pass
+    return out
+
+
+class _Profiler:
+    def __init__(self, size: int) -> None:
+        self._records: deque[dict[str, Any]] = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+
+    def record(self, rec: dict[str, Any]) -> None:
+        with self._lock:
+            self._records.append(rec)
+        if PROFILE_SLOW_MS > 0 and rec["wall_ms"] >= PROFILE_SLOW_MS:
+            phases = " ".join(f"{k}={v:.1f}" for k, v in rec["server"].items())
+            logger.warning(
+                "yavaş istek %s %s duvar=%.1fms network=%.1fms %s",
+                rec["path"], rec["status"], rec["wall_ms"], rec["network_ms"], phases,
+            )
+
+    def records(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+_PROFILER = _Profiler(PROFILE_SIZE)
+
+
+def profiler_records() -> list[dict[str, Any]]:
+    """Son istekler (eskiden yeniye): path, status, wall_ms, server_ms, network_ms, server (aşamalar)."""
+    return _PROFILER.records()
+
+
+def profiler_summary() -> dict[str, dict[str, Any]]:
+    """Path başına adet, duvar p50/p95/maks ve ortalama sunucu aşamaları / network (ms)."""
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for rec in _PROFILER.records():
+        groups.setdefault(rec["path"], []).append(rec)
+    out: dict[str, dict[str, Any]] = {}
+    for path, recs in groups.items():
+        walls = sorted(r["wall_ms"] for r in recs)
+        n = len(recs)
+        phases: dict[str, float] = {}
+        for r in recs:
+            for k, v in r["server"].items():
+                phases[k] = phases.get(k, 0.0) + v
+        out[path] = {
+            "count": n,
+            "wall_p50": walls[n // 2],
+            "wall_p95": walls[min(n - 1, int(n * 0.95))],
+            "wall_max": walls[-1],
+            "network_avg": sum(r["network_ms"] for r in recs) / n,
+            "server_avg": {k: v / n for k, v in phases.items()},
+        }
+    return out
+
+
+def profiler_reset() -> None:
+    _PROFILER.clear()
+
+
+# sunucuda bulunmayan isimli sorgular (base_url, isim): tekrar denenmez, fallback SQL kullanılır
+_NAMED_UNSUPPORTED: set[tuple[str, str]] = set()
+
+
+def _is_arrow(resp: Any) -> bool:
+    ctype = resp.headers.get("Content-Type", "") if getattr(resp, "headers", None) else ""
+    return pa is not None and ctype.startswith(ARROW_MEDIA_TYPE)
+
+
+def _batch_rows(batch: Any) -> list[tuple[Any, ...]]:
+    """Arrow record batch -> satır tuple'ları (sadece satır bazlı okuma istenirse)."""
+    return list(zip(*(col.to_pylist() for col in batch.columns)))
+
+
+def _frame_column(values: tuple[Any, ...], kind: Optional[str]) -> pd.Series:
+    """
+    JSON kolonu -> DataFrame kolonu, sunucunun bildirdiği tipe göre tek seferde (hücre bazlı çıkarım yok):
+    datetime/date -> datetime64, int -> int64 (NULL varsa float64), float -> float64, bool -> bool (NULL varsa object),
+    binary -> bytes (base64 açılır), diğerleri object.
+    """
+    n = len(values)
+    if kind in ("datetime", "date"):
+        try:
+            # ISO metin; None -> NaT
+            return pd.Series(np.array(values, dtype="datetime64[us]"), copy=False)
+        except ValueError:
+            return pd.Series(pd.to_datetime(list(values), format="ISO8601", errors="coerce"))
+    if kind == "int":
+        try:
+            return pd.Series(np.array(values, dtype=np.int64), copy=False)
+        except (TypeError, ValueError, OverflowError):
+            kind = "float"
+    if kind == "float":
+        try:
+            return pd.Series(np.array(values, dtype=np.float64), copy=False)
+        except (TypeError, ValueError):
+            pass
+    elif kind == "bool" and None not in values:
+        return pd.Series(np.array(values, dtype=bool), copy=False)
+    elif kind == "binary":
+        values = (None if v is None else base64.b64decode(v) for v in values)
+    elif kind == "time":
+        values = (None if v is None else dt.time.fromisoformat(v) for v in values)
+    return pd.Series(np.fromiter(values, dtype=object, count=n), dtype=object, copy=False)
+
+
+def _valid_types(types: Any, description: Optional[list[tuple[Any, ...]]]) -> Optional[list[Optional[str]]]:
+    if isinstance(types, list) and description and len(types) == len(description):
+        return types
+    return None
+
+
 class ApiConnection:
     """
     pyodbc benzeri minimal bir arayüz sağlayan HTTP tabanlı "bağlantı".
@@ -34,10 +482,19 @@ class ApiConnection:
         self.endpoint = raw_endpoint if raw_endpoint.startswith("/") else f"/{raw_endpoint}"
         self.timeout = timeout
         self.token = token or _env("UZMANRAPOR_API_TOKEN", "")
+        # columnar=True istenen sorgularda Arrow IPC talep edilir (pyarrow kuruluysa)
+        self.columnar = pa is not None and _env("UZMANRAPOR_API_COLUMNAR", "1").lower() in {"1", "true", "yes"}
+        raw_named = _env("UZMANRAPOR_NAMED_ENDPOINT", "/q").rstrip("/")
+        self.named_prefix = raw_named if raw_named.startswith("/") else f"/{raw_named}"
+        # son isteğin profil kaydı (bkz. profiler_records)
+        self.last_timing: Optional[dict[str, Any]] = None
 
     def cursor(self) -> "ApiCursor":
         return ApiCursor(self)
 
+    def transaction(self) -> "ApiTransaction":
+        return ApiTransaction(self)
+
     def commit(self) -> None:
         return
 
@@ -50,25 +507,151 @@ class ApiConnection:
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
 
-    def _request(self, payload: dict[str, Any]) -> dict[str, Any]:
-        url = f"{self.base_url}{self.endpoint}"
-        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        headers = {"Content-Type": "application/json"}
+    @property
+    def batch_endpoint(self) -> str:
+        return f"{self.endpoint}/batch"
+
+    @property
+    def tx_endpoint(self) -> str:
+        return f"{self.endpoint}/tx"
+
+    @property
+    def stream_endpoint(self) -> str:
+        return f"{self.endpoint}/stream"
+
+    def named_endpoint(self, name: str) -> str:
+        return f"{self.named_prefix}/{name}"
+
+    def _build_request(
+        self,
+        payload: dict[str, Any],
+        path: Optional[str],
+        columnar: bool = False,
+    ) -> tuple[str, bytes, dict[str, str]]:
+        url_path = urlsplit(self.base_url).path.rstrip("/") + (path or self.endpoint)
+        data = json.dumps(payload, ensure_ascii=False, default=_json_param).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept-Encoding": ACCEPT_ENCODING, "X-Client-Id": CLIENT_ID}
+        if columnar and self.columnar:
+            headers["Accept"] = f"{ARROW_MEDIA_TYPE}, application/json;q=0.9"
         if self.token:
             headers["X-Token"] = self.token
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        return url_path, data, headers
+
+    @contextmanager
+    def _open(
+        self, req: tuple[str, bytes, dict[str, str]], retry_safe: bool = False
+    ) -> Iterator[http.client.HTTPResponse]:
+        """
+        Havuzdan keep-alive bağlantı alıp POST eder. Cevap gövdesi tamamen okunduysa bağlantı
+        havuza döner, yarıda bırakıldıysa kapatılır. Sunucunun kapattığı boştaki bağlantılar istek
+        gönderilmeden elenir (_peer_closed). İstek gönderildikten sonra bağlantı koparsa sadece
+        retry_safe (okuma) istekleri bir kez yeni bağlantıyla denenir: yazım sunucuda commit olmuş,
+        sadece cevabı kaybolmuş olabilir. Sunucu meşgulse (429) Retry-After kadar bekleyip en fazla
+        BUSY_RETRIES kez tekrar dener (429'da sorgu çalışmamıştır).
+        """
+        url_path, data, headers = req
+        pool = _http_pool(self.base_url)
+        started = time.perf_counter()
+        stale_retried = False
+        busy_left = BUSY_RETRIES
+        while True:
+            conn, reused = pool.acquire(self.timeout)
+            try:
+                conn.request("POST", url_path, body=data, headers=headers)
+                resp = conn.getresponse()
+            except _STALE_ERRORS as exc:
+                pool.discard(conn)
+                if reused and retry_safe and not stale_retried:
+                    stale_retried = True
+                    pool.note_retry()
+                    continue
+                raise SqlApiError(f"SQL API bağlantı hatası: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                pool.discard(conn)
+                raise SqlApiError(f"SQL API bağlantı hatası: {exc}") from exc
+            if resp.status != 429 or busy_left <= 0:
+                break
+            busy_left -= 1
+            wait = _retry_after(resp)
+            try:
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                pass
+            if resp.isclosed() and not resp.will_close:
+                pool.release(conn)
+            else:
+                pool.discard(conn)
+            time.sleep(wait)
+
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                body = resp.read().decode("utf-8")
-        except urllib.error.HTTPError as exc:
+            if resp.status >= 400:
+                try:
+                    msg = _decoded(resp).read().decode("utf-8")
+                except Exception:
+                    msg = ""
+                raise SqlApiError(f"SQL API hatası: {resp.status} {resp.reason} {msg}".strip(), status=resp.status)
+            yield resp
+        except (OSError, http.client.HTTPException) as exc:
+            raise SqlApiError(f"SQL API bağlantı hatası: {exc}") from exc
+        finally:
+            if resp.isclosed() and not resp.will_close:
+                pool.release(conn)
+            else:
+                pool.discard(conn)
+            self._profile(url_path, resp, time.perf_counter() - started)
+
+    def _profile(self, url_path: str, resp: http.client.HTTPResponse, wall: float) -> None:
+        # akışlarda başlık ilk satırdan önce gittiğinden sunucu aşamaları sadece execute'a kadardır
+        server = _parse_server_timing(resp.getheader("Server-Timing"))
+        wall_ms = wall * 1000
+        server_ms = server.get("total", 0.0)
+        rec = {
+            "path": url_path,
+            "status": resp.status,
+            "wall_ms": wall_ms,
+            "server_ms": server_ms,
+            "network_ms": max(0.0, wall_ms - server_ms),
+            "server": server,
+        }
+        self.last_timing = rec
+        _PROFILER.record(rec)
+
+    def _request(
+        self,
+        payload: dict[str, Any],
+        path: Optional[str] = None,
+        columnar: bool = False,
+        retry_safe: bool = False,
+    ) -> dict[str, Any]:
+        req = self._build_request(payload, path, columnar)
+        url_path, body_bytes, headers = req
+        # sadece SELECT cevapları (/sql, /q/{name}) ETag taşır; anahtar yol + gövde + format
+        etag_key = None
+        cached = None
+        if _ETAG_CACHE.size > 0:
+            etag_key = (self.base_url, url_path, body_bytes, headers.get("Accept", ""))
+            cached = _ETAG_CACHE.get(etag_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        with self._open(req, retry_safe) as resp:
+            raw = _decoded(resp).read()
+            if resp.status == 304 and cached is not None:
+                _ETAG_CACHE.note_not_modified()
+                return cached[1]
+            is_arrow = _is_arrow(resp)
+            etag = resp.getheader("ETag")
+
+        if is_arrow:
             try:
-                msg = exc.read().decode("utf-8")
-            except Exception:
-                msg = ""
-            raise SqlApiError(f"SQL API hatası: {exc.code} {exc.reason} {msg}".strip()) from exc
-        except urllib.error.URLError as exc:
-            raise SqlApiError(f"SQL API bağlantı hatası: {exc.reason}") from exc
+                data = {"arrow": pa.ipc.open_stream(raw).read_all()}
+            except Exception as exc:
+                raise SqlApiError(f"SQL API geçersiz Arrow cevabı döndürdü: {exc}") from exc
+            if etag_key is not None and etag and data["arrow"].num_rows <= ETAG_MAX_ROWS:
+                _ETAG_CACHE.put(etag_key, etag, data)
+            return data
 
+        body = raw.decode("utf-8")
         try:
             data = json.loads(body)
         except json.JSONDecodeError as exc:
@@ -78,23 +661,126 @@ class ApiConnection:
             raise SqlApiError(str(data["error"]))
         if not isinstance(data, dict):
             raise SqlApiError("SQL API beklenmeyen cevap döndürdü.")
+        if etag_key is not None and etag and len(data.get("rows") or ()) <= ETAG_MAX_ROWS:
+            _ETAG_CACHE.put(etag_key, etag, data)
         return data
 
+    def _stream(
+        self,
+        payload: dict[str, Any],
+        path: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Iterator[Any]:
+        """
+        /sql/stream çerçevelerini geldikçe üretir; yarıda bırakılırsa bağlantı kapanır.
+        NDJSON: dict çerçeveler. Arrow: önce {"columns", "schema"} sonra pyarrow.RecordBatch'ler.
+        """
+        # /sql/stream ve /q/{name}/stream sadece SELECT çalıştırır
+        with self._open(self._build_request(payload, path or self.stream_endpoint, columnar), True) as resp:
+            body = _decoded(resp)
+            if _is_arrow(resp):
+                try:
+                    reader = pa.ipc.open_stream(body)
+                    yield {"columns": list(reader.schema.names), "schema": reader.schema}
+                    for batch in reader:
+                        yield batch
+                except pa.ArrowException as exc:
+                    raise SqlApiError(f"SQL API Arrow akışı yarıda kesildi: {exc}") from exc
+                # EOS sonrası chunked sonlandırıcıyı oku ki bağlantı havuza dönebilsin
+                body.read()
+                return
+
+            for line in body:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    frame = json.loads(line.decode("utf-8"))
+                except json.JSONDecodeError as exc:
+                    raise SqlApiError("SQL API geçersiz JSON döndürdü.") from exc
+                if not isinstance(frame, dict):
+                    raise SqlApiError("SQL API beklenmeyen cevap döndürdü.")
+                if frame.get("error"):
+                    raise SqlApiError(str(frame["error"]))
+                yield frame
+
 
 class ApiCursor:
+    """
+    pyodbc cursor benzeri. Satırlar tuple olarak bir kez kurulur ve indeksle okunur (fetchone O(1),
+    fetchall kopyasız); akışlı cevapta sadece o anki parça bellekte tutulur, sonraki parça okundukça çekilir.
+    """
+
     def __init__(self, conn: ApiConnection) -> None:
         self._conn = conn
-        self._rows: list[list[Any]] = []
+        # o anki satır parçası ve sıradaki satırın indeksi
+        self._rows: list[tuple[Any, ...]] = []
+        self._pos = 0
+        self._stream: Optional[Iterator[Any]] = None
+        # JSON cevabındaki kolon tipleri (sunucu "types" gönderiyorsa); fetch_dataframe kullanır
+        self._types: Optional[list[Optional[str]]] = None
+        # Arrow cevabında şema; fetch_arrow() sadece henüz satır okunmadıysa tabloyu verir
+        self._arrow_schema: Any = None
+        self._arrow_untouched = False
         self.description: Optional[list[tuple[Any, ...]]] = None
         self.rowcount: int = -1
+        self.arraysize: int = 1
 
-    def execute(self, query: str, params: Optional[Iterable[Any]] = None) -> "ApiCursor":
-        q = (query or "").strip()
-        if q.endswith(";"):
-            q = q[:-1].rstrip()  # sadece sondaki ; temizlensin
+    def execute(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]] = None,
+        columnar: bool = False,
+    ) -> "ApiCursor":
+        """
+        columnar=True: sunucudan Arrow IPC istenir (pyarrow varsa); sonuç fetch_arrow() ile
+        kolon bazlı alınabilir, fetchone/fetchall yine çalışır.
+        """
+        q = _clean_query(query)  # sadece sondaki ; temizlensin
 
+        self._close_stream()
         payload = {"query": q, "params": list(params or [])}
-        data = self._conn._request(payload)
+        return self._load(self._conn._request(payload, columnar=columnar, retry_safe=_is_read_query(q)))
+
+    def execute_named(
+        self,
+        name: str,
+        params: Optional[Iterable[Any]] = None,
+        columnar: bool = False,
+        stream: bool = False,
+        fallback: Optional[str] = None,
+    ) -> "ApiCursor":
+        """
+        Sunucu kataloğundaki isimli sorguyu çalıştırır (/q/{name}, stream=True ise /q/{name}/stream):
+        SQL metni gönderilmez, sunucuda doğrulama yapılmaz ve hazırlanmış cursor kullanılır.
+        Sunucu ismi tanımıyorsa (eski sürüm) `fallback` SQL'i execute/execute_stream ile çalıştırılır.
+        """
+        key = (self._conn.base_url, name)
+        if key not in _NAMED_UNSUPPORTED:
+            self._close_stream()
+            path = self._conn.named_endpoint(name)
+            payload = {"params": list(params or [])}
+            try:
+                if stream:
+                    return self._start_stream(self._conn._stream(payload, f"{path}/stream", columnar))
+                # katalogda sadece SELECT sorguları var (UZMANRAPOR_API/queries.py)
+                return self._load(self._conn._request(payload, path, columnar, retry_safe=True))
+            except SqlApiError as exc:
+                if fallback is None or exc.status not in {404, 405}:
+                    raise
+                _NAMED_UNSUPPORTED.add(key)
+        if fallback is None:
+            raise SqlApiError(f"İsimli sorgu desteklenmiyor: {name}")
+        if stream:
+            return self.execute_stream(fallback, params, columnar=columnar)
+        return self.execute(fallback, params, columnar=columnar)
+
+    def _load(self, data: dict[str, Any]) -> "ApiCursor":
+        table = data.get("arrow")
+        if table is not None:
+            self._set_arrow(table.schema, iter(table.to_batches()))
+            self.rowcount = table.num_rows
+            return self
 
         rows = data.get("rows")
         columns = data.get("columns")
@@ -110,30 +796,248 @@ class ApiCursor:
         if rows and isinstance(rows[0], dict):
             if not columns:
                 columns = list(rows[0].keys())
-            rows = [[row.get(col) for col in columns] for row in rows]
-
-        self._rows = [list(row) for row in rows]
+            self._rows = [tuple(row.get(col) for col in columns) for row in rows]
+        else:
+            self._rows = list(map(tuple, rows))
+        self._pos = 0
         if columns:
             self.description = [(col, None, None, None, None, None, None) for col in columns]
         else:
             self.description = None
+        self._types = _valid_types(data.get("types"), self.description)
 
         self.rowcount = data.get("rowcount")
         if self.rowcount is None:
             self.rowcount = data.get("affected_rows", len(self._rows) if self._rows else -1)
         return self
 
+    def executemany(self, query: str, seq_of_params: Iterable[Iterable[Any]]) -> "ApiCursor":
+        """
+        Aynı ifadeyi tüm parametre setleriyle tek HTTP isteğinde (/sql/batch) çalıştırır.
+        Sunucu tarafında fast_executemany + tek commit kullanılır.
+        """
+        q = _clean_query(query)
+
+        params_list = [list(p) for p in (seq_of_params or [])]
+        self._close_stream()
+        self._rows, self._pos = [], 0
+        self.description = None
+        self._types = None
+        if not params_list:
+            self.rowcount = 0
+            return self
+
+        payload = {"query": q, "params_list": params_list}
+        data = self._conn._request(payload, path=self._conn.batch_endpoint)
+        rc = data.get("affected_rows")
+        self.rowcount = rc if rc is not None else -1
+        return self
+
+    def execute_stream(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]] = None,
+        columnar: bool = False,
+    ) -> "ApiCursor":
+        """
+        Büyük SELECT'ler için /sql/stream: satır sınırı yoktur, satırlar parça parça gelir.
+        Satırlar iter_rows() (veya fetchone/fetchall) ile okunurken ağdan çekilir.
+        columnar=True ise parçalar Arrow record batch olarak gelir (fetch_arrow()).
+        """
+        self._close_stream()
+        payload = {"query": _clean_query(query), "params": list(params or [])}
+        return self._start_stream(self._conn._stream(payload, columnar=columnar))
+
+    def _start_stream(self, stream: Iterator[Any]) -> "ApiCursor":
+        self._rows, self._pos = [], 0
+        self.rowcount = -1
+        header: dict[str, Any] = {}
+        for frame in stream:
+            if isinstance(frame, dict) and "columns" in frame:
+                header = frame
+                break
+        if header.get("schema") is not None:
+            self._set_arrow(header["schema"], stream)
+            return self
+        columns = list(header.get("columns") or [])
+        self.description = [(col, None, None, None, None, None, None) for col in columns] or None
+        self._types = _valid_types(header.get("types"), self.description)
+        self._stream = stream
+        return self
+
+    def _set_arrow(self, schema: Any, batches: Iterator[Any]) -> None:
+        self._rows, self._pos = [], 0
+        self._stream = batches
+        self._arrow_schema = schema
+        self._arrow_untouched = True
+        self._types = None
+        self.description = [(name, None, None, None, None, None, None) for name in schema.names] or None
+
+    def fetch_arrow(self) -> Any:
+        """
+        Sonucu pyarrow.Table olarak döndürür (columnar=True ile Arrow geldiyse ve henüz satır
+        okunmadıysa). Aksi halde None; çağıran fetchall()'a düşmelidir.
+        """
+        if self._arrow_schema is None or not self._arrow_untouched:
+            return None
+        batches = list(self._stream or [])
+        self._stream = None
+        self._arrow_untouched = False
+        table = pa.Table.from_batches(batches, schema=self._arrow_schema)
+        self.rowcount = table.num_rows
+        return table
+
+    def fetch_dataframe(self) -> pd.DataFrame:
+        """
+        Kalan satırları DataFrame olarak döndürür. Arrow geldiyse tablo doğrudan çevrilir; JSON'da satırlar
+        kolonlara bir kez ayrılır ve her kolon sunucunun bildirdiği tiple kurulur (_frame_column).
+        Sunucu tip göndermiyorsa (eski API) pandas çıkarımı kullanılır.
+        """
+        table = self.fetch_arrow()
+        if table is not None:
+            return table.to_pandas(date_as_object=False)
+        columns = [d[0] for d in self.description] if self.description else []
+        types = self._types
+        rows = self.fetchall()
+        if types is None:
+            return pd.DataFrame.from_records(rows, columns=columns)
+        values = list(zip(*rows)) if rows else [() for _ in columns]
+        df = pd.DataFrame({i: _frame_column(col, kind) for i, (col, kind) in enumerate(zip(values, types))})
+        df.columns = columns
+        return df
+
+    def _pull_frame(self) -> bool:
+        """
+        O anki parça bittiğinde stream'den sonraki boş olmayan satır parçasını alır (öncekinin yerine);
+        stream bittiyse False.
+        """
+        while self._stream is not None:
+            try:
+                frame = next(self._stream)
+            except StopIteration:
+                self._stream = None
+                break
+            if not isinstance(frame, dict):
+                # Arrow record batch
+                self._arrow_untouched = False
+                rows = _batch_rows(frame)
+            elif "rows" in frame:
+                rows = list(map(tuple, frame.get("rows") or []))
+            else:
+                if frame.get("done"):
+                    self.rowcount = int(frame.get("rowcount") or 0)
+                continue
+            if rows:
+                self._rows, self._pos = rows, 0
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[tuple[Any, ...]]:
+        while True:
+            rows = self._rows
+            while self._pos < len(rows):
+                row = rows[self._pos]
+                self._pos += 1
+                yield row
+            if not self._pull_frame():
+                return
+
+    def iter_rows(self) -> Iterator[tuple[Any, ...]]:
+        return iter(self)
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+            self._stream = None
+        self._arrow_schema = None
+        self._arrow_untouched = False
+
+    def close(self) -> None:
+        self._close_stream()
+        self._rows, self._pos = [], 0
+
     def fetchone(self) -> Optional[tuple[Any, ...]]:
-        if not self._rows:
+        if self._pos >= len(self._rows) and not self._pull_frame():
             return None
-        row = self._rows.pop(0)
-        return tuple(row)
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> list[tuple[Any, ...]]:
+        """En fazla size (varsayılan arraysize) satır; akışta gerektikçe sonraki parçalar çekilir."""
+        size = self.arraysize if size is None else int(size)
+        out: list[tuple[Any, ...]] = []
+        while len(out) < size:
+            if self._pos >= len(self._rows) and not self._pull_frame():
+                break
+            end = min(len(self._rows), self._pos + size - len(out))
+            out.extend(self._rows[self._pos:end])
+            self._pos = end
+        return out
 
     def fetchall(self) -> list[tuple[Any, ...]]:
-        rows = [tuple(row) for row in self._rows]
-        self._rows = []
+        # okunmamış parça kopyalanmadan devredilir
+        rows = self._rows[self._pos:] if self._pos else self._rows
+        self._rows, self._pos = [], 0
+        while self._pull_frame():
+            rows.extend(self._rows)
+            self._rows = []
         return rows
 
 
+class ApiTransaction:
+    """
+    Sunucu tarafı transaction (/sql/tx): ifadeler istemcide biriktirilir, commit() ile
+    tek istekte gönderilip tek pyodbc transaction'ında çalıştırılır (hepsi ya da hiçbiri).
+
+        with conn.transaction() as tx:
+            tx.execute("DELETE FROM ...")
+            tx.executemany("INSERT INTO ... VALUES (?)", rows)
+    """
+
+    def __init__(self, conn: ApiConnection) -> None:
+        self._conn = conn
+        self._statements: list[dict[str, Any]] = []
+        self.results: list[int] = []
+        self.rowcount: int = -1
+
+    def execute(self, query: str, params: Optional[Iterable[Any]] = None) -> "ApiTransaction":
+        self._statements.append({"query": _clean_query(query), "params": list(params or [])})
+        return self
+
+    def executemany(self, query: str, seq_of_params: Iterable[Iterable[Any]]) -> "ApiTransaction":
+        params_list = [list(p) for p in (seq_of_params or [])]
+        if params_list:
+            self._statements.append({"query": _clean_query(query), "params_list": params_list})
+        return self
+
+    def commit(self) -> list[int]:
+        statements, self._statements = self._statements, []
+        if not statements:
+            self.results = []
+            self.rowcount = 0
+            return self.results
+
+        data = self._conn._request({"statements": statements}, path=self._conn.tx_endpoint)
+        self.results = [int(x) for x in (data.get("results") or [])]
+        rc = data.get("affected_rows")
+        self.rowcount = rc if rc is not None else -1
+        return self.results
+
+    def rollback(self) -> None:
+        self._statements = []
+
+    def __enter__(self) -> "ApiTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
 def get_sql_connection() -> ApiConnection:
     return ApiConnection()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from typing import List, Dict
 import ast
@@ -8,11 +8,13 @@ import base64
 import re
 import secrets
 import hashlib
-import io
+import os
 import pickle
-import zlib
+import threading
+import time
 
 import pandas as pd
+from app import disk_cache, snapshot_format
 from app.sql_api_client import ApiConnection, get_sql_connection
 
 
@@ -25,14 +27,168 @@ def _sql_conn() -> ApiConnection:
     return get_sql_connection()
 
 
-def _fetch_dataframe(sql: str, params: tuple | list | None = None) -> pd.DataFrame:
-    """API cursor ile DataFrame üretir (pd.read_sql yerine)."""
+def read_frame(sql: str, params: tuple | list | None = None, stream: bool = False) -> pd.DataFrame:
+    """
+    SELECT sonucu -> DataFrame (pd.read_sql yerine). Kolonlar sunucunun bildirdiği tiplerle doğrudan kurulur
+    (ApiCursor.fetch_dataframe). stream=True: /sql/stream, UZMANRAPOR_MAX_ROWS sınırı yok.
+    """
     with _sql_conn() as c:
         cur = c.cursor()
-        cur.execute(sql, params or [])
-        rows = cur.fetchall()
-        columns = [d[0] for d in cur.description] if cur.description else []
-    return pd.DataFrame(rows, columns=columns)
+        if stream:
+            cur.execute_stream(sql, params or [], columnar=True)
+        else:
+            cur.execute(sql, params or [], columnar=True)
+        return cur.fetch_dataframe()
+
+
+# ============================================================
+#  LOOKUP ÖNBELLEĞİ (process geneli)
+#  Bloklu/dummy tezgahlar, kesim/kenar haritaları ve etiket->tezgah haritası bir kullanıcı işleminde
+#  birden çok ekrandan okunur (planlama, Kuşbakışı, takım akışı, running zenginleştirme). Her tablo TTL
+#  boyunca bellekten verilir; ilgili save_* kaydı geçersiz kılar. UZMANRAPOR_LOOKUP_VALIDATE=1 ise süresi
+#  dolan kayıt, tablo tekrar indirilmeden önce AppMeta'daki sürüm anahtarıyla doğrulanır (save_* her yazımda
+#  anahtarı yeniler; diğer client'ların kayıtları da böylece görülür).
+# ============================================================
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+# tablo -> (varsayılan TTL sn, AppMeta sürüm anahtarı)
+# etiket haritası Usta Defteri kayıtlarıyla değişir; sürüm anahtarı yok, sadece TTL
+_LOOKUP_TABLES: dict[str, tuple[float, str | None]] = {
+    "blocked": (30, "version:BlockedLooms"),
+    "dummy": (30, "version:DummyLooms"),
+    "cut_map": (300, "version:LoomCutMap"),
+    "selvedge": (300, "version:TypeSelvedgeMap"),
+    "etiket": (120, None),
+}
+LOOKUP_VALIDATE = os.getenv("UZMANRAPOR_LOOKUP_VALIDATE", "0").strip() == "1"
+# sürüm aynı olsa da bu süreden eski kayıt yeniden indirilir (save_* dışından yapılan yazımlar, ör. SSMS)
+LOOKUP_MAX_AGE = _env_float("UZMANRAPOR_LOOKUP_MAX_AGE_SEC", 900)
+
+
+class _LookupCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # ad -> (geçerlilik sonu [monotonic], sürüm, değer, indirilme zamanı [monotonic])
+        self._entries: dict[str, tuple[float, str | None, object, float]] = {}
+        self._stats = {"hits": 0, "misses": 0, "validated": 0, "errors": 0}
+        # invalidate() her çağrıda artar; indirme sırasında değiştiyse sonuç saklanmaz
+        self._generation = 0
+        # UZMANRAPOR_LOOKUP_TTL_SEC hepsini, UZMANRAPOR_LOOKUP_TTL_<AD> tek tabloyu ayarlar; 0 = önbellek yok
+        default = os.getenv("UZMANRAPOR_LOOKUP_TTL_SEC")
+        self.ttl = {
+            name: _env_float(f"UZMANRAPOR_LOOKUP_TTL_{name.upper()}", float(default) if default else ttl)
+            for name, (ttl, _key) in _LOOKUP_TABLES.items()
+        }
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, name: str, fetch, empty):
+        """
+        Geçerli kayıt varsa onu, yoksa fetch() sonucunu döndürür (değiştirilebilir kopya olarak).
+        fetch hata verirse son bilinen değer (yoksa empty) döner; hata önbelleğe alınmaz.
+        """
+        ttl = self.ttl.get(name, 0)
+        with self._lock:
+            entry = self._entries.get(name)
+            generation = self._generation
+        now = time.monotonic()
+        if entry is not None and now < entry[0]:
+            self._count("hits")
+            return _copy(entry[2])
+
+        version = None
+        key = _LOOKUP_TABLES[name][1]
+        if LOOKUP_VALIDATE and key and ttl > 0:
+            version = _meta_get(key)
+            fresh = entry is not None and now - entry[3] < LOOKUP_MAX_AGE
+            if fresh and version is not None and version == entry[1]:
+                with self._lock:
+                    self._entries[name] = (now + ttl, version, entry[2], entry[3])
+                self._count("validated")
+                return _copy(entry[2])
+
+        self._count("misses")
+        try:
+            value = fetch()
+        except Exception:
+            self._count("errors")
+            return _copy(entry[2]) if entry is not None else empty
+        if ttl > 0:
+            loaded = time.monotonic()
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[name] = (loaded + ttl, version, value, loaded)
+        return _copy(value)
+
+    def put(self, name: str, version: str | None, value, age: float = 0.0) -> None:
+        """Dışarıdan gelen değer (disk önbelleği); age: değerin indirildiğinden beri geçen süre (sn)."""
+        ttl = self.ttl.get(name, 0)
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._generation += 1
+            self._entries[name] = (now + ttl, version, value, now - max(age, 0.0))
+
+    def invalidate(self, *names: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for name in names or list(self._entries):
+                self._entries.pop(name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+        return out
+
+
+def _copy(value):
+    # çağıranlar haritaları yerinde güncelleyip save_* ile yazıyor (ör. enrich_running_with_selvedge)
+    return value.copy() if isinstance(value, (list, dict)) else value
+
+
+_lookup_cache = _LookupCache()
+
+
+def invalidate_lookup_cache(*names: str) -> None:
+    """Önbelleği boşaltır (isim verilmezse hepsi): blocked, dummy, cut_map, selvedge, etiket."""
+    _lookup_cache.invalidate(*names)
+
+
+def lookup_cache_stats() -> dict:
+    return _lookup_cache.stats()
+
+
+def _new_version() -> str:
+    return f"{time.time():.0f}-{secrets.token_hex(4)}"
+
+
+def _write_lookup_version(tx, name: str) -> None:
+    """save_* transaction'ına AppMeta sürüm anahtarını ekler (diğer client'lar için; veriyle birlikte commit olur)."""
+    key = _LOOKUP_TABLES[name][1]
+    if not key:
+        return
+    tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[AppMeta] WHERE MetaKey = ?;", (key,))
+    tx.execute(
+        "INSERT INTO [UzmanRaporDB].[dbo].[AppMeta] (MetaKey, MetaValue, UpdatedAt) "
+        "VALUES (?, ?, SYSUTCDATETIME());",
+        (key, _new_version()),
+    )
+
+
+def _lookup_written(name: str) -> None:
+    """save_* transaction'ı commit olduktan sonra: yerel kaydı ve disk kopyasını düşür."""
+    _lookup_cache.invalidate(name)
+    disk_cache.remove(name)
 
 
 # ============================================================
@@ -44,16 +200,18 @@ def _ensure_meta_table() -> None:
     return
 
 
+def _meta_fetch(key: str) -> str | None:
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute("SELECT MetaValue FROM [UzmanRaporDB].[dbo].[AppMeta] WHERE MetaKey = ?;", (key,))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
 def _meta_get(key: str) -> str | None:
     _ensure_meta_table()
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT MetaValue FROM [UzmanRaporDB].[dbo].[AppMeta] WHERE MetaKey = ?;", (key,))
-            row = cur.fetchone()
-        if not row:
-            return None
-        return row[0]
+        return _meta_fetch(key)
     except Exception:
         return None
 
@@ -127,11 +285,22 @@ def _decode_rules_from_meta(raw: str | bytes | None) -> list[dict]:
     return []
 
 
-def load_rules() -> list[dict]:
-    meta_rules = _decode_rules_from_meta(_meta_get("note_rules"))
+def _fetch_rules() -> list[dict]:
+    # AppMeta okunamazsa hata yükselir (disk önbelleğine boş liste yazılmasın)
+    meta_rules = _decode_rules_from_meta(_meta_fetch("note_rules"))
     if meta_rules:
         return meta_rules
+    return _load_rules_table()
 
+
+def load_rules() -> list[dict]:
+    try:
+        return _fetch_rules()
+    except Exception:
+        return []
+
+
+def _load_rules_table() -> list[dict]:
     if not _note_rules_table_exists():
         return []
 
@@ -177,27 +346,25 @@ def save_rules(rules: list[dict]) -> None:
             _meta_set("note_rules", None)
     except Exception:
         pass
+    # sunucu sürümü (UpdatedAt) bilinmiyor: açılış yeni kurallarla başlar, arka plan doğrulaması tazeler
+    disk_cache.write("rules", None, cleaned)
 
     # NoteRules tablosu varsa orayı da güncelle
     if not _note_rules_table_exists():
         return
 
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM dbo.NoteRules;")
+        batch: list[tuple] = []
+        for rule in cleaned:
+            try:
+                blob = pickle.dumps(rule)
+            except Exception:
+                continue
+            batch.append((base64.b64encode(blob).decode("ascii"),))
 
-            for rule in cleaned:
-                try:
-                    blob = pickle.dumps(rule)
-                except Exception:
-                    continue
-                payload_blob = base64.b64encode(blob).decode("ascii")
-                cur.execute(
-                    "INSERT INTO dbo.NoteRules (RuleData) VALUES (?);",
-                    (payload_blob,),
-                )
-            c.commit()
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.execute("DELETE FROM dbo.NoteRules;")
+            tx.executemany("INSERT INTO dbo.NoteRules (RuleData) VALUES (?);", batch)
     except Exception:
         pass
 
@@ -207,7 +374,10 @@ def save_rules(rules: list[dict]) -> None:
 # ============================================================
 
 def load_last_update() -> datetime | None:
-    raw = _meta_get("last_update")
+    return _parse_last_update(_meta_get("last_update"))
+
+
+def _parse_last_update(raw: str | None) -> datetime | None:
     if not raw:
         return None
     try:
@@ -223,17 +393,67 @@ def save_last_update(dt: datetime) -> None:
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=ZoneInfo("Europe/Istanbul"))
     _meta_set("last_update", dt.isoformat())
+    # sürüm değerin kendisi; sonraki açılış diskten doğru değerle başlar
+    disk_cache.write("last_update", dt.isoformat(), dt)
 
 
 # ============================================================
 #  SNAPSHOTS
-#  Not: API modunda DDL yok. [UzmanRaporDB].[dbo].[Snapshots] SSMS’de hazır olmalı.
+#  Not: API modunda DDL yok. [UzmanRaporDB].[dbo].[Snapshots] SSMS’de hazır olmalı
+#  (Data varbinary kolonu: UZMANRAPOR_API/sql/snapshots_binary.sql).
+#  Data: app/snapshot_format.py (Arrow IPC, zstd seviye 1). DataHex: eski pickle+zlib+hex kayıtları; Data boşsa okunur.
+#  DataHex sadece geçiş anahtarı açıksa (_legacy_hex_enabled) ya da Data kolonu yoksa yazılır.
+#  Script çalışmamışsa (Data kolonu yok) sadece DataHex okunur/yazılır.
 # ============================================================
 
+# DataHex de yazılsın mı (geçiş döneminde eski client'lar için): 1 = her zaman, 0 = asla,
+# boş (varsayılan) = AppMeta "snapshot_legacy_hex" anahtarı "1" ise. Eski client kalmayınca anahtar silinir.
+SNAPSHOT_LEGACY_HEX = os.getenv("UZMANRAPOR_SNAPSHOT_LEGACY_HEX", "").strip()
+_LEGACY_HEX_META_KEY = "snapshot_legacy_hex"
+
+# Snapshots.Data var mı (ilk kullanımda bir kez bakılır)
+_snapshot_has_data: bool | None = None
+# AppMeta'daki geçiş anahtarı (ilk kayıtta bir kez okunur)
+_snapshot_legacy_hex: bool | None = None
+
+
 def _ensure_snapshot_table() -> None:
     return
 
 
+def _legacy_hex_enabled() -> bool:
+    global _snapshot_legacy_hex
+    if SNAPSHOT_LEGACY_HEX in ("0", "1"):
+        return SNAPSHOT_LEGACY_HEX == "1"
+    if _snapshot_legacy_hex is None:
+        try:
+            value = _meta_fetch(_LEGACY_HEX_META_KEY)
+        except Exception:
+            # okunamadı: bu kayıtta yazma, sonraki kayıtta tekrar bak
+            return False
+        _snapshot_legacy_hex = (value or "").strip() == "1"
+    return _snapshot_legacy_hex
+
+
+def _snapshot_data_column(c: ApiConnection) -> bool:
+    global _snapshot_has_data
+    if _snapshot_has_data is None:
+        cur = c.cursor()
+        try:
+            cur.execute("SELECT Data FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE 1 = 0;")
+            _snapshot_has_data = True
+        except Exception:
+            # DataHex de okunamıyorsa sorun kolon değil (bağlantı vb.): hata çağırana çıkar, sonra tekrar bakılır
+            cur.execute("SELECT DataHex FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE 1 = 0;")
+            print("[SNAPSHOT] Snapshots.Data kolonu yok (sql/snapshots_binary.sql çalışmamış), DataHex kullanılıyor")
+            _snapshot_has_data = False
+    return _snapshot_has_data
+
+
+def _snapshot_version_key(which: str) -> str:
+    return f"version:Snapshot:{which}"
+
+
 def save_df_snapshot(df: pd.DataFrame | None, which: str) -> None:
     if df is None:
         return
@@ -241,43 +461,70 @@ def save_df_snapshot(df: pd.DataFrame | None, which: str) -> None:
     _ensure_snapshot_table()
 
     try:
-        buf = io.BytesIO()
-        df.to_pickle(buf)
-        raw_bytes = buf.getvalue()
-
-        compressed = zlib.compress(raw_bytes, level=9)
-        hex_str = compressed.hex()
-
+        # sürüm anahtarı snapshot ile aynı transaction'da: diğer client'ların disk önbelleği bunu karşılaştırır
+        version = _new_version()
+        key = _snapshot_version_key(which)
         with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE Name = ?;", (which,))
-            cur.execute(
-                "INSERT INTO [UzmanRaporDB].[dbo].[Snapshots] (Name, DataHex) VALUES (?, ?);",
-                (which, hex_str),
-            )
-            c.commit()
+            has_data = _snapshot_data_column(c)
+            data = snapshot_format.encode(df) if has_data else None
+            hex_str = snapshot_format.encode_legacy_hex(df) if not has_data or _legacy_hex_enabled() else None
+            with c.transaction() as tx:
+                tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE Name = ?;", (which,))
+                if has_data:
+                    tx.execute(
+                        "INSERT INTO [UzmanRaporDB].[dbo].[Snapshots] (Name, Data, DataHex) VALUES (?, ?, ?);",
+                        (which, data, hex_str),
+                    )
+                else:
+                    tx.execute(
+                        "INSERT INTO [UzmanRaporDB].[dbo].[Snapshots] (Name, DataHex) VALUES (?, ?);",
+                        (which, hex_str),
+                    )
+                tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[AppMeta] WHERE MetaKey = ?;", (key,))
+                tx.execute(
+                    "INSERT INTO [UzmanRaporDB].[dbo].[AppMeta] (MetaKey, MetaValue, UpdatedAt) "
+                    "VALUES (?, ?, SYSUTCDATETIME());",
+                    (key, version),
+                )
     except Exception as e:
         print(f"[SNAPSHOT] {which}: KAYIT HATASI -> {e!r}")
+        return
+    disk_cache.write(f"snapshot:{which}", version, df)
 
 
-def load_df_snapshot(which: str) -> pd.DataFrame | None:
-    _ensure_snapshot_table()
-
-    try:
-        with _sql_conn() as c:
+def _fetch_snapshot(which: str) -> pd.DataFrame | None:
+    with _sql_conn() as c:
+        if not _snapshot_data_column(c):
             cur = c.cursor()
             cur.execute("SELECT DataHex FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE Name = ?;", (which,))
             row = cur.fetchone()
+            return snapshot_format.decode_legacy_hex(row[0]) if row and row[0] else None
 
-        if not row or row[0] is None:
-            return None
+        cur = c.cursor()
+        # columnar: Data Arrow cevabında ham bayt olarak gelir (JSON'da base64)
+        cur.execute(
+            "SELECT Data, DataHex FROM [UzmanRaporDB].[dbo].[Snapshots] WHERE Name = ?;", (which,), columnar=True
+        )
+        row = cur.fetchone()
+
+    if not row:
+        return None
+    data, data_hex = row
+    if data is not None:
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+        return snapshot_format.decode(data)
+    if data_hex:
+        # eski kayıt; bir sonraki save_df_snapshot yeni biçimde yazar
+        return snapshot_format.decode_legacy_hex(data_hex)
+    return None
 
-        compressed = bytes.fromhex(row[0])
-        raw_bytes = zlib.decompress(compressed)
-        buf = io.BytesIO(raw_bytes)
 
-        df = pd.read_pickle(buf)
-        return df if isinstance(df, pd.DataFrame) else None
+def load_df_snapshot(which: str) -> pd.DataFrame | None:
+    _ensure_snapshot_table()
+
+    try:
+        return _fetch_snapshot(which)
     except Exception as e:
         print(f"[SNAPSHOT] {which}: YÜKLEME HATASI -> {e!r}")
         return None
@@ -398,29 +645,29 @@ def save_users(users: list[dict]) -> None:
         return
 
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[AppUsers];")
-
-            for u in users:
-                username = str(u.get("username", "")).strip()
-                salt = str(u.get("salt", "")).strip()
-                pwd_hash = str(u.get("password_hash", "")).strip()
-                perms = u.get("permissions", [])
-
-                if not username or not salt or not pwd_hash:
-                    continue
+        batch: list[tuple] = []
+        for u in users:
+            username = str(u.get("username", "")).strip()
+            salt = str(u.get("salt", "")).strip()
+            pwd_hash = str(u.get("password_hash", "")).strip()
+            perms = u.get("permissions", [])
+
+            if not username or not salt or not pwd_hash:
+                continue
 
-                perms_raw = ",".join([str(p).strip() for p in perms]) if isinstance(perms, list) else str(perms)
-                is_active_bit = 1 if u.get("is_active", True) else 0
+            perms_raw = ",".join([str(p).strip() for p in perms]) if isinstance(perms, list) else str(perms)
+            is_active_bit = 1 if u.get("is_active", True) else 0
 
-                cur.execute(
-                    "INSERT INTO [UzmanRaporDB].[dbo].[AppUsers] (Username, Salt, PasswordHash, Permissions, IsActive) "
-                    "VALUES (?, ?, ?, ?, ?);",
-                    (username, salt, pwd_hash, perms_raw, is_active_bit),
-                )
+            batch.append((username, salt, pwd_hash, perms_raw, is_active_bit))
 
-            c.commit()
+        # DELETE + INSERT tek transaction: yarıda kalırsa kullanıcı tablosu boş kalmaz
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[AppUsers];")
+            tx.executemany(
+                "INSERT INTO [UzmanRaporDB].[dbo].[AppUsers] (Username, Salt, PasswordHash, Permissions, IsActive) "
+                "VALUES (?, ?, ?, ?, ?);",
+                batch,
+            )
     except Exception:
         pass
 
@@ -482,131 +729,134 @@ def verify_user(username: str, password: str) -> bool:
 #  BLOK/DUMMY/CUT/SELVEDGE MAP
 # ============================================================
 
+def _fetch_blocked_looms() -> list[str]:
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute_named(
+            "looms.blocked", fallback="SELECT LoomNo FROM [UzmanRaporDB].[dbo].[BlockedLooms] ORDER BY LoomNo;"
+        )
+        return [str(r[0]) for r in cur]
+
+
 def load_blocked_looms() -> list[str]:
-    try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT LoomNo FROM [UzmanRaporDB].[dbo].[BlockedLooms] ORDER BY LoomNo;")
-            rows = cur.fetchall()
-        return [str(r[0]) for r in rows]
-    except Exception:
-        return []
+    return _lookup_cache.get("blocked", _fetch_blocked_looms, [])
 
 
 def save_blocked_looms(items: list[str]) -> None:
     vals = [re.findall(r"\d+", str(x))[0] for x in (items or []) if re.findall(r"\d+", str(x))]
     uniq = sorted(set(vals))
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[BlockedLooms];")
-            for loom in uniq:
-                cur.execute("INSERT INTO [UzmanRaporDB].[dbo].[BlockedLooms] (LoomNo) VALUES (?);", (loom,))
-            c.commit()
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[BlockedLooms];")
+            tx.executemany(
+                "INSERT INTO [UzmanRaporDB].[dbo].[BlockedLooms] (LoomNo) VALUES (?);",
+                [(loom,) for loom in uniq],
+            )
+            _write_lookup_version(tx, "blocked")
     except Exception:
-        pass
+        return
+    _lookup_written("blocked")
+
+
+def _fetch_dummy_looms() -> list[str]:
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute_named(
+            "looms.dummy", fallback="SELECT LoomNo FROM [UzmanRaporDB].[dbo].[DummyLooms] ORDER BY LoomNo;"
+        )
+        return [str(r[0]) for r in cur]
 
 
 def load_dummy_looms() -> list[str]:
-    try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT LoomNo FROM [UzmanRaporDB].[dbo].[DummyLooms] ORDER BY LoomNo;")
-            rows = cur.fetchall()
-        return [str(r[0]) for r in rows]
-    except Exception:
-        return []
+    return _lookup_cache.get("dummy", _fetch_dummy_looms, [])
 
 
 def save_dummy_looms(items: list[str]) -> None:
     vals = [re.findall(r"\d+", str(x))[0] for x in (items or []) if re.findall(r"\d+", str(x))]
     uniq = sorted(set(vals))
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[DummyLooms];")
-            for loom in uniq:
-                cur.execute("INSERT INTO [UzmanRaporDB].[dbo].[DummyLooms] (LoomNo) VALUES (?);", (loom,))
-            c.commit()
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[DummyLooms];")
+            tx.executemany(
+                "INSERT INTO [UzmanRaporDB].[dbo].[DummyLooms] (LoomNo) VALUES (?);",
+                [(loom,) for loom in uniq],
+            )
+            _write_lookup_version(tx, "dummy")
     except Exception:
-        pass
+        return
+    _lookup_written("dummy")
+
+
+def _fetch_loom_cut_map() -> dict:
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute_named(
+            "looms.cut_map", fallback="SELECT LoomNo, CutType FROM [UzmanRaporDB].[dbo].[LoomCutMap];"
+        )
+        return {str(r[0]): str(r[1]) for r in cur}
 
 
 def load_loom_cut_map() -> dict:
-    try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT LoomNo, CutType FROM [UzmanRaporDB].[dbo].[LoomCutMap];")
-            rows = cur.fetchall()
-        return {str(r[0]): str(r[1]) for r in rows}
-    except Exception:
-        return {}
+    return _lookup_cache.get("cut_map", _fetch_loom_cut_map, {})
 
 
 def save_loom_cut_map(d: dict) -> None:
     if not isinstance(d, dict):
         return
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[LoomCutMap];")
-            for loom, ctype in d.items():
-                loom_str = str(loom).strip()
-                cut_str = str(ctype).strip()
-                if loom_str and cut_str:
-                    cur.execute("INSERT INTO [UzmanRaporDB].[dbo].[LoomCutMap] (LoomNo, CutType) VALUES (?, ?);", (loom_str, cut_str))
-            c.commit()
+        batch: list[tuple] = []
+        for loom, ctype in d.items():
+            loom_str = str(loom).strip()
+            cut_str = str(ctype).strip()
+            if loom_str and cut_str:
+                batch.append((loom_str, cut_str))
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.execute("DELETE FROM [UzmanRaporDB].[dbo].[LoomCutMap];")
+            tx.executemany("INSERT INTO [UzmanRaporDB].[dbo].[LoomCutMap] (LoomNo, CutType) VALUES (?, ?);", batch)
+            _write_lookup_version(tx, "cut_map")
     except Exception:
-        pass
+        return
+    _lookup_written("cut_map")
+
+
+def _fetch_type_selvedge_map() -> dict:
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute_named(
+            "types.selvedge_map", fallback="SELECT RootType, Selvedge FROM [UzmanRaporDB].[dbo].[TypeSelvedgeMap];"
+        )
+        return {str(r[0]): str(r[1]) for r in cur}
 
 
 def load_type_selvedge_map() -> dict:
-    try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT RootType, Selvedge FROM [UzmanRaporDB].[dbo].[TypeSelvedgeMap];")
-            rows = cur.fetchall()
-        return {str(r[0]): str(r[1]) for r in rows}
-    except Exception:
-        return {}
+    return _lookup_cache.get("selvedge", _fetch_type_selvedge_map, {})
 
 
 def save_type_selvedge_map(d: dict) -> None:
     if not isinstance(d, dict):
         return
+    rows: dict[str, str] = {}
+    for root, sel in d.items():
+        root_str = str(root).strip().upper()
+        sel_str = str(sel).strip()
+        if root_str and sel_str:
+            rows[root_str] = sel_str
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-
-            for root, sel in d.items():
-                root_str = str(root).strip().upper()
-                sel_str = str(sel).strip()
-                if not root_str or not sel_str:
-                    continue
-
-                # UPDATE dene
-                cur.execute(
-                    "UPDATE [UzmanRaporDB].[dbo].[TypeSelvedgeMap] "
-                    "SET Selvedge = ? "
-                    "WHERE RootType = ?",
-                    (sel_str, root_str),
-                )
-
-                # Var mı kontrol et; yoksa INSERT
-                cur.execute(
-                    "SELECT COUNT(*) FROM [UzmanRaporDB].[dbo].[TypeSelvedgeMap] WHERE RootType = ?",
-                    (root_str,),
-                )
-                cnt = cur.fetchone()[0]
-                if cnt == 0:
-                    cur.execute(
-                        "INSERT INTO [UzmanRaporDB].[dbo].[TypeSelvedgeMap] (RootType, Selvedge) VALUES (?, ?)",
-                        (root_str, sel_str),
-                    )
-
-            c.commit()
+        # upsert: verilen kökler silinip yeniden yazılır, diğerleri olduğu gibi kalır
+        with _sql_conn() as c, c.transaction() as tx:
+            tx.executemany(
+                "DELETE FROM [UzmanRaporDB].[dbo].[TypeSelvedgeMap] WHERE RootType = ?;",
+                [(root,) for root in rows],
+            )
+            tx.executemany(
+                "INSERT INTO [UzmanRaporDB].[dbo].[TypeSelvedgeMap] (RootType, Selvedge) VALUES (?, ?);",
+                list(rows.items()),
+            )
+            _write_lookup_version(tx, "selvedge")
     except Exception as e:
         print(f"[TypeSelvedgeMap] yazma hatası: {e!r}")
+        return
+    _lookup_written("selvedge")
 
 
 
@@ -616,12 +866,10 @@ def save_type_selvedge_map(d: dict) -> None:
 
 def load_usta_dataframe(sqlite_path: str | None = None) -> pd.DataFrame:
     try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute("SELECT Id, Tarih, IsTanimi FROM [UzmanRaporDB].[dbo].[UstaDefteri];")
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description] if cur.description else ["Id", "Tarih", "IsTanimi"]
-            df = pd.DataFrame.from_records(rows, columns=cols)
+        # tüm geçmiş MAX_ROWS'u aşar; akışla okunur
+        df = read_frame("SELECT Id, Tarih, IsTanimi FROM [UzmanRaporDB].[dbo].[UstaDefteri];", stream=True)
+        if df.empty and not len(df.columns):
+            df = pd.DataFrame(columns=["Id", "Tarih", "IsTanimi"])
     except Exception:
         return pd.DataFrame(columns=["_ts", "_what", "_dir"])
 
@@ -636,31 +884,75 @@ def load_usta_dataframe(sqlite_path: str | None = None) -> pd.DataFrame:
     return df[["_ts", "_what", "_dir"]]
 
 
-def count_usta_between(start_dt: datetime, end_dt: datetime, what: str = "DÜĞÜM", direction: str = "ALINDI") -> int:
-    try:
-        s_date = start_dt.date()
-        e_date = end_dt.date()
-        w = str(what).upper().strip()
+def _shift_label(hour: int) -> str:
+    # usta_defteri._vardiya_str ile aynı sınırlar
+    if 7 <= hour < 15:
+        return "(07:00)"
+    if 15 <= hour < 23:
+        return "(15:00)"
+    return "(23:00)"
+
 
-        sql = "SELECT COUNT(*) FROM [UzmanRaporDB].[dbo].[UstaDefteri] WHERE Tarih >= ? AND Tarih < ?"
-        params: list[object] = [s_date, e_date]
+_SHIFT_START_HOUR = {"(07:00)": 7, "(15:00)": 15, "(23:00)": 23}
 
-        if w:
-            sql += " AND UPPER(IsTanimi) = ?"
-            params.append(w)
 
+def count_usta_by_shift(start_dt: datetime, end_dt: datetime) -> dict[tuple[str, str], int]:
+    """
+    [start_dt, end_dt) vardiya penceresindeki Usta Defteri kayıtları, vardiya x iş tanımı kırılımında tek sorguyla:
+    {("(07:00)", "DÜĞÜM"): 12, ...}. Form kaydı Tarih (gün) + Vardiya "(07:00)|HH:MM" (giriş saati) olarak yazar;
+    23:00 vardiyasının gece yarısından sonraki kayıtları ertesi günün tarihini taşır. Bu yüzden sorgu gün + giriş
+    saati kırılımında döner, pencereye atama burada saat hassasiyetiyle yapılır (vardiya sınırları tam saattir).
+    """
+    tz = start_dt.tzinfo
+    s_date = start_dt.date().strftime("%Y-%m-%d")
+    e_date = (end_dt.date() + timedelta(days=1)).strftime("%Y-%m-%d")
+    # UPPER(IsTanimi): dbo.UstaDefteri.IsTanimiU (persisted) + IX_UstaDefteri_Tarih_IsTanimiU varsa
+    # SQL Server ifadeyi hesaplanmış kolonla eşleştirir ve index seek yapar (sql/usta_defteri_kpi_index.sql)
+    sql = """
+    SELECT Tarih, LEFT(Vardiya, 7) AS Vardiya, SUBSTRING(Vardiya, 9, 2) AS Saat,
+           UPPER(IsTanimi) AS IsTanimi, COUNT(*) AS Adet
+    FROM [UzmanRaporDB].[dbo].[UstaDefteri]
+    WHERE Tarih >= ? AND Tarih < ?
+    GROUP BY Tarih, LEFT(Vardiya, 7), SUBSTRING(Vardiya, 9, 2), UPPER(IsTanimi);
+    """
+    out: dict[tuple[str, str], int] = {}
+    try:
         with _sql_conn() as c:
             cur = c.cursor()
-            cur.execute(sql, tuple(params))
-            row = cur.fetchone()
-            if row and row[0] is not None:
-                return int(row[0])
+            cur.execute_named("usta_defteri.shift_counts", (s_date, e_date), fallback=sql)
+            rows = cur.fetchall()
+        for tarih, vardiya, saat, is_tanimi, adet in rows:
+            try:
+                day = datetime.strptime(str(tarih)[:10], "%Y-%m-%d")
+            except ValueError:
+                continue
+            label = str(vardiya or "").strip()
+            try:
+                hour = int(str(saat or "").strip())
+            except ValueError:
+                # giriş saati olmayan eski kayıt: vardiya başlangıcı
+                hour = _SHIFT_START_HOUR.get(label)
+                if hour is None:
+                    continue
+            entry = day.replace(hour=hour % 24, tzinfo=tz)
+            if not (start_dt <= entry < end_dt):
+                continue
+            key = (_shift_label(entry.hour), str(is_tanimi or "").strip())
+            out[key] = out.get(key, 0) + int(adet or 0)
     except Exception:
         pass
-    return 0
+    return out
 
 
-def load_usta_etiket_tezgah_map() -> dict[str, str]:
+_ETIKET_WHERE = "EtiketNo IS NOT NULL AND LTRIM(RTRIM(EtiketNo)) <> ''"
+
+
+def _fetch_usta_etiket_tezgah_map() -> dict[str, str]:
+    return _read_etiket_rows()[0]
+
+
+def _read_etiket_rows(after_id: int | None = None) -> tuple[dict[str, str], int]:
+    """(etiket -> en yeni kayıttaki tezgah, okunan satır); after_id: sadece Id'si bundan büyük kayıtlar."""
     def _clean(val) -> str:
         if val is None:
             return ""
@@ -675,28 +967,32 @@ def load_usta_etiket_tezgah_map() -> dict[str, str]:
         s = re.sub(r"\.0+$", "", s)
         return s
 
-    sql = """
+    where = _ETIKET_WHERE + (" AND Id > ?" if after_id is not None else "")
+    sql = f"""
     SELECT EtiketNo, Tezgah
     FROM [UzmanRaporDB].[dbo].[UstaDefteri]
-    WHERE EtiketNo IS NOT NULL AND LTRIM(RTRIM(EtiketNo)) <> ''
+    WHERE {where}
     ORDER BY Id DESC;
     """
 
-    try:
-        with _sql_conn() as c:
-            cur = c.cursor()
-            cur.execute(sql)
-            rows = cur.fetchall()
-    except Exception:
-        return {}
-
+    # tüm Usta Defteri geçmişi: /sql/stream (MAX_ROWS sınırı yok), satırlar parça parça işlenir
     mapping: dict[str, str] = {}
-    for row in rows:
-        etiket = _clean(row[0] if len(row) > 0 else None)
-        tezgah = _clean(row[1] if len(row) > 1 else None)
-        if etiket and tezgah:
-            mapping.setdefault(etiket, tezgah)
-    return mapping
+    count = 0
+    with _sql_conn() as c:
+        cur = c.cursor()
+        cur.execute_stream(sql, [after_id] if after_id is not None else [])
+        for row in cur:
+            count += 1
+            etiket = _clean(row[0] if len(row) > 0 else None)
+            tezgah = _clean(row[1] if len(row) > 1 else None)
+            if etiket and tezgah:
+                mapping.setdefault(etiket, tezgah)
+    return mapping, count
+
+
+def load_usta_etiket_tezgah_map() -> dict[str, str]:
+    # Usta Defteri kaydı sonrası UstaDefteriWidget geçersiz kılar; diğer client'ların kayıtları TTL ile gelir
+    return _lookup_cache.get("etiket", _fetch_usta_etiket_tezgah_map, {})
 
 
 def fetch_tip_buzulme_model(tip_kodlari: list[str]) -> pd.DataFrame:
@@ -717,7 +1013,7 @@ def fetch_tip_buzulme_model(tip_kodlari: list[str]) -> pd.DataFrame:
             part = tips[i:i + chunk]
             placeholders = ",".join(["?"] * len(part))
             sql = sql_tpl.format(placeholders)
-            df = _fetch_dataframe(sql, part)
+            df = read_frame(sql, part)
             out_frames.append(df)
     except Exception:
         return pd.DataFrame(columns=["TipKodu", "GecmisBuzulme", "SistemBuzulme", "GuvenAraligi"])
@@ -728,3 +1024,173 @@ def fetch_tip_buzulme_model(tip_kodlari: list[str]) -> pd.DataFrame:
     res = pd.concat(out_frames, ignore_index=True)
     res = res.drop_duplicates(subset=["TipKodu"], keep="last")
     return res
+
+
+# ============================================================
+#  DİSK ÖNBELLEĞİ (açılış)
+#  Snapshot'lar, kurallar, son güncelleme ve lookup tabloları kullanıcı profilinde sunucu sürümüyle
+#  saklanır (app/disk_cache.py). Açılış diskten kurulur; revalidate_disk_cache() arka planda tek AppMeta
+#  sorgusuyla sürümleri karşılaştırıp sadece değişenleri indirir.
+#  Sürümler: snapshot/lookup -> AppMeta "version:*" anahtarı (save_* yeniler), kurallar -> note_rules
+#  satırının UpdatedAt'i, son güncelleme -> değerin kendisi, etiket haritası -> "COUNT:MAX(Id)" (Usta Defteri
+#  sadece INSERT/DELETE görür; sadece ekleme olduysa yeni satırlar indirilip birleştirilir).
+# ============================================================
+
+# sürüm aynı olsa da bu süreden eski disk kaydı yeniden indirilir (sürüm anahtarını yenilemeyen yazımlar)
+DISK_MAX_AGE = _env_float("UZMANRAPOR_DISK_CACHE_MAX_AGE_SEC", 86400)
+
+
+def _disk_items() -> dict[str, tuple[str | None, object]]:
+    """ad -> (AppMeta anahtarı, indirme fonksiyonu). Fonksiyonlar hata yükseltir."""
+    items: dict[str, tuple[str | None, object]] = {
+        "snapshot:dinamik": (_snapshot_version_key("dinamik"), lambda: _fetch_snapshot("dinamik")),
+        "snapshot:running": (_snapshot_version_key("running"), lambda: _fetch_snapshot("running")),
+        "rules": ("note_rules", _fetch_rules),
+        "last_update": ("last_update", None),
+    }
+    fetchers = {
+        "blocked": _fetch_blocked_looms,
+        "dummy": _fetch_dummy_looms,
+        "cut_map": _fetch_loom_cut_map,
+        "selvedge": _fetch_type_selvedge_map,
+        "etiket": _fetch_usta_etiket_tezgah_map,
+    }
+    for name, (_ttl, key) in _LOOKUP_TABLES.items():
+        items[name] = (key, fetchers[name])
+    return items
+
+
+def _server_versions(names: list[str]) -> dict[str, str | None]:
+    items = _disk_items()
+    keys = {items[n][0]: n for n in names if items[n][0]}
+    out: dict[str, str | None] = {n: None for n in names}
+    with _sql_conn() as c:
+        cur = c.cursor()
+        if keys:
+            placeholders = ",".join(["?"] * len(keys))
+            # kuralların değeri büyük olabilir (sürüm olarak UpdatedAt); sürüm anahtarları ve son güncelleme kısa
+            cur.execute(
+                "SELECT MetaKey, LEFT(MetaValue, 64), UpdatedAt "
+                f"FROM [UzmanRaporDB].[dbo].[AppMeta] WHERE MetaKey IN ({placeholders});",
+                list(keys),
+            )
+            for key, value, updated in cur.fetchall():
+                name = keys.get(key)
+                if name == "rules":
+                    out[name] = str(updated) if updated is not None else None
+                elif name:
+                    out[name] = value
+        if "etiket" in out:
+            cur.execute(f"SELECT COUNT(*), MAX(Id) FROM [UzmanRaporDB].[dbo].[UstaDefteri] WHERE {_ETIKET_WHERE};")
+            row = cur.fetchone()
+            out["etiket"] = f"{int(row[0] or 0)}:{int(row[1] or 0)}" if row else None
+    return out
+
+
+def _download(name: str, version: str | None, entry: tuple | None):
+    if name == "last_update":
+        return _parse_last_update(version)
+    if name == "etiket" and entry is not None and entry[0] and version and isinstance(entry[2], dict):
+        old_count, old_max = (int(x) for x in entry[0].split(":"))
+        new_count, new_max = (int(x) for x in version.split(":"))
+        if new_count >= old_count and new_max >= old_max:
+            added, rows = _read_etiket_rows(after_id=old_max)
+            # silme olmadıysa tüm fark yeni satırlardır; yeni satırlar eski kayıtları ezer
+            if rows == new_count - old_count:
+                merged = dict(entry[2])
+                merged.update(added)
+                return merged
+    return _disk_items()[name][1]()
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, pd.DataFrame) or isinstance(b, pd.DataFrame):
+        return isinstance(a, pd.DataFrame) and isinstance(b, pd.DataFrame) and a.equals(b)
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _disk_load(name: str, default):
+    entry = disk_cache.read(name)
+    if entry is not None:
+        return entry[2]
+    # ilk açılış / önbellek kapalı: ağdan (sürümle birlikte kaydedilir)
+    try:
+        # son güncellemenin sürümü değerin kendisi; diğerleri için sürüm sadece diske yazılırken gerekir
+        version = _server_versions([name])[name] if disk_cache.ENABLED or name == "last_update" else None
+        value = _download(name, version, None)
+    except Exception as e:
+        print(f"[DISK CACHE] {name}: ağdan yüklenemedi -> {e!r}")
+        return default
+    if disk_cache.ENABLED:
+        disk_cache.write(name, version, value)
+    return value
+
+
+def load_df_snapshot_cached(which: str) -> pd.DataFrame | None:
+    """load_df_snapshot; disk önbelleğinde varsa ağa gitmeden (tazeliği revalidate_disk_cache sağlar)."""
+    df = _disk_load(f"snapshot:{which}", None)
+    return df if isinstance(df, pd.DataFrame) else None
+
+
+def load_rules_cached() -> list[dict]:
+    rules = _disk_load("rules", [])
+    return rules if isinstance(rules, list) else []
+
+
+def load_last_update_cached() -> datetime | None:
+    value = _disk_load("last_update", None)
+    return value if isinstance(value, datetime) else None
+
+
+def seed_lookup_cache_from_disk() -> int:
+    """Lookup tablolarını diskten bellek önbelleğine koyar (açılışta, ilk load_* çağrılarından önce)."""
+    seeded = 0
+    for name in _LOOKUP_TABLES:
+        entry = disk_cache.read(name)
+        if entry is None:
+            continue
+        version, saved_at, value = entry
+        _lookup_cache.put(name, version, value, age=time.time() - saved_at)
+        seeded += 1
+    return seeded
+
+
+def revalidate_disk_cache() -> dict[str, object]:
+    """
+    Disk kayıtlarını sunucu sürümleriyle karşılaştırır; değişenleri indirip diske ve lookup önbelleğine
+    yazar. Dönüş: içeriği değişen kayıtlar (ad -> yeni değer). Ağ hatasında {} (disk olduğu gibi kalır).
+    """
+    if not disk_cache.ENABLED:
+        return {}
+    items = _disk_items()
+    names = list(items)
+    try:
+        versions = _server_versions(names)
+    except Exception as e:
+        print(f"[DISK CACHE] sürümler alınamadı -> {e!r}")
+        return {}
+
+    changed: dict[str, object] = {}
+    now = time.time()
+    for name in names:
+        # sürüm anahtarı yoksa (henüz save_* ile yazılmamış) her doğrulamada indirilir; anahtarı yazanlar oluşturur
+        version = versions.get(name)
+        entry = base = disk_cache.read(name)
+        if entry is not None and version is not None and entry[0] == version:
+            if name == "last_update" or now - entry[1] < DISK_MAX_AGE:
+                continue
+            base = None  # çok eski: tam indirme
+        try:
+            value = _download(name, version, base)
+        except Exception as e:
+            print(f"[DISK CACHE] {name}: indirilemedi -> {e!r}")
+            continue
+        disk_cache.write(name, version, value)
+        if name in _LOOKUP_TABLES:
+            _lookup_cache.put(name, version, value)
+        if entry is None or not _same(entry[2], value):
+            changed[name] = value
+    return changed
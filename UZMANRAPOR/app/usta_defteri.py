@@ -1,10 +1,12 @@
 from __future__ import annotations
-from typing import Optional, List, Dict
+import threading
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
 import pandas as pd
 from app.sql_api_client import get_sql_connection
-from PySide6.QtCore import Qt, QDate, QTimer
+from app.storage import invalidate_lookup_cache, read_frame
+from PySide6.QtCore import Qt, QDate, QObject, QTimer, Signal
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox,
     QPushButton, QDateEdit, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox, QGroupBox,
@@ -14,6 +16,42 @@ from PySide6.QtWidgets import (
 
 IS_TANIM_LIST = ["DÜĞÜM", "TAKIM", "BAKIM", "DİĞER"]
 
+# Tablo sayfa sayfa dolar (Id DESC, keyset): ilk sayfa hemen gelir, kalanlar kaydırdıkça
+PAGE_SIZE = 200
+# ilk sayfada "son görülen Id" yerine gönderilir
+_ID_MAX = 2**63 - 1
+
+# UZMANRAPOR_API/queries.py::_USTA_DEFTERI_COLUMNS ile aynı kalmalı: isimli sorgu (usta_defteri.page vb.) ile
+# buradaki filtreli sorgunun sayfaları aynı tabloda birleşir. Client API modüllerini import etmez (ayrı dağıtılır).
+_USTA_COLUMNS = """
+    Id AS Id,
+    CONVERT(varchar(10), Tarih, 104) AS Tarih,
+    Vardiya AS Saat,
+    Tezgah AS Tezgah,
+    KokTip AS Takdir,
+    HasisNo AS [Haşıl İşEm],
+    LeventNo AS Levent,
+    EtiketNo AS Etiket,
+    DokumaIsEmri AS [Dokuma İş Emri],
+    Metre AS Metre,
+    HasilNo AS [Haşıl no],
+    IsTanimi AS [İş tanımı],
+    YapilanIslem AS [Yapılan işlem],
+    IslemYapan AS [İşlem Yapan],
+    Aciklama AS [Açıklama]
+"""
+
+_FIELD_COLUMNS = {
+    "Tezgah": "Tezgah",
+    "KökTip": "KokTip",
+    "Haşıl İş Emri": "HasisNo",
+    "Dokuma İş Emri": "DokumaIsEmri",
+    "Levent No": "LeventNo",
+    "Etiket No": "EtiketNo",
+    "İş Tanımı": "IsTanimi",
+    "İşlem Yapan": "IslemYapan",
+}
+
 
 def _vardiya_str(now_qtime) -> str:
     h = now_qtime.hour()
@@ -32,14 +70,17 @@ def _ensure_db():
     return
 
 
-def _df_to_table(table: QTableWidget, df: pd.DataFrame):
-    table.setRowCount(0)
-    if df is None or df.empty:
+def _df_to_table(table: QTableWidget, df: pd.DataFrame, append: bool = False):
+    # append=True: mevcut satırlar korunur, df alta eklenir (sonraki sayfa)
+    offset = table.rowCount() if append else 0
+    if not append:
         table.setRowCount(0)
+    if df is None or df.empty:
         return
-    table.setRowCount(len(df))
-    table.setColumnCount(len(df.columns))
-    table.setHorizontalHeaderLabels([str(c) for c in df.columns])
+    table.setRowCount(offset + len(df))
+    if not append:
+        table.setColumnCount(len(df.columns))
+        table.setHorizontalHeaderLabels([str(c) for c in df.columns])
     for r in range(len(df)):
         for c, col in enumerate(df.columns):
             v = df.iloc[r, c]
@@ -49,13 +90,104 @@ def _df_to_table(table: QTableWidget, df: pd.DataFrame):
                 it.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
             else:
                 it.setTextAlignment(Qt.AlignCenter)
-            table.setItem(r, c, it)
+            table.setItem(offset + r, c, it)
     table.resizeColumnsToContents()
     if table.columnCount() > 0:
         w = max(120, table.columnWidth(0))
         table.setColumnWidth(0, w)
 
 
+# hızlı bul: tabloda görünen kolonların (metin halleriyle) herhangi birinde geçen
+_QUICK_COLUMNS = [
+    "CONVERT(varchar(10), Tarih, 104)",
+    "Vardiya",
+    "Tezgah",
+    "KokTip",
+    "HasisNo",
+    "LeventNo",
+    "EtiketNo",
+    "DokumaIsEmri",
+    "CAST(Metre AS varchar(20))",
+    "HasilNo",
+    "IsTanimi",
+    "YapilanIslem",
+    "IslemYapan",
+    "Aciklama",
+]
+
+
+def _usta_filter(start: Optional[str], end: Optional[str], field: Optional[str],
+                 value: Optional[str], quick: Optional[str] = None) -> Tuple[str, list, bool]:
+    """
+    Rapor filtresi -> (" AND ..." koşulları, parametreler, sadece tarih aralığı mı).
+    Tarihler JSON ile gittiğinden _insert_row'daki gibi 'YYYY-MM-DD' metni olarak verilir.
+    quick: hızlı bul metni; sunucuda LIKE ile aranır, sayfalama diğer filtrelerle aynı çalışır.
+    """
+    where = ""
+    params: list[object] = []
+    start_date = end_date = None
+
+    if start:
+        try:
+            start_date = datetime.strptime(start, "%d.%m.%Y").date()
+            where += " AND Tarih >= ?"
+            params.append(start_date.strftime("%Y-%m-%d"))
+        except Exception:
+            pass
+
+    if end:
+        try:
+            end_date = datetime.strptime(end, "%d.%m.%Y").date()
+            where += " AND Tarih <= ?"
+            params.append(end_date.strftime("%Y-%m-%d"))
+        except Exception:
+            pass
+
+    has_field = False
+    if field and value:
+        col = _FIELD_COLUMNS.get(field)
+        if col:
+            where += f" AND {col} LIKE ?"
+            params.append(f"%{value}%")
+            has_field = True
+
+    if quick:
+        where += " AND (" + " OR ".join(f"{col} LIKE ?" for col in _QUICK_COLUMNS) + ")"
+        params.extend([f"%{quick}%"] * len(_QUICK_COLUMNS))
+        has_field = True
+
+    date_only = bool(start_date and end_date) and not has_field
+    return where, params, date_only
+
+
+class _CountSignal(QObject):
+    # (sayfalama kuşağı, toplam kayıt; hata -> -1) arka plan thread'inden GUI thread'ine
+    done = Signal(int, int)
+
+
+class _ExportSignal(QObject):
+    # (başarılı mı, mesaj) arka plan thread'inden GUI thread'ine
+    done = Signal(bool, str)
+
+
+def _write_usta_excel(df: pd.DataFrame, out: str) -> None:
+    if "Id" in df.columns:
+        df = df.drop(columns=["Id"])
+    import xlsxwriter
+    with pd.ExcelWriter(out, engine="xlsxwriter", datetime_format="dd.mm.yyyy") as xw:
+        sheet = "USTA_DEFTERI"
+        df.to_excel(xw, index=False, sheet_name=sheet)
+        ws = xw.sheets[sheet]
+        wb = xw.book
+        header_fmt = wb.add_format({"bold": True, "bg_color": "#F2F2F2", "valign": "vcenter"})
+        ws.set_row(0, 22, header_fmt)
+        for c, col in enumerate(df.columns):
+            series_as_str = df[col].astype(str).replace("nan", "")
+            max_len = max(len(str(col)), *(len(s) for s in series_as_str.values))
+            ws.set_column(c, c, min(max_len + 2, 60))
+        ws.freeze_panes(1, 0)
+
+
 def _strip_trailing_dot_zero(val) -> str:
     if val is None:
         return ""
@@ -96,6 +228,24 @@ class UstaDefteriWidget(QWidget):
         """)
         root.addWidget(self.tbl, 1)
 
+        # sayfalama durumu (bkz. _start_paging)
+        self._raw_df: Optional[pd.DataFrame] = None
+        self._page_gen = 0
+        # son rapor filtresi (başlangıç, bitiş, alan, değer); hızlı bul buna eklenir
+        self._page_filter: Tuple[Optional[str], ...] = (None, None, None, None)
+        self._page_where = ""
+        self._page_params: list[object] = []
+        self._page_date_only = False
+        self._last_id = _ID_MAX
+        self._has_more = False
+        self._page_loading = False
+        self._total: Optional[int] = None
+        self._count_signal = _CountSignal(self)
+        self._count_signal.done.connect(self._on_count_done)
+        self._export_signal = _ExportSignal(self)
+        self._export_signal.done.connect(self._on_export_done)
+        self.tbl.verticalScrollBar().valueChanged.connect(self._on_table_scroll)
+
         self._configure_table_look()
         self._apply_beauty_theme()
 
@@ -131,7 +281,7 @@ class UstaDefteriWidget(QWidget):
         """
         with self._conn() as c:
             cur = c.cursor()
-            cur.execute(sql, (list_name,))
+            cur.execute_named("usta_defteri.lookup", (list_name,), fallback=sql)
             rows = cur.fetchall()
         out: List[Dict[str, object]] = []
         for r in rows:
@@ -465,9 +615,18 @@ class UstaDefteriWidget(QWidget):
         grid.addWidget(self.btn_getir, 5, 0, 1, 2)
         grid.addWidget(self.btn_excel, 6, 0, 1, 2)
 
+        self.lbl_count = QLabel("")
+        self.lbl_count.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        grid.addWidget(self.lbl_count, 7, 0, 1, 2)
+
         self.btn_getir.clicked.connect(self._run_report)
         self.btn_excel.clicked.connect(self._export_excel)
-        self.ed_q.textChanged.connect(self._apply_quick_filter)
+        # her tuşta değil, yazma durunca bir kez sorgula
+        self._quick_timer = QTimer(self)
+        self._quick_timer.setSingleShot(True)
+        self._quick_timer.setInterval(300)
+        self._quick_timer.timeout.connect(self._apply_quick_filter)
+        self.ed_q.textChanged.connect(self._quick_timer.start)
 
         return box
 
@@ -524,75 +683,122 @@ class UstaDefteriWidget(QWidget):
             cur = c.cursor()
             cur.execute(sql, [mapped[name] for name in cols])
             c.commit()
+        invalidate_lookup_cache("etiket")
 
     def _delete_by_rowid(self, rowid: int):
         with self._conn() as c:
             cur = c.cursor()
             cur.execute("DELETE FROM [UzmanRaporDB].[dbo].[UstaDefteri] WHERE Id = ?", (rowid,))
             c.commit()
-
-    def _select(self, start: Optional[str] = None, end: Optional[str] = None,
-                field: Optional[str] = None, value: Optional[str] = None) -> pd.DataFrame:
-        sql = """
-        SELECT
-            Id AS Id,
-            CONVERT(varchar(10), Tarih, 104) AS Tarih,
-            Vardiya AS Saat,
-            Tezgah AS Tezgah,
-            KokTip AS Takdir,
-            HasisNo AS [Haşıl İşEm],
-            LeventNo AS Levent,
-            EtiketNo AS Etiket,
-            DokumaIsEmri AS [Dokuma İş Emri],
-            Metre AS Metre,
-            HasilNo AS [Haşıl no],
-            IsTanimi AS [İş tanımı],
-            YapilanIslem AS [Yapılan işlem],
-            IslemYapan AS [İşlem Yapan],
-            Aciklama AS [Açıklama]
-        FROM [UzmanRaporDB].[dbo].[UstaDefteri]
-        WHERE 1 = 1
-        """
-        params: list[object] = []
-
-        if start:
+        invalidate_lookup_cache("etiket")
+
+    # -------------------- Sayfalı liste (keyset, Id DESC) --------------------
+    def _start_paging(self, start: Optional[str] = None, end: Optional[str] = None,
+                      field: Optional[str] = None, value: Optional[str] = None):
+        """Listeyi filtreyle (+ hızlı bul) baştan kurar: ilk sayfa hemen, toplam kayıt sayısı arka planda."""
+        self._page_gen += 1
+        self._page_filter = (start, end, field, value)
+        quick = self.ed_q.text().strip() or None
+        self._page_where, self._page_params, self._page_date_only = _usta_filter(start, end, field, value, quick)
+        self._last_id = _ID_MAX
+        self._has_more = True
+        self._total = None
+        self._raw_df = None
+        self.tbl.setRowCount(0)
+        self._fetch_next_page()
+        self._start_count()
+
+    def _fetch_next_page(self):
+        if not self._has_more or self._page_loading:
+            return
+        self._page_loading = True
+        try:
+            sql = f"""
+            SELECT TOP (?) {_USTA_COLUMNS}
+            FROM [UzmanRaporDB].[dbo].[UstaDefteri]
+            WHERE 1 = 1{self._page_where} AND Id < ?
+            ORDER BY Id DESC
+            """
+            params = (PAGE_SIZE, *self._page_params, self._last_id)
+            # filtresiz ve sadece tarih aralıklı sayfalar sunucu kataloğundan çalışır
+            named = None
+            if not self._page_where:
+                named = "usta_defteri.page"
+            elif self._page_date_only:
+                named = "usta_defteri.range_page"
+
+            with self._conn() as c:
+                cur = c.cursor()
+                if named:
+                    cur.execute_named(named, params, columnar=True, fallback=sql)
+                else:
+                    cur.execute(sql, params, columnar=True)
+                df = cur.fetch_dataframe()
+        finally:
+            self._page_loading = False
+
+        self._has_more = len(df) >= PAGE_SIZE
+        if df.empty:
+            self._update_count_label()
+            return
+        self._last_id = int(df["Id"].iloc[-1])
+        first = self._raw_df is None or self._raw_df.empty
+        self._raw_df = df if first else pd.concat([self._raw_df, df], ignore_index=True)
+        _df_to_table(self.tbl, df, append=not first)
+        self._update_count_label()
+
+    def _on_table_scroll(self, value: int):
+        if not self._has_more or self._page_loading:
+            return
+        if value >= self.tbl.verticalScrollBar().maximum() - 5:
+            QTimer.singleShot(0, self._fetch_next_page)
+
+    def _start_count(self):
+        gen = self._page_gen
+        sql = f"SELECT COUNT(*) AS Adet FROM [UzmanRaporDB].[dbo].[UstaDefteri] WHERE 1 = 1{self._page_where}"
+        params = tuple(self._page_params)
+        named = None
+        if not self._page_where:
+            named = "usta_defteri.count"
+        elif self._page_date_only:
+            named = "usta_defteri.range_count"
+        signal = self._count_signal
+
+        def work():
             try:
-                start_date = datetime.strptime(start, "%d.%m.%Y").date()
-                sql += " AND Tarih >= ?"
-                params.append(start_date)
-            except Exception:
-                pass
-
-        if end:
+                with get_sql_connection() as c:
+                    cur = c.cursor()
+                    if named:
+                        cur.execute_named(named, params, fallback=sql)
+                    else:
+                        cur.execute(sql, params)
+                    row = cur.fetchone()
+                total = int(row[0]) if row else 0
+            except Exception as e:
+                print("[USTA DEFTERİ] kayıt sayısı alınamadı:", e)
+                total = -1
             try:
-                end_date = datetime.strptime(end, "%d.%m.%Y").date()
-                sql += " AND Tarih <= ?"
-                params.append(end_date)
-            except Exception:
+                signal.done.emit(gen, total)
+            except RuntimeError:
+                # widget kapandı
                 pass
 
-        if field and value:
-            col = {
-                "Tezgah": "Tezgah",
-                "KökTip": "KokTip",
-                "Haşıl İş Emri": "HasisNo",
-                "Dokuma İş Emri": "DokumaIsEmri",
-                "Levent No": "LeventNo",
-                "Etiket No": "EtiketNo",
-                "İş Tanımı": "IsTanimi",
-                "İşlem Yapan": "IslemYapan",
-            }.get(field)
-            if col:
-                sql += f" AND {col} LIKE ?"
-                params.append(f"%{value}%")
+        threading.Thread(target=work, name="usta-defteri-count", daemon=True).start()
 
-        with self._conn() as c:
-            cur = c.cursor()
-            cur.execute(sql, tuple(params)) if params else cur.execute(sql)
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description]
-            df = pd.DataFrame.from_records(rows, columns=cols)
-        return df
+    def _on_count_done(self, gen: int, total: int):
+        if gen != self._page_gen:
+            return
+        self._total = total if total >= 0 else None
+        self._update_count_label()
+
+    def _update_count_label(self):
+        loaded = 0 if self._raw_df is None else len(self._raw_df)
+        if self._total is not None:
+            self.lbl_count.setText(f"Kayıt: {loaded} / {self._total}")
+        elif self._has_more:
+            self.lbl_count.setText(f"Kayıt: {loaded}+")
+        else:
+            self.lbl_count.setText(f"Kayıt: {loaded}")
 
     def _clear_form(self):
         if self.cmb_tezgah.count():
@@ -734,81 +940,56 @@ class UstaDefteriWidget(QWidget):
         end = self.dt_son.date().toString("dd.MM.yyyy")
         field = self.cmb_field.currentText()
         value = self.ed_value.text().strip()
-        df = self._select(start, end, field if value else None, value if value else None)
-        self._raw_df = df
-        _df_to_table(self.tbl, df)
+        self._start_paging(start, end, field if value else None, value if value else None)
 
     def _export_excel(self):
-        if not hasattr(self, "_raw_df") or self._raw_df is None or self._raw_df.empty:
+        if self._raw_df is None or self._raw_df.empty:
             QMessageBox.information(self, "Bilgi", "Önce raporu alın.")
             return
         out, _ = QFileDialog.getSaveFileName(self, "Excel'e aktar", "usta_defteri.xlsx", "Excel Files (*.xlsx)")
         if not out:
             return
-        df = self._raw_df.copy()
-        if "Id" in df.columns:
-            df = df.drop(columns=["Id"])
-        try:
-            import xlsxwriter
-            with pd.ExcelWriter(out, engine="xlsxwriter", datetime_format="dd.mm.yyyy") as xw:
-                sheet = "USTA_DEFTERI"
-                df.to_excel(xw, index=False, sheet_name=sheet)
-                ws = xw.sheets[sheet]
-                wb = xw.book
-                header_fmt = wb.add_format({"bold": True, "bg_color": "#F2F2F2", "valign": "vcenter"})
-                ws.set_row(0, 22, header_fmt)
-                for c, col in enumerate(df.columns):
-                    series_as_str = df[col].astype(str).replace("nan", "")
-                    max_len = max(len(str(col)), *(len(s) for s in series_as_str.values))
-                    ws.set_column(c, c, min(max_len + 2, 60))
-                ws.freeze_panes(1, 0)
-            QMessageBox.information(self, "Excel", "Dosya oluşturuldu.")
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Excel'e aktarılamadı:\n{e}")
-
-    def _apply_quick_filter(self):
-        if not hasattr(self, "_raw_df"):
-            return
-        q = self.ed_q.text().strip().lower()
-        if not q:
-            _df_to_table(self.tbl, self._raw_df)
-            return
-        df = self._raw_df.copy()
-        mask = pd.Series([False] * len(df))
-        for col in df.columns:
-            mask = mask | df[col].astype(str).str.lower().str.contains(q, na=False)
-        _df_to_table(self.tbl, df[mask])
-
-    def _load_last_n(self, n: int = 200):
+        # tüm sayfalar yüklüyse eldeki çerçeve; değilse kaydırılmamış sayfalar dahil filtre aralığı tek akışla
+        loaded = None if self._has_more else self._raw_df.copy()
         sql = f"""
-        SELECT TOP {n}
-               Id,
-               CONVERT(varchar(10), Tarih, 104) AS Tarih,
-               Vardiya AS Saat,
-               Tezgah AS Tezgah,
-               KokTip AS Takdir,
-               HasisNo AS [Haşıl İşEm],
-               LeventNo AS Levent,
-               EtiketNo AS Etiket,
-               DokumaIsEmri AS [Dokuma İş Emri],
-               Metre AS Metre,
-               HasilNo AS [Haşıl no],
-               IsTanimi AS [İş tanımı],
-               YapilanIslem AS [Yapılan işlem],
-               IslemYapan AS [İşlem Yapan],
-               Aciklama AS [Açıklama]
+        SELECT {_USTA_COLUMNS}
         FROM [UzmanRaporDB].[dbo].[UstaDefteri]
-        ORDER BY Id DESC;
+        WHERE 1 = 1{self._page_where}
+        ORDER BY Id DESC
         """
-        with self._conn() as c:
-            cur = c.cursor()
-            cur.execute(sql)
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description]
-            df = pd.DataFrame.from_records(rows, columns=cols)
+        params = tuple(self._page_params)
+        signal = self._export_signal
+        self.btn_excel.setEnabled(False)
+
+        def work():
+            try:
+                df = loaded if loaded is not None else read_frame(sql, params, stream=True)
+                _write_usta_excel(df, out)
+                ok, msg = True, "Dosya oluşturuldu."
+            except Exception as e:
+                ok, msg = False, f"Excel'e aktarılamadı:\n{e}"
+            try:
+                signal.done.emit(ok, msg)
+            except RuntimeError:
+                # widget kapandı
+                pass
+
+        threading.Thread(target=work, name="usta-defteri-export", daemon=True).start()
+
+    def _on_export_done(self, ok: bool, msg: str):
+        self.btn_excel.setEnabled(True)
+        if ok:
+            QMessageBox.information(self, "Excel", msg)
+        else:
+            QMessageBox.critical(self, "Hata", msg)
+
+    def _apply_quick_filter(self):
+        # hızlı bul sunucu tarafı filtredir: son rapor filtresiyle birlikte baştan sayfalanır
+        self._start_paging(*self._page_filter)
 
-        self._raw_df = df
-        _df_to_table(self.tbl, df)
+    def _load_last_n(self):
+        # en yeni kayıtlar (filtresiz ilk sayfa)
+        self._start_paging()
 
     def _etiket_exists(self, etiket: str) -> bool:
         if not etiket:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app paketi UZMANRAPOR kökünden import edilir (main_gui.py gibi)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
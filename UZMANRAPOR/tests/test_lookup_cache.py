@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from app import storage
+
+
+@pytest.fixture
+def cache():
+    return storage._LookupCache()
+
+
+def test_hit_returns_copy(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return ["A1", "A2"]
+
+    first = cache.get("blocked", fetch, [])
+    first.append("X")
+    assert cache.get("blocked", fetch, []) == ["A1", "A2"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_fetch_error_falls_back_and_is_not_cached(cache):
+    assert cache.get("blocked", lambda: 1 / 0, []) == []
+    assert cache.stats()["entries"] == 0
+
+    cache.get("blocked", lambda: ["A1"], [])
+    cache.invalidate()
+    assert cache.get("blocked", lambda: 1 / 0, []) == []
+    assert cache.stats()["errors"] == 2
+
+
+def test_stale_value_served_when_refresh_fails(cache):
+    cache.get("blocked", lambda: ["A1"], [])
+    cache.ttl["blocked"] = 30
+    cache._entries["blocked"] = (0.0, *cache._entries["blocked"][1:])  # süresi dolmuş
+    assert cache.get("blocked", lambda: 1 / 0, []) == ["A1"]
+
+
+def _racing_fetch(value, during):
+    """fetch() sonucu dönmeden önce `during` çalışır (indirme sürerken başka thread'in yaptığı iş)."""
+
+    def fetch():
+        during()
+        return value
+
+    return fetch
+
+
+def test_invalidate_during_fetch_discards_result(cache):
+    fetch = _racing_fetch(["OLD"], lambda: cache.invalidate("blocked"))
+    assert cache.get("blocked", fetch, []) == ["OLD"]  # çağıran yine de sonucu alır
+    assert cache.stats()["entries"] == 0
+    assert cache.get("blocked", lambda: ["NEW"], []) == ["NEW"]
+
+
+def test_invalidating_other_table_also_discards(cache):
+    # sayaç tek: başka tablonun geçersiz kılınması da (güvenli tarafta) sonucu saklatmaz
+    fetch = _racing_fetch(["OLD"], lambda: cache.invalidate("dummy"))
+    cache.get("blocked", fetch, [])
+    assert "blocked" not in cache._entries
+
+
+def test_put_during_fetch_wins(cache):
+    fetch = _racing_fetch(["OLD"], lambda: cache.put("blocked", "v2", ["DISK"]))
+    cache.get("blocked", fetch, [])
+    assert cache.get("blocked", lambda: ["UNUSED"], []) == ["DISK"]
+
+
+def test_threads_never_cache_value_read_before_invalidate(cache):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait(5)
+        return ["BEFORE-SAVE"]
+
+    t = threading.Thread(target=cache.get, args=("blocked", slow_fetch, []))
+    t.start()
+    assert started.wait(5)
+    cache.invalidate("blocked")  # save_blocked_looms
+    release.set()
+    t.join(5)
+    assert cache.get("blocked", lambda: ["AFTER-SAVE"], []) == ["AFTER-SAVE"]
+
+
+def test_version_check_skips_download(cache, monkeypatch):
+    monkeypatch.setattr(storage, "LOOKUP_VALIDATE", True)
+    monkeypatch.setattr(storage, "_meta_get", lambda key: "v1")
+    cache.put("blocked", "v1", ["A1"])
+    cache._entries["blocked"] = (0.0, *cache._entries["blocked"][1:])
+    assert cache.get("blocked", lambda: pytest.fail("indirilmemeliydi"), []) == ["A1"]
+    assert cache.stats()["validated"] == 1
+
+    monkeypatch.setattr(storage, "_meta_get", lambda key: "v2")
+    cache._entries["blocked"] = (0.0, *cache._entries["blocked"][1:])
+    assert cache.get("blocked", lambda: ["A2"], []) == ["A2"]
+    assert cache._entries["blocked"][1] == "v2"
+
+
+def test_zero_ttl_disables_cache(cache):
+    cache.ttl["blocked"] = 0
+    cache.get("blocked", lambda: ["A1"], [])
+    cache.put("blocked", None, ["A1"])
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,98 @@
+import datetime as dt
+import io
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import snapshot_format as sf
+
+# pyarrow opsiyonel (columnar extra); yoksa sadece pickle/hex biçimleri denenir
+needs_arrow = pytest.mark.skipif(sf.pa is None, reason="pyarrow kurulu değil")
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "Tezgah": ["T1", "T2", None],
+            "Metre": [1.5, np.nan, 3.0],
+            "Adet": np.array([1, 2, 3], dtype="int64"),
+            "Tarih": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+            "Aktif": [True, False, True],
+        }
+    )
+
+
+@needs_arrow
+@pytest.mark.parametrize("codec", ["zstd", "lz4", "none"])
+def test_arrow_round_trip(codec):
+    df = _frame()
+    data = sf.encode(df, codec=codec)
+    assert data.startswith(sf.MAGIC + bytes([sf.FORMAT_ARROW]))
+    pd.testing.assert_frame_equal(sf.decode(data), df)
+
+
+@needs_arrow
+def test_object_column_keeps_none_and_dtype():
+    df = pd.DataFrame({"Not": ["a", None, "c"]}, dtype=object)
+    out = sf.decode(sf.encode(df))
+    assert out["Not"].dtype == object
+    assert out["Not"].tolist() == ["a", None, "c"]
+
+
+@needs_arrow
+def test_mixed_object_column_is_pickled_per_cell():
+    df = pd.DataFrame({"Karisik": [1, "iki", {"uc": 3}, dt.date(2024, 1, 4)], "Sayi": [1, 2, 3, 4]})
+    data = sf.encode(df)
+    assert sf.describe(data)["pickled"] == ["Karisik"]
+    out = sf.decode(data)
+    assert out["Karisik"].tolist() == df["Karisik"].tolist()
+    assert out["Sayi"].tolist() == [1, 2, 3, 4]
+
+
+def test_duplicate_columns_fall_back_to_pickle():
+    df = pd.DataFrame([[1, 2]], columns=["A", "A"])
+    data = sf.encode(df)
+    assert data[len(sf.MAGIC)] == sf.FORMAT_PICKLE
+    pd.testing.assert_frame_equal(sf.decode(data), df)
+
+
+@needs_arrow
+def test_index_is_preserved():
+    df = _frame().set_index("Tezgah")
+    pd.testing.assert_frame_equal(sf.decode(sf.encode(df)), df)
+
+
+@needs_arrow
+def test_empty_frame():
+    df = pd.DataFrame({"A": pd.Series([], dtype="int64")})
+    pd.testing.assert_frame_equal(sf.decode(sf.encode(df)), df)
+
+
+@needs_arrow
+def test_describe_reads_metadata_only():
+    info = sf.describe(sf.encode(_frame()))
+    assert info["format"] == sf.FORMAT_ARROW
+    assert info["rows"] == 3
+    assert info["columns"] == ["Tezgah", "Metre", "Adet", "Tarih", "Aktif"]
+    assert sf.describe(b"not a snapshot")["format"] is None
+
+
+@pytest.mark.parametrize("data", [b"", b"URSNAP", b"XXXXXX\x01abc", sf.MAGIC + b"\x09abc"])
+def test_decode_rejects_unknown_data(data):
+    with pytest.raises(sf.SnapshotFormatError):
+        sf.decode(data)
+
+
+def test_legacy_hex_round_trip():
+    df = _frame()
+    pd.testing.assert_frame_equal(sf.decode_legacy_hex(sf.encode_legacy_hex(df)), df)
+
+
+def test_legacy_hex_written_by_old_clients_still_reads():
+    df = _frame()
+    buf = io.BytesIO()
+    df.to_pickle(buf)
+    old = zlib.compress(buf.getvalue(), level=9).hex()
+    pd.testing.assert_frame_equal(sf.decode_legacy_hex(old), df)
@@ -0,0 +1,398 @@
+# backends.py
+"""
+Veritabanı arka uçları. main.py bağlantıyı ve "bağlantı bozuldu" sayılan sürücü hatalarını buradan alır.
+
+  UZMANRAPOR_BACKEND=mssql   (varsayılan) pyodbc + SQL Server
+  UZMANRAPOR_BACKEND=sqlite  yerel SQLite dosyası (`UZMANRAPOR_SQLITE_PATH`): fabrika DB'si olmadan API ve
+                             client'ı uçtan uca denemek / yük ölçmek için. Sentetik veri: `python synthdata.py`
+
+SQLite arka ucu client'ın gönderdiği T-SQL alt kümesini çevirir (`[db].[dbo].` önekleri, `TOP (n)`,
+`CONVERT(varchar, x, 104)`, `LEFT`, `SUBSTRING`, `LEN`, `ISNULL`, `SYSDATETIME()`/`SYSUTCDATETIME()`, `N'..'`,
+`sys.objects`/`OBJECT_ID`) ve iki stored procedure'ü Python'da taklit eder. Çeviri regex tabanlıdır ve bu
+repodaki sorgular için yazılmıştır; genel bir T-SQL çevirici değildir.
+"""
+from __future__ import annotations
+
+import abc
+import datetime as dt
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+
+class Backend(abc.ABC):
+    """main.py'nin kullandığı arayüz: connect() ve bağlantıyı havuzdan attıran hata tipleri."""
+
+    name = ""
+    # bu hatalardan sonra bağlantıya güvenilmez, havuza geri konmaz
+    disconnect_errors: tuple[type[BaseException], ...] = ()
+
+    @abc.abstractmethod
+    def connect(self) -> Any:
+        ...
+
+    def describe(self) -> dict[str, Any]:
+        return {"name": self.name}
+
+
+# ============================================================
+#  SQL SERVER (pyodbc)
+# ============================================================
+
+class MssqlBackend(Backend):
+    name = "mssql"
+
+    def __init__(self, conn_str: str, login_timeout: int = 10) -> None:
+        import pyodbc  # sqlite arka ucunda ODBC sürücüsü gerekmesin
+
+        # ODBC sürücü yöneticisi havuzu ile çift havuzlamayı engelle (ilk connect'ten önce)
+        pyodbc.pooling = False
+        self._pyodbc = pyodbc
+        self._conn_str = conn_str
+        self._login_timeout = login_timeout
+        self.disconnect_errors = (pyodbc.OperationalError, pyodbc.InterfaceError)
+
+    def connect(self) -> Any:
+        return self._pyodbc.connect(self._conn_str, timeout=self._login_timeout)
+
+
+# ============================================================
+#  SQLITE (çevrimdışı test / yük ölçümü)
+# ============================================================
+
+def _convert_date(raw: bytes) -> Any:
+    s = raw.decode("utf-8")
+    try:
+        return dt.date.fromisoformat(s[:10])
+    except ValueError:
+        return s
+
+
+def _convert_datetime(raw: bytes) -> Any:
+    s = raw.decode("utf-8")
+    try:
+        return dt.datetime.fromisoformat(s)
+    except ValueError:
+        return s
+
+
+# DATE / DATETIME2 bildirilen kolonlar pyodbc'deki gibi date / datetime döner (detect_types=PARSE_DECLTYPES)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME2", _convert_datetime)
+
+
+def _upper(v: Any) -> Any:
+    # SQLite'ın upper()'ı sadece ASCII; "düğüm" -> "DÜĞÜM" için Python
+    return v.upper() if isinstance(v, str) else v
+
+
+def _lower(v: Any) -> Any:
+    return v.lower() if isinstance(v, str) else v
+
+
+_NOW_LOCAL = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+_NOW_UTC = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+_CONVERT_STYLES = {
+    "104": "strftime('%d.%m.%Y', {})",
+    "103": "strftime('%d/%m/%Y', {})",
+    "108": "strftime('%H:%M:%S', {})",
+    "120": "strftime('%Y-%m-%d %H:%M:%S', {})",
+    "23": "date({})",
+}
+
+# sırası önemli: önce nesne önekleri, sonra fonksiyonlar
+_REWRITES: list[tuple[re.Pattern[str], Any]] = [
+    (re.compile(r"\bN'"), "'"),
+    (re.compile(r"(?:\[?\w+\]?\.)?\[?dbo\]?\.", re.IGNORECASE), ""),
+    (re.compile(r"\bsys\.objects\b", re.IGNORECASE), "sys_objects"),
+    (re.compile(r"\bOBJECT_ID\s*\(\s*('[^']*')\s*\)", re.IGNORECASE), r"\1"),
+    (
+        re.compile(r"\bCONVERT\s*\(\s*n?(?:var)?char\s*\(\s*\d+\s*\)\s*,\s*([\w\[\]]+)\s*,\s*(\d+)\s*\)", re.IGNORECASE),
+        lambda m: _CONVERT_STYLES.get(m.group(2), "CAST({} AS TEXT)").format(m.group(1)),
+    ),
+    (re.compile(r"\bLEFT\s*\(\s*([^,()]+?)\s*,", re.IGNORECASE), r"substr(\1, 1,"),
+    (re.compile(r"\bSUBSTRING\s*\(", re.IGNORECASE), "substr("),
+    (re.compile(r"\bLEN\s*\(", re.IGNORECASE), "length("),
+    (re.compile(r"\bISNULL\s*\(", re.IGNORECASE), "ifnull("),
+    (re.compile(r"\b(?:SYSDATETIME|GETDATE)\s*\(\s*\)", re.IGNORECASE), _NOW_LOCAL),
+    (re.compile(r"\b(?:SYSUTCDATETIME|GETUTCDATE)\s*\(\s*\)", re.IGNORECASE), _NOW_UTC),
+]
+
+# SELECT TOP (?) / TOP (n) / TOP n -> sonda LIMIT
+_TOP = re.compile(r"^(\s*SELECT\s+(?:DISTINCT\s+)?)TOP\s*(?:\(\s*(\?|\d+)\s*\)|(\d+))\s*", re.IGNORECASE)
+_EXEC = re.compile(r"^\s*EXEC(?:UTE)?\s+\[?(?P<proc>\w+)\]?(?P<args>.*)$", re.IGNORECASE | re.DOTALL)
+
+
+@functools.lru_cache(maxsize=1024)
+def translate_sql(query: str) -> tuple[str, int]:
+    """
+    T-SQL -> SQLite. (sql, TOP parametresinin indeksi veya -1); TOP (?) parametresi LIMIT'e taşındığı için
+    çağıran parametre listesinde o elemanı sona almalıdır.
+    """
+    sql = query
+    for pattern, repl in _REWRITES:
+        sql = pattern.sub(repl, sql)
+
+    top_param = -1
+    m = _TOP.match(sql)
+    if m:
+        limit = m.group(2) or m.group(3)
+        if limit == "?":
+            top_param = m.group(1).count("?")
+        sql = m.group(1) + sql[m.end():].rstrip().rstrip(";").rstrip() + f" LIMIT {limit}"
+    return sql, top_param
+
+
+def _move_param(params: Sequence[Any], index: int) -> list[Any]:
+    out = list(params)
+    if 0 <= index < len(out):
+        out.append(out.pop(index))
+    return out
+
+
+# ---------------- stored procedure taklitleri ----------------
+# SQL Server'daki prosedür gövdeleri repoda yok; client'ın beklediği sonuç şekli üretilir
+# (app/itema_settings.py: otomatik ayar tek satır, tip-özel ayar 0..n satır, ITEMA kolonlarıyla birleşir).
+
+_MATCH_COLUMNS = {
+    "id",
+    "orgu_tipi",
+    "cozgu1_aralik",
+    "atki1_aralik",
+    "cozgusiklik_aralik",
+    "atkisiklik_aralik",
+    "dokunabilirlik_aralik",
+    "tecrube_sayisi",
+}
+
+
+def _sp_itema_otomatik_ayar(conn: sqlite3.Connection, params: list[Any]) -> tuple[list[str], list[tuple]]:
+    """
+    @tip -> tek satır ITEMA ayarı. Tipin örgü özellikleri prosedüre gelmediği için Makine_Ayar_Tablosu'nun
+    en tecrübeli satırları arasından tip koduna göre sabit (crc32) bir satır seçilir.
+    """
+    tip = str(params[0]) if params else ""
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(Makine_Ayar_Tablosu)") if r[1].lower() not in _MATCH_COLUMNS]
+    candidates = conn.execute(
+        f"SELECT {', '.join(cols)} FROM Makine_Ayar_Tablosu ORDER BY TECRUBE_SAYISI DESC, Id LIMIT 32"
+    ).fetchall()
+    if not candidates:
+        return ["tip", *cols], []
+    row = candidates[zlib.crc32(tip.encode("utf-8")) % len(candidates)]
+    return ["tip", *cols], [(tip, *row)]
+
+
+def _sp_itema_tip_ozel_ayar(conn: sqlite3.Connection, params: list[Any]) -> tuple[list[str], list[tuple]]:
+    """@tip -> tipe özel (manuel) ayar satırları."""
+    cur = conn.execute("SELECT * FROM ItemaAyar WHERE tip = ? ORDER BY sira_no", [params[0] if params else None])
+    return [d[0] for d in cur.description], cur.fetchall()
+
+
+_PROCS: dict[str, Callable[[sqlite3.Connection, list[Any]], tuple[list[str], list[tuple]]]] = {
+    "sp_itemaotomatikayar": _sp_itema_otomatik_ayar,
+    "sp_itematipozelayar": _sp_itema_tip_ozel_ayar,
+}
+
+# description tipi için önden okunan satır sayısı (pyodbc tipi kolon bildiriminden verir, SQLite vermez)
+_TYPE_PROBE_ROWS = 64
+
+
+class SqliteCursor:
+    """pyodbc.Cursor'ın main.py'de kullanılan kısmı (execute/executemany/fetch*/description/rowcount)."""
+
+    def __init__(self, conn: "SqliteConnection") -> None:
+        self._conn = conn
+        self._cur = conn.raw.cursor()
+        self._head: list[tuple] = []
+        self._rest: Iterator[tuple] | None = None
+        self.description: tuple[tuple[Any, ...], ...] | None = None
+        self.rowcount = -1
+        self.fast_executemany = False
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> "SqliteCursor":
+        sql, top_param = translate_sql(query)
+        params = _move_param(params or (), top_param)
+        m = _EXEC.match(sql)
+        if m:
+            proc = _PROCS.get(m.group("proc").lower())
+            if proc is None:
+                raise sqlite3.OperationalError(f"Could not find stored procedure '{m.group('proc')}'")
+            columns, rows = proc(self._conn.raw, params)
+            self._set_result(columns, rows)
+            return self
+
+        with self._conn.deadline():
+            self._cur.execute(sql, params)
+        self._after_execute()
+        return self
+
+    def executemany(self, query: str, seq_of_params: Sequence[Sequence[Any]]) -> "SqliteCursor":
+        sql, top_param = translate_sql(query)
+        with self._conn.deadline():
+            self._cur.executemany(sql, [_move_param(p, top_param) for p in seq_of_params])
+        self._after_execute()
+        return self
+
+    def _after_execute(self) -> None:
+        self.rowcount = self._cur.rowcount
+        if not self._cur.description:
+            self._set_result(None, [])
+            return
+        names = [d[0] for d in self._cur.description]
+        head = self._cur.fetchmany(_TYPE_PROBE_ROWS)
+        self._set_result(names, head, self._cur if len(head) == _TYPE_PROBE_ROWS else None)
+
+    def _set_result(self, columns: list[str] | None, head: list[tuple], rest: Any = None) -> None:
+        self._head = list(head)
+        self._rest = rest
+        if columns is None:
+            self.description = None
+            return
+        types: list[Any] = [None] * len(columns)
+        for row in self._head:
+            for i, v in enumerate(row):
+                if types[i] is None and v is not None:
+                    types[i] = type(v)
+            if all(t is not None for t in types):
+                break
+        # tüm önden okunan hücreleri NULL olan kolon: tip None (main hücre bazlı kodlar)
+        self.description = tuple((name, t, None, None, None, None, True) for name, t in zip(columns, types))
+
+    def fetchmany(self, size: int | None = None) -> list[tuple]:
+        size = 1 if size is None else size
+        out = self._head[:size]
+        del self._head[:size]
+        if len(out) < size and self._rest is not None:
+            with self._conn.deadline():
+                more = self._rest.fetchmany(size - len(out))
+            if not more:
+                self._rest = None
+            out.extend(more)
+        return out
+
+    def fetchone(self) -> tuple | None:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self) -> list[tuple]:
+        out, self._head = self._head, []
+        if self._rest is not None:
+            out.extend(self._rest.fetchall())
+            self._rest = None
+        return out
+
+    def close(self) -> None:
+        self._head = []
+        self._rest = None
+        self._cur.close()
+
+
+class SqliteConnection:
+    """pyodbc.Connection'ın main.py'de kullanılan kısmı. `timeout` sorgu zaman aşımıdır (sn, 0 = yok)."""
+
+    def __init__(self, raw: sqlite3.Connection) -> None:
+        self.raw = raw
+        # sqlite3 DML öncesi örtük BEGIN açar; commit/rollback pyodbc autocommit=False ile aynı
+        self.autocommit = False
+        self.timeout = 0
+
+    def cursor(self) -> SqliteCursor:
+        return SqliteCursor(self)
+
+    @contextmanager
+    def deadline(self) -> Iterator[None]:
+        """execute süresince zaman aşımı: süre dolunca SQLite sorguyu keser ("interrupted")."""
+        if not self.timeout:
+            yield
+            return
+        until = time.monotonic() + self.timeout
+        self.raw.set_progress_handler(lambda: time.monotonic() > until, 10000)
+        try:
+            yield
+        finally:
+            self.raw.set_progress_handler(None, 0)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+# şema dosyası CREATE TABLE IF NOT EXISTS kullanır; önceki sürümle oluşturulmuş dosyalara sonradan eklenen kolonlar
+_SQLITE_ADDED_COLUMNS = [
+    ("Snapshots", "Data", "BLOB"),
+]
+
+
+class SqliteBackend(Backend):
+    name = "sqlite"
+    # dosya bağlantısı ağdan kopmaz; hata sonrası bağlantı havuza geri konabilir
+    disconnect_errors = ()
+
+    def __init__(self, path: str, busy_timeout: float = 30.0) -> None:
+        # her bağlantı ayrı veritabanı olacağından ":memory:" kullanılamaz
+        self.path = os.path.abspath(path)
+        self.busy_timeout = busy_timeout
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # havuzdaki bağlantı farklı DB thread'lerinde (sırayla) kullanılır
+        )
+        # WAL: okuyucular yazanı beklemez (çok thread'li yük ölçümü)
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("PRAGMA synchronous=NORMAL")
+        raw.create_function("upper", 1, _upper, deterministic=True)
+        raw.create_function("lower", 1, _lower, deterministic=True)
+        return raw
+
+    def ensure_schema(self) -> None:
+        with self._lock:
+            if self._schema_ready:
+                return
+            with open(os.path.join(SQL_DIR, "sqlite_schema.sql"), encoding="utf-8") as f:
+                script = f.read()
+            raw = self._open()
+            try:
+                raw.executescript(script)
+                for table, column, decl in _SQLITE_ADDED_COLUMNS:
+                    if column not in {r[1] for r in raw.execute(f"PRAGMA table_info({table})")}:
+                        raw.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                raw.commit()
+            finally:
+                raw.close()
+            self._schema_ready = True
+
+    def connect(self) -> SqliteConnection:
+        self.ensure_schema()
+        return SqliteConnection(self._open())
+
+    def describe(self) -> dict[str, Any]:
+        return {"name": self.name, "path": self.path}
+
+
+def create_backend(name: str, conn_str: Callable[[], str], sqlite_path: str) -> Backend:
+    """UZMANRAPOR_BACKEND değerinden arka uç. conn_str sadece mssql için çağrılır."""
+    name = (name or "mssql").lower()
+    if name in {"mssql", "sqlserver", "pyodbc"}:
+        return MssqlBackend(conn_str())
+    if name == "sqlite":
+        return SqliteBackend(sqlite_path)
+    raise ValueError(f"Unknown UZMANRAPOR_BACKEND {name!r} (mssql, sqlite)")
@@ -0,0 +1,296 @@
+# bench.py
+"""
+UZMANRAPOR SQL API ölçüm betikleri.
+
+  python bench.py compression                   # çevrimdışı: sentetik snapshot/lookup boyut + süre
+  python bench.py compression --url http://host:8000 --token X
+                                                # canlı: aynı sorgu gzip'li / gzip'siz
+  python bench.py encode --rows 20000           # satır kodlama + JSON: hücre bazlı (eski) / kolon bazlı
+  python bench.py snapshot --rows 4000          # Snapshots biçimleri: boyut, kaydet/yükle süresi (Dinamik çerçevesi)
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import http.client
+import io
+import json
+import os
+import random
+import string
+import sys
+import time
+import zlib
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+CLIENT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "UZMANRAPOR")
+
+
+def _rand_word(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(n))
+
+
+def _synthetic_snapshot_payload(rows: int, seed: int = 7) -> bytes:
+    """Dinamik snapshot'ına benzer: DataFrame pickle -> zlib(9) -> hex -> /sql JSON cevabı."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    df = pd.DataFrame(
+        {
+            "Tezgah": [str(rng.randint(2201, 2460)) for _ in range(rows)],
+            "Tip": [f"{_rand_word(rng, 3)}-{rng.randint(100, 999)}" for _ in range(rows)],
+            "Levent": [str(rng.randint(1, 9000)) for _ in range(rows)],
+            "Kalan Metre": [round(rng.uniform(0, 4000), 1) for _ in range(rows)],
+            "Atkı Sıklığı": [rng.choice([18.0, 22.5, 24.0, 30.0]) for _ in range(rows)],
+            "Durum": [rng.choice(["ÇALIŞIYOR", "DURUŞ", "BOŞ"]) for _ in range(rows)],
+        }
+    )
+    buf = io.BytesIO()
+    df.to_pickle(buf)
+    data_hex = zlib.compress(buf.getvalue(), level=9).hex()
+    body = {"columns": ["DataHex"], "rows": [[data_hex]], "rowcount": 1}
+    return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def _synthetic_lookup_payload(rows: int, seed: int = 11) -> bytes:
+    """UstaDefteri benzeri satır bazlı JSON cevabı (columnar)."""
+    rng = random.Random(seed)
+    cols = ["Tarih", "Tezgah", "Usta", "Islem", "Aciklama"]
+    data = [
+        [f"2024-0{rng.randint(1, 9)}-{rng.randint(10, 28)}T0{rng.randint(0, 9)}:00:00",
+         rng.randint(2201, 2460), _rand_word(rng, 6), rng.choice(["DÜĞÜM", "ÇÖZGÜ", "AYAR"]),
+         _rand_word(rng, rng.randint(0, 20))]
+        for _ in range(rows)
+    ]
+    return json.dumps({"columns": cols, "rows": data, "rowcount": -1}).encode("utf-8")
+
+
+def _synthetic_usta_defteri(rows: int, seed: int = 13) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]]]:
+    """`SELECT * FROM dbo.UstaDefteri` benzeri (description, satırlar); pyodbc tipleriyle."""
+    import datetime as dt
+    import decimal
+
+    rng = random.Random(seed)
+    spec = [
+        ("Id", int), ("Tarih", dt.datetime), ("Vardiya", str), ("Tezgah", str), ("KokTip", str),
+        ("HasisNo", str), ("LeventNo", str), ("EtiketNo", str), ("DokumaIsEmri", str),
+        ("Metre", decimal.Decimal), ("HasilNo", str), ("IsTanimi", str), ("YapilanIslem", str),
+        ("IslemYapan", str), ("Aciklama", str),
+    ]
+    description = [(name, type_code, None, None, None, None, True) for name, type_code in spec]
+    base = dt.datetime(2024, 1, 1, 7, 0)
+    data = []
+    for i in range(rows):
+        data.append((
+            rows - i,
+            base + dt.timedelta(hours=rng.randint(0, 24 * 300)),
+            rng.choice(["07-15", "15-23", "23-07"]),
+            str(rng.randint(2201, 2460)),
+            f"{_rand_word(rng, 3)}-{rng.randint(100, 999)}",
+            str(rng.randint(10000, 99999)),
+            str(rng.randint(1, 9000)),
+            str(rng.randint(100000, 999999)),
+            str(rng.randint(100000, 999999)),
+            decimal.Decimal(f"{rng.uniform(0, 4000):.2f}"),
+            str(rng.randint(1, 40)),
+            rng.choice(["DÜĞÜM", "ÇÖZGÜ", "AYAR", "TEMİZLİK"]),
+            _rand_word(rng, rng.randint(5, 30)),
+            _rand_word(rng, 8),
+            None if rng.random() < 0.6 else _rand_word(rng, rng.randint(10, 60)),
+        ))
+    return description, data
+
+
+def _timed(fn: Callable[[], Any], repeat: int = 3) -> tuple[Any, float]:
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def _compression_offline(args: argparse.Namespace) -> None:
+    payloads = {
+        "snapshot": _synthetic_snapshot_payload(args.rows),
+        "lookup": _synthetic_lookup_payload(args.rows),
+    }
+    mbps = args.mbps * 1_000_000 / 8
+    print(f"{'yük':<10}{'yöntem':<12}{'bayt':>12}{'oran':>8}{'sıkıştır ms':>14}{'aç ms':>9}{'aktarım ms':>12}")
+    for name, raw in payloads.items():
+        print(f"{name:<10}{'ham':<12}{len(raw):>12}{1.0:>8.2f}{0:>14.1f}{0:>9.1f}{len(raw) / mbps * 1000:>12.1f}")
+        for level in (1, 5, 9):
+            comp, t_c = _timed(lambda: gzip.compress(raw, compresslevel=level))
+            _, t_d = _timed(lambda: gzip.decompress(comp))
+            print(
+                f"{'':<10}{'gzip-' + str(level):<12}{len(comp):>12}{len(raw) / len(comp):>8.2f}"
+                f"{t_c * 1000:>14.1f}{t_d * 1000:>9.1f}{len(comp) / mbps * 1000:>12.1f}"
+            )
+
+
+def _encode(args: argparse.Namespace) -> None:
+    import base64
+    import sys
+
+    from fastapi.encoders import jsonable_encoder
+
+    import main as api  # pyodbc gerekir (sunucu ortamı)
+
+    description, rows = _synthetic_usta_defteri(args.rows)
+    cols = [d[0] for d in description]
+
+    def legacy() -> bytes:
+        # önceki yol: hücre başına isinstance + jsonable_encoder + JSONResponse.render
+        data_rows = [
+            [base64.b64encode(bytes(v)).decode("ascii") if isinstance(v, (bytes, bytearray, memoryview)) else v
+             for v in row]
+            for row in rows
+        ]
+        content = jsonable_encoder({"columns": cols, "rows": data_rows, "rowcount": len(data_rows)})
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def columnwise_stdlib() -> bytes:
+        data_rows = api._encode_rows(description, rows)
+        body = {"columns": cols, "rows": data_rows, "rowcount": len(data_rows)}
+        return json.dumps(body, ensure_ascii=False, separators=(",", ":"), default=api._json_default).encode("utf-8")
+
+    def columnwise() -> bytes:
+        data_rows = api._encode_rows(description, rows)
+        return api._dumps({"columns": cols, "rows": data_rows, "rowcount": len(data_rows)})
+
+    cases = [("hücre bazlı + jsonable_encoder", legacy), ("kolon bazlı + json", columnwise_stdlib)]
+    if api.orjson is not None:
+        cases.append(("kolon bazlı + orjson", columnwise))
+    else:
+        print("orjson kurulu değil; sadece stdlib json ölçülüyor", file=sys.stderr)
+
+    reference = json.loads(legacy())
+    print(f"{args.rows} satır x {len(cols)} kolon")
+    print(f"{'yöntem':<34}{'ms (en iyi)':>12}{'bayt':>12}{'hız':>8}")
+    base_t = None
+    for name, fn in cases:
+        body, t = _timed(fn, args.repeat)
+        if json.loads(body) != reference:
+            raise SystemExit(f"{name}: çıktı eski yol ile aynı değil")
+        base_t = base_t or t
+        print(f"{name:<34}{t * 1000:>12.1f}{len(body):>12}{base_t / t:>7.1f}x")
+
+
+def _snapshot(args: argparse.Namespace) -> None:
+    import pandas as pd
+
+    import synthdata
+
+    sys.path.insert(0, os.path.abspath(args.client_root))
+    from app import snapshot_format as sf
+
+    df = synthdata.dinamik_frame(args.rows)
+    mem = int(df.memory_usage(deep=True).sum())
+
+    def parquet(compression: str) -> tuple[Callable[[], Any], Callable[[Any], Any]]:
+        def save() -> bytes:
+            buf = io.BytesIO()
+            df.to_parquet(buf, compression=compression)
+            return buf.getvalue()
+
+        return save, lambda b: pd.read_parquet(io.BytesIO(b))
+
+    # ad -> (kaydet, yükle, kayıt sunucuya hex metin olarak mı gider)
+    cases: dict[str, tuple[Callable[[], Any], Callable[[Any], Any], bool]] = {
+        "eski: pickle+zlib9+hex": (lambda: sf.encode_legacy_hex(df), sf.decode_legacy_hex, True),
+        "pickle+zlib1 (yedek)": (lambda: sf._encode_pickle(df), sf.decode, False),
+    }
+    if sf.pa is not None:
+        default = (sf.CODEC, sf.LEVEL or sf._DEFAULT_LEVELS.get(sf.CODEC))
+        for codec, level in (("none", None), ("lz4", None), ("zstd", 1), ("zstd", 3)):
+            label = f"arrow {codec}" + (f"({level})" if level else "") + (" *" if (codec, level) == default else "")
+            cases[label] = (lambda c=codec, lv=level: sf.encode(df, c, lv), sf.decode, False)
+        for compression in ("snappy", "zstd"):
+            save, load = parquet(compression)
+            cases[f"parquet {compression}"] = (save, load, False)
+    else:
+        print("pyarrow kurulu değil; kolon bazlı biçimler ölçülmüyor", file=sys.stderr)
+
+    print(f"{args.rows} satır x {len(df.columns)} kolon, bellekte {mem / 1e6:.1f} MB (* = varsayılan)")
+    print(f"{'biçim':<26}{'kayıt bayt':>12}{'istek bayt':>12}{'kaydet ms':>11}{'yükle ms':>10}{'boyut':>8}")
+    base = None
+    for name, (save, load, hex_text) in cases.items():
+        blob, t_save = _timed(save, args.repeat)
+        out, t_load = _timed(lambda: load(blob), args.repeat)
+        if not out.equals(df):
+            raise SystemExit(f"{name}: geri okunan çerçeve aynı değil")
+        size = len(blob)
+        # istek gövdesi: hex metin olduğu gibi, ikili veri base64 ({"$binary": ...})
+        upload = size if hex_text else (size + 2) // 3 * 4
+        base = base or size
+        print(f"{name:<26}{size:>12}{upload:>12}{t_save * 1000:>11.1f}{t_load * 1000:>10.1f}{size / base:>8.2f}")
+
+
+def _post(base_url: str, token: str, query: str, encoding: str | None) -> tuple[int, float, str]:
+    parts = urlsplit(base_url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = cls(parts.netloc, timeout=120)
+    headers = {"Content-Type": "application/json", "X-Token": token}
+    if encoding:
+        headers["Accept-Encoding"] = encoding
+    try:
+        t0 = time.perf_counter()
+        conn.request("POST", f"{parts.path.rstrip('/')}/sql", body=json.dumps({"query": query}), headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+        elapsed = time.perf_counter() - t0
+        if resp.status >= 400:
+            raise SystemExit(f"HTTP {resp.status}: {body[:200]!r}")
+        return len(body), elapsed, resp.getheader("Content-Encoding") or "-"
+    finally:
+        conn.close()
+
+
+def _compression_live(args: argparse.Namespace) -> None:
+    query = args.query or f"SELECT Data FROM dbo.Snapshots WHERE Name = '{args.name}'"
+    print(f"{'Accept-Encoding':<18}{'Content-Encoding':<18}{'bayt':>12}{'ms (en iyi)':>13}")
+    for enc in (None, "gzip"):
+        best = None
+        for _ in range(args.repeat):
+            res = _post(args.url, args.token, query, enc)
+            if best is None or res[1] < best[1]:
+                best = res
+        size, elapsed, got = best
+        print(f"{enc or '-':<18}{got:<18}{size:>12}{elapsed * 1000:>13.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    comp = sub.add_parser("compression", help="cevap sıkıştırma: boyut/süre")
+    comp.add_argument("--rows", type=int, default=5000, help="sentetik satır sayısı")
+    comp.add_argument("--mbps", type=float, default=20.0, help="aktarım tahmini için hat hızı (Mbit/s)")
+    comp.add_argument("--url", help="canlı ölçüm için API adresi")
+    comp.add_argument("--token", default="")
+    comp.add_argument("--name", default="dinamik", help="Snapshots.Name")
+    comp.add_argument("--query", help="Snapshots yerine ölçülecek SELECT")
+    comp.add_argument("--repeat", type=int, default=3)
+
+    enc = sub.add_parser("encode", help="satır kodlama + JSON serileştirme süresi")
+    enc.add_argument("--rows", type=int, default=20000, help="sentetik UstaDefteri satır sayısı")
+    enc.add_argument("--repeat", type=int, default=5)
+
+    snap = sub.add_parser("snapshot", help="Snapshots biçimleri: boyut, kaydet/yükle süresi")
+    snap.add_argument("--rows", type=int, default=4000, help="synthdata.dinamik_frame satır sayısı")
+    snap.add_argument("--repeat", type=int, default=5)
+    snap.add_argument("--client-root", default=CLIENT_ROOT, help="UZMANRAPOR client klasörü")
+
+    args = parser.parse_args()
+    if args.cmd == "compression":
+        (_compression_live if args.url else _compression_offline)(args)
+    elif args.cmd == "encode":
+        _encode(args)
+    elif args.cmd == "snapshot":
+        _snapshot(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+# loadtest.py
+"""
+Vardiya değişimi yük testi. Her masaüstü ayrı process'tir (kendi HTTP havuzu, ETag önbelleği, X-Client-Id):
+`--ramp` saniye içinde hepsi açılışı yapar (login + MainWindow.__init__ + _restore_last_state), sonra
+`--duration` dolana kadar Kuşbakışı yenileme / Usta Defteri / planlama kaydı karışımıyla çalışır.
+Çağrılar client'ın kendi kodundan yapılır (app.storage, app.sql_api_client); Qt ekranlarının DB çağrıları
+aynı sırayla burada tekrarlanır.
+
+  python loadtest.py --local uzmanrapor.sqlite --clients 24 --duration 60
+                     # SQLite arka uçlu API'yi alt process olarak açar (önce: python synthdata.py)
+  python loadtest.py --url http://sunucu:8000 --token X --clients 24 --duration 60
+                     # sadece okuma senaryoları; yazanlar (Usta kaydı, planlama kaydı) --allow-writes ister
+
+Yazan senaryolar --local'de her zaman, --url ile sadece --allow-writes verilirse çalışır. Yazılan kayıtlar
+etiketlidir: UstaDefteri.Aciklama = 'loadtest', planlama snapshot'ları 'loadtest-dinamik' / 'loadtest-running'
+(--url'de gerçek snapshot'lar ezilmez). Temizlik:
+  DELETE FROM dbo.UstaDefteri WHERE Aciklama = 'loadtest';
+  DELETE FROM dbo.Snapshots WHERE Name LIKE 'loadtest-%';
+
+Rapor: HTTP yolu ve işlem başına adet, hata oranı, p50/p95/p99 (ms) ve saniyedeki istek; senaryo süreleri
+(açılış = pencerenin açılmasına kadar geçen süre). Not: storage fonksiyonları hataları yutar; asıl hata oranı
+HTTP tablosundadır (413/429/5xx). Bağlantı hataları HTTP kaydı üretmez; cursor ile yapılan işlemlerde
+"İşlem" tablosunda hata olarak görünür.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+CLIENT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "UZMANRAPOR")
+
+# açılış sonrası senaryo ağırlıkları
+MIX = {"kusbakisi_refresh": 6, "usta_browse": 3, "usta_kayit": 1, "planning_save": 1}
+# DB'ye yazan senaryolar: --local ya da --allow-writes
+WRITE_SCENARIOS = {"usta_kayit", "planning_save"}
+# yük testinin yazdığı satırların etiketi (UstaDefteri.Aciklama, Snapshots.Name öneki)
+LOADTEST_TAG = "loadtest"
+
+# app/usta_defteri.py ile aynı
+PAGE_SIZE = 200
+_ID_MAX = 2**63 - 1
+_LOOKUP_SQL = """
+SELECT Id, Value
+FROM [UzmanRaporDB].[dbo].[AppLookupValues]
+WHERE ListName = ? AND IsActive = 1
+ORDER BY SortOrder, Value;
+"""
+_PAGE_SQL = """
+SELECT TOP (?) Id, CONVERT(varchar(10), Tarih, 104) AS Tarih, Vardiya AS Saat, Tezgah, IsTanimi
+FROM [UzmanRaporDB].[dbo].[UstaDefteri]
+WHERE Id < ?
+ORDER BY Id DESC
+"""
+_COUNT_SQL = "SELECT COUNT(*) AS Adet FROM [UzmanRaporDB].[dbo].[UstaDefteri]"
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+# ============================================================
+#  MASAÜSTÜ PROCESS'İ
+# ============================================================
+
+class _Recorder:
+    """İşlem (storage çağrısı) ve senaryo süreleri: (ad, başlangıç, ms, hata)."""
+
+    def __init__(self) -> None:
+        self.ops: list[tuple[str, float, float, str | None]] = []
+        self.scenarios: list[tuple[str, float, float, str | None]] = []
+
+    @staticmethod
+    @contextmanager
+    def _timed(out: list, name: str) -> Iterator[None]:
+        t0 = time.time()
+        p0 = time.perf_counter()
+        err: str | None = None
+        try:
+            yield
+        except Exception as e:  # yük testi devam etsin; hata kaydedilir
+            err = type(e).__name__
+        finally:
+            out.append((name, t0, (time.perf_counter() - p0) * 1000, err))
+
+    def op(self, name: str) -> Any:
+        return self._timed(self.ops, name)
+
+    def scenario(self, name: str) -> Any:
+        return self._timed(self.scenarios, name)
+
+    def call(self, name: str, fn: Callable[..., Any], *args: Any) -> None:
+        with self.op(name):
+            fn(*args)
+
+
+def _lookup(rec: _Recorder, api: Any, list_name: str) -> None:
+    # UstaDefteriWidget._fetch_lookup_rows
+    with rec.op(f"usta_lookup:{list_name}"), api.get_sql_connection() as c:
+        cur = c.cursor()
+        cur.execute_named("usta_defteri.lookup", (list_name,), fallback=_LOOKUP_SQL)
+        cur.fetchall()
+
+
+def _usta_first_page(rec: _Recorder, api: Any, storage: Any) -> int:
+    # UstaDefteriWidget._start_paging: ilk sayfa (columnar) + arka planda toplam
+    last_id = _ID_MAX
+    with rec.op("usta_page"), api.get_sql_connection() as c:
+        cur = c.cursor()
+        cur.execute_named("usta_defteri.page", (PAGE_SIZE, _ID_MAX), columnar=True, fallback=_PAGE_SQL)
+        df = cur.fetch_dataframe()
+        if not df.empty:
+            last_id = int(df["Id"].iloc[-1])
+    with rec.op("usta_count"), api.get_sql_connection() as c:
+        cur = c.cursor()
+        cur.execute_named("usta_defteri.count", (), fallback=_COUNT_SQL)
+        cur.fetchone()
+    return last_id
+
+
+def _restricted(rec: _Recorder, storage: Any) -> None:
+    # PlanningDialog / team_planning_flow._load_restricted_looms
+    rec.call("load_blocked_looms", storage.load_blocked_looms)
+    rec.call("load_dummy_looms", storage.load_dummy_looms)
+
+
+def _kusbakisi_refresh(rec: _Recorder, storage: Any) -> None:
+    # KusbakisiWidget.refresh -> _reload_restrictions, _update_kpis -> _compute_yesterday_totals
+    import datetime as dt
+
+    _restricted(rec, storage)
+    today = dt.datetime.combine(dt.date.today(), dt.time())
+    start = today - dt.timedelta(days=1) + dt.timedelta(hours=7)
+    rec.call("count_usta_by_shift", storage.count_usta_by_shift, start, start + dt.timedelta(days=1))
+
+
+def _startup(rec: _Recorder, api: Any, storage: Any, user: str, password: str) -> None:
+    # LoginDialog
+    rec.call("verify_user", storage.verify_user, user, password)
+    # MainWindow.__init__ (kurallar, son güncelleme ve lookup'lar disk önbelleğinden)
+    rec.call("seed_lookup_cache_from_disk", storage.seed_lookup_cache_from_disk)
+    rec.call("load_rules", storage.load_rules_cached)
+    rec.call("load_last_update", storage.load_last_update_cached)
+    # UstaDefteriWidget: usta / haşıl combobox'ları
+    _lookup(rec, api, "USTA")
+    _lookup(rec, api, "HASIL")
+    # _restore_last_state
+    rec.call("load_df_snapshot:dinamik", storage.load_df_snapshot_cached, "dinamik")
+    rec.call("load_usta_etiket_tezgah_map", storage.load_usta_etiket_tezgah_map)  # _apply_etiket_location_notes
+    rec.call("load_df_snapshot:running", storage.load_df_snapshot_cached, "running")
+    rec.call("load_loom_cut_map", storage.load_loom_cut_map)  # enrich_running_with_loom_cut
+    rec.call("load_type_selvedge_map", storage.load_type_selvedge_map)  # enrich_running_with_selvedge
+    _kusbakisi_refresh(rec, storage)  # _refresh_kusbakisi
+    _restricted(rec, storage)  # team_flow.refresh_sources
+
+
+def _usta_browse(rec: _Recorder, api: Any, storage: Any) -> None:
+    last_id = _usta_first_page(rec, api, storage)
+    # kaydırma: sonraki iki sayfa
+    for _ in range(2):
+        with rec.op("usta_page"), api.get_sql_connection() as c:
+            cur = c.cursor()
+            cur.execute_named("usta_defteri.page", (PAGE_SIZE, last_id), columnar=True, fallback=_PAGE_SQL)
+            df = cur.fetch_dataframe()
+        if df.empty:
+            break
+        last_id = int(df["Id"].iloc[-1])
+
+
+def _usta_kayit(rec: _Recorder, api: Any, storage: Any, rng: random.Random, client_id: str) -> None:
+    # UstaDefteriWidget._on_save: _ensure_lookup_value, _insert_row, _load_last_n, _refresh_hasil_combo
+    import datetime as dt
+
+    now = dt.datetime.now()
+    with rec.op("usta_lookup_check"), api.get_sql_connection() as c:
+        cur = c.cursor()
+        cur.execute(
+            "SELECT 1 FROM [UzmanRaporDB].[dbo].[AppLookupValues] WHERE ListName = ? AND Value = ?;",
+            ("HASIL", "HAŞIL 1"),
+        )
+        cur.fetchone()
+    with rec.op("usta_insert"), api.get_sql_connection() as c:
+        cur = c.cursor()
+        cur.execute(
+            "INSERT INTO [UzmanRaporDB].[dbo].[UstaDefteri] (Tarih,Vardiya,Tezgah,IsTanimi,IslemYapan,Aciklama) "
+            "VALUES (?,?,?,?,?,?)",
+            [
+                now.strftime("%Y-%m-%d"),
+                f"(07:00)|{now:%H:%M}",
+                str(rng.randint(2201, 2518)),
+                rng.choice(["DÜĞÜM", "TAKIM"]),
+                client_id,
+                LOADTEST_TAG,
+            ],
+        )
+        c.commit()
+    _usta_first_page(rec, api, storage)
+    _lookup(rec, api, "HASIL")
+
+
+def _planning_save(rec: _Recorder, storage: Any, frames: dict[str, Any], prefix: str) -> None:
+    # MainWindow.run_ai_planning: PlanningDialog, iki kez dinamik + running snapshot, Kuşbakışı
+    # prefix: --url'de gerçek snapshot'lar yerine etiketli adlara yazılır
+    _restricted(rec, storage)
+    rec.call("save_df_snapshot:dinamik", storage.save_df_snapshot, frames["dinamik"], f"{prefix}dinamik")
+    rec.call("save_df_snapshot:dinamik", storage.save_df_snapshot, frames["dinamik"], f"{prefix}dinamik")
+    rec.call("save_df_snapshot:running", storage.save_df_snapshot, frames["running"], f"{prefix}running")
+    _kusbakisi_refresh(rec, storage)
+
+
+def _desktop(idx: int, cfg: dict[str, Any], start_at: float, out: Any) -> None:
+    os.environ["UZMANRAPOR_API_URL"] = cfg["url"]
+    os.environ["UZMANRAPOR_API_TOKEN"] = cfg["token"]
+    os.environ["UZMANRAPOR_CLIENT_ID"] = f"loadtest-{idx:03d}"
+    os.environ["UZMANRAPOR_API_PROFILE_SIZE"] = "1000000"
+    os.environ["UZMANRAPOR_DISK_CACHE"] = "0" if cfg["disk_cache"] == "off" else "1"
+    os.environ["UZMANRAPOR_DISK_CACHE_DIR"] = os.path.join(cfg["disk_cache_root"], f"{idx:03d}")
+    sys.path.insert(0, cfg["client_root"])
+    from app import sql_api_client as api
+    from app import storage
+
+    import synthdata
+
+    rng = random.Random(cfg["seed"] * 1000 + idx)
+    rec = _Recorder()
+    frames = {"dinamik": synthdata.dinamik_frame(cfg["snapshot_rows"]), "running": synthdata.running_frame()}
+    names = [n for n in MIX if cfg["writes"] or n not in WRITE_SCENARIOS]
+    weights = [MIX[n] for n in names]
+
+    skip = 0
+    if cfg["disk_cache"] == "warm":
+        # önceki vardiyadan kalan disk önbelleği: bir açılış + doğrulama, ölçüme girmez
+        _startup(_Recorder(), api, storage, cfg["user"], cfg["password"])
+        storage.revalidate_disk_cache()
+        storage.invalidate_lookup_cache()
+        skip = len(api.profiler_records())
+
+    time.sleep(max(0.0, start_at - time.time()) + rng.uniform(0, cfg["ramp"]))
+    with rec.scenario("startup"):
+        _startup(rec, api, storage, cfg["user"], cfg["password"])
+    # MainWindow açıldıktan sonra arka planda
+    with rec.scenario("revalidate"):
+        rec.call("revalidate_disk_cache", storage.revalidate_disk_cache)
+    end_at = start_at + cfg["duration"]
+    while time.time() < end_at:
+        time.sleep(rng.expovariate(1.0 / cfg["think"]) if cfg["think"] > 0 else 0)
+        if time.time() >= end_at:
+            break
+        name = rng.choices(names, weights)[0]
+        with rec.scenario(name):
+            if name == "kusbakisi_refresh":
+                _kusbakisi_refresh(rec, storage)
+            elif name == "usta_browse":
+                _usta_browse(rec, api, storage)
+            elif name == "usta_kayit":
+                _usta_kayit(rec, api, storage, rng, os.environ["UZMANRAPOR_CLIENT_ID"])
+            else:
+                _planning_save(rec, storage, frames, cfg["snapshot_prefix"])
+
+    http = [(r["path"], r["status"], r["wall_ms"], r["server"]) for r in api.profiler_records()[skip:]]
+    out.put({"ops": rec.ops, "scenarios": rec.scenarios, "http": http})
+
+
+# ============================================================
+#  YÖNETİCİ
+# ============================================================
+
+def _seed_snapshots(cfg: dict[str, Any]) -> None:
+    """Açılışta okunan snapshot'lar boşsa client yolundan (save_df_snapshot) yazılır. Sadece --local."""
+    os.environ["UZMANRAPOR_API_URL"] = cfg["url"]
+    os.environ["UZMANRAPOR_API_TOKEN"] = cfg["token"]
+    os.environ["UZMANRAPOR_DISK_CACHE"] = "0"  # yönetici process'in kullanıcı profiline yazılmasın
+    sys.path.insert(0, cfg["client_root"])
+    from app import storage
+
+    import synthdata
+
+    if storage.load_df_snapshot("dinamik") is None:
+        storage.save_df_snapshot(synthdata.dinamik_frame(cfg["snapshot_rows"]), "dinamik")
+    if storage.load_df_snapshot("running") is None:
+        storage.save_df_snapshot(synthdata.running_frame(), "running")
+
+
+def _wait_health(url: str, timeout: float) -> dict[str, Any]:
+    until = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url.rstrip("/") + "/health", timeout=2) as resp:
+                return json.load(resp)
+        except OSError:
+            if time.monotonic() > until:
+                raise
+            time.sleep(0.2)
+
+
+@contextmanager
+def _local_server(args: argparse.Namespace) -> Iterator[str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "UZMANRAPOR_BACKEND": "sqlite",
+            "UZMANRAPOR_SQLITE_PATH": os.path.abspath(args.local),
+            "UZMANRAPOR_API_TOKEN": args.token,
+            # tablo sürümleri process içidir: önbellek/ETag sadece tek worker'da açılabilir
+            "UZMANRAPOR_CACHE_SINGLE_PROCESS": "1" if args.workers == 1 else "0",
+        }
+    )
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+        "--workers", str(args.workers), "--log-level", "warning", "--timeout-keep-alive", "75",
+    ]
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_health(url, 30)
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _table(title: str, rows: list[tuple[str, list[float], int]], elapsed: float) -> None:
+    print(f"\n{title}")
+    print(f"{'':<38}{'adet':>7}{'hata':>6}{'hata%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'maks':>9}{'/sn':>8}")
+    for name, values, errors in sorted(rows, key=lambda r: -len(r[1])):
+        v = sorted(values)
+        n = len(v)
+        print(
+            f"{name[:37]:<38}{n:>7}{errors:>6}{(100.0 * errors / n if n else 0):>7.1f}"
+            f"{_percentile(v, 50):>9.1f}{_percentile(v, 95):>9.1f}{_percentile(v, 99):>9.1f}"
+            f"{(v[-1] if v else 0):>9.1f}{n / elapsed:>8.1f}"
+        )
+
+
+def _report(results: list[dict[str, Any]], elapsed: float, health: dict[str, Any] | None) -> dict[str, Any]:
+    http: dict[str, tuple[list[float], int]] = {}
+    statuses: dict[str, int] = {}
+    for res in results:
+        for path, status, wall_ms, _server in res["http"]:
+            values, errors = http.get(path, ([], 0))
+            values.append(wall_ms)
+            http[path] = (values, errors + (1 if status >= 400 else 0))
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def group(key: str) -> dict[str, tuple[list[float], int]]:
+        out: dict[str, tuple[list[float], int]] = {}
+        for res in results:
+            for name, _t0, ms, err in res[key]:
+                values, errors = out.get(name, ([], 0))
+                values.append(ms)
+                out[name] = (values, errors + (1 if err else 0))
+        return out
+
+    ops = group("ops")
+    scenarios = group("scenarios")
+    total_http = sum(len(v) for v, _ in http.values())
+    print(f"\n{len(results)} client, {elapsed:.1f} sn, {total_http} HTTP isteği ({total_http / elapsed:.1f}/sn)")
+    print("HTTP durumları:", ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items())))
+    _table("HTTP yolu (ms, client duvar saati)", [(k, v, e) for k, (v, e) in http.items()], elapsed)
+    _table("İşlem (storage / ekran çağrısı)", [(k, v, e) for k, (v, e) in ops.items()], elapsed)
+    _table("Senaryo", [(k, v, e) for k, (v, e) in scenarios.items()], elapsed)
+    if health:
+        adm = health.get("admission", {})
+        pool = health.get("pool", {})
+        print(
+            f"\nSunucu: admission admitted={adm.get('admitted')} queued={adm.get('queued')} "
+            f"rejected={adm.get('rejected')} wait_max_ms={adm.get('wait_max_ms')}; "
+            f"pool size={pool.get('size')} waited={pool.get('waited')} timeouts={pool.get('timeouts')}"
+        )
+
+    def summary(groups: dict[str, tuple[list[float], int]]) -> dict[str, Any]:
+        out = {}
+        for name, (values, errors) in groups.items():
+            v = sorted(values)
+            out[name] = {
+                "count": len(v),
+                "errors": errors,
+                "p50": _percentile(v, 50),
+                "p95": _percentile(v, 95),
+                "p99": _percentile(v, 99),
+                "max": v[-1] if v else 0.0,
+                "per_sec": len(v) / elapsed,
+            }
+        return out
+
+    return {
+        "clients": len(results),
+        "elapsed_sec": elapsed,
+        "statuses": statuses,
+        "http": summary(http),
+        "ops": summary(ops),
+        "scenarios": summary(scenarios),
+        "server": health,
+    }
+
+
+def _run(args: argparse.Namespace, url: str) -> None:
+    cfg = {
+        "url": url,
+        "token": args.token,
+        "client_root": os.path.abspath(args.client_root),
+        "user": args.user,
+        "password": args.password,
+        "ramp": args.ramp,
+        "duration": args.duration,
+        "think": args.think,
+        "seed": args.seed,
+        "snapshot_rows": args.snapshot_rows,
+        "disk_cache": args.disk_cache,
+        "disk_cache_root": tempfile.mkdtemp(prefix="uzmanrapor-loadtest-"),
+        "local": bool(args.local),
+        "writes": bool(args.local or args.allow_writes),
+        "snapshot_prefix": "" if args.local else f"{LOADTEST_TAG}-",
+    }
+    try:
+        _run_desktops(args, url, cfg)
+    finally:
+        shutil.rmtree(cfg["disk_cache_root"], ignore_errors=True)
+
+
+def _run_desktops(args: argparse.Namespace, url: str, cfg: dict[str, Any]) -> None:
+    if cfg["local"]:
+        _seed_snapshots(cfg)
+    elif not cfg["writes"]:
+        print(f"Yazan senaryolar atlandı ({', '.join(sorted(WRITE_SCENARIOS))}); çalıştırmak için --allow-writes")
+
+    # spawn: her masaüstü temiz bir client (modül durumu, HTTP havuzu, ETag önbelleği paylaşılmaz)
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    start_at = time.time() + 3.0 + args.clients * 0.05  # process'lerin açılma payı
+    procs = [ctx.Process(target=_desktop, args=(i, cfg, start_at, out), daemon=True) for i in range(args.clients)]
+    for p in procs:
+        p.start()
+    results = []
+    for _ in procs:
+        results.append(out.get(timeout=args.duration + args.ramp + 600))
+    for p in procs:
+        p.join(10)
+    elapsed = max(
+        (t0 + ms / 1000.0 for res in results for _n, t0, ms, _e in res["scenarios"]), default=start_at
+    ) - start_at
+
+    health = None
+    try:
+        health = _wait_health(url, 5)
+    except OSError:
+        pass
+    summary = _report(results, max(elapsed, 1e-9), health)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="çalışan API adresi")
+    target.add_argument("--local", metavar="SQLITE", help="bu SQLite dosyasıyla yerel API aç")
+    parser.add_argument("--token", default=os.getenv("UZMANRAPOR_API_TOKEN", "loadtest"))
+    parser.add_argument("--port", type=int, default=8765, help="--local için port")
+    parser.add_argument("--workers", type=int, default=1, help="--local için uvicorn worker sayısı")
+    parser.add_argument("--clients", type=int, default=24, help="eşzamanlı masaüstü sayısı")
+    parser.add_argument("--ramp", type=float, default=10.0, help="açılışların dağıldığı süre (sn)")
+    parser.add_argument("--duration", type=float, default=60.0, help="ölçüm süresi (sn)")
+    parser.add_argument("--think", type=float, default=2.0, help="senaryolar arası ortalama bekleme (sn)")
+    parser.add_argument("--snapshot-rows", type=int, default=4000, help="Dinamik snapshot satır sayısı")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--disk-cache",
+        choices=["warm", "cold", "off"],
+        default="warm",
+        help="client disk önbelleği: warm = önceki açılıştan dolu, cold = boş, off = kapalı",
+    )
+    parser.add_argument("--client-root", default=CLIENT_ROOT, help="UZMANRAPOR client klasörü")
+    parser.add_argument("--json", help="özeti bu dosyaya yaz")
+    parser.add_argument(
+        "--allow-writes",
+        action="store_true",
+        help="--url ile de yazan senaryoları çalıştır (etiketli Usta kayıtları ve snapshot'lar bırakır)",
+    )
+    args = parser.parse_args()
+
+    if args.local:
+        with _local_server(args) as url:
+            _run(args, url)
+    else:
+        _run(args, args.url)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,48 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import binascii
+import datetime as dt
+import decimal
+import hashlib
+import json
+import logging
+import logging.handlers
 import os
 import re
-from typing import Any
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
 
-import pyodbc
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.types import Receive, Scope, Send
 
-app = FastAPI(title="UzmanRapor API", version="1.0")
+from backends import create_backend
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from metrics import PhaseTimer, Registry
+from queries import NAMED_QUERIES, NAMED_QUERY_HEAVY
+
+try:  # opsiyonel: columnar (Arrow IPC) cevaplar
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow kurulu değilse sadece JSON
+    pa = None
+
+try:  # opsiyonel: hızlı JSON (yoksa stdlib json)
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+logger = logging.getLogger("uzmanrapor.api")
 
 
 class SqlRequest(BaseModel):
@@ -17,12 +50,97 @@ class SqlRequest(BaseModel):
     params: list[Any] = Field(default_factory=list)
 
 
+class SqlBatchRequest(BaseModel):
+    query: str = Field(..., description="Parametreli INSERT/UPDATE/DELETE (?)")
+    params_list: list[list[Any]] = Field(default_factory=list, description="Her satır için bir parametre listesi")
+
+
+class SqlStatement(BaseModel):
+    query: str = Field(..., description="Parametreli INSERT/UPDATE/DELETE (?)")
+    params: list[Any] = Field(default_factory=list)
+    params_list: list[list[Any]] | None = Field(default=None, description="Verilirse executemany ile çalışır")
+
+
+class SqlTransactionRequest(BaseModel):
+    statements: list[SqlStatement] = Field(default_factory=list)
+
+
+class NamedQueryRequest(BaseModel):
+    params: list[Any] = Field(default_factory=list)
+
+
 def _env(name: str, default: str = "") -> str:
     v = os.getenv(name)
     return v.strip() if v else default
 
 
+# mssql (pyodbc + SQL Server) veya sqlite (çevrimdışı test / yük ölçümü, bkz. backends.py)
+BACKEND = _env("UZMANRAPOR_BACKEND", "mssql")
+SQLITE_PATH = _env("UZMANRAPOR_SQLITE_PATH", "uzmanrapor.sqlite")
+
 MAX_ROWS = int(_env("UZMANRAPOR_MAX_ROWS", "20000"))
+# /sql/stream: satır sınırı yok, sonuç bu büyüklükte parçalar halinde akar
+STREAM_BATCH_ROWS = int(_env("UZMANRAPOR_STREAM_BATCH_ROWS", "2000"))
+# akışın toplam süresi (yavaş okuyan client dahil); her parça ayrıca QUERY_TIMEOUT ile sınırlı. 0 -> sınırsız
+STREAM_TIMEOUT = float(_env("UZMANRAPOR_STREAM_TIMEOUT_SEC", "600"))
+MAX_BATCH_ROWS = int(_env("UZMANRAPOR_MAX_BATCH_ROWS", "50000"))
+MAX_TX_STATEMENTS = int(_env("UZMANRAPOR_MAX_TX_STATEMENTS", "100"))
+FAST_EXECUTEMANY = _env("UZMANRAPOR_FAST_EXECUTEMANY", "1").lower() in {"1", "true", "yes"}
+
+POOL_MIN_SIZE = int(_env("UZMANRAPOR_POOL_MIN", "2"))
+POOL_MAX_SIZE = int(_env("UZMANRAPOR_POOL_MAX", "10"))
+POOL_IDLE_TIMEOUT = float(_env("UZMANRAPOR_POOL_IDLE_SEC", "300"))
+POOL_ACQUIRE_TIMEOUT = float(_env("UZMANRAPOR_POOL_ACQUIRE_SEC", "15"))
+# Bu süreden uzun boşta kalan bağlantı ödünç verilmeden önce "SELECT 1" ile yoklanır
+POOL_CHECK_AFTER = float(_env("UZMANRAPOR_POOL_CHECK_AFTER_SEC", "5"))
+
+# pyodbc işleri Starlette'in ortak threadpool'u yerine bu ayrılmış havuzda koşar
+DB_THREADS = int(_env("UZMANRAPOR_DB_THREADS", str(POOL_MAX_SIZE)))
+QUERY_TIMEOUT = float(_env("UZMANRAPOR_QUERY_TIMEOUT_SEC", "60"))
+
+# Cevap sıkıştırma (client Accept-Encoding: gzip gönderirse). 0 -> kapalı
+GZIP_MIN_BYTES = int(_env("UZMANRAPOR_GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(_env("UZMANRAPOR_GZIP_LEVEL", "5"))
+
+# Sonuç önbelleği: az değişen, her client'ın her yenilemede okuduğu tablolar
+CACHE_TABLES = _env(
+    "UZMANRAPOR_CACHE_TABLES",
+    "AppLookupValues,BlockedLooms,DummyLooms,LoomCutMap,Makine_Ayar_Tablosu,TipBuzulmeModel,TypeSelvedgeMap",
+)
+CACHE_MAX_ENTRIES = int(_env("UZMANRAPOR_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_ROWS = int(_env("UZMANRAPOR_CACHE_MAX_ROWS", "5000"))
+# API dışından (SSMS, job) yapılan yazımlar için üst sınır. 0 -> süresiz
+CACHE_TTL = float(_env("UZMANRAPOR_CACHE_TTL_SEC", "60"))
+# SELECT cevaplarında ETag; API dışı yazımlar en geç bu süre sonunda yeni ETag üretir. 0 -> kapalı
+ETAG_MAX_AGE = float(_env("UZMANRAPOR_ETAG_MAX_AGE_SEC", "60"))
+
+# Tablo sürümleri process içidir: bir worker'ın (ya da load balancer arkasındaki başka bir host'un)
+# yazımını diğerleri görmez (eski satır, yanlış 304). Worker sayısı güvenilir biçimde anlaşılamadığından
+# sonuç önbelleği ve ETag sadece tek process olduğu açıkça belirtilirse açılır.
+CACHE_SINGLE_PROCESS = _env("UZMANRAPOR_CACHE_SINGLE_PROCESS", "0").lower() in {"1", "true", "yes"}
+if not CACHE_SINGLE_PROCESS:
+    CACHE_MAX_ENTRIES = 0
+    ETAG_MAX_AGE = 0.0
+
+# Yavaş sorgu günlüğü: bu süreyi aşan istekler JSON satırı olarak dosyaya yazılır. 0 -> kapalı
+SLOW_QUERY_MS = float(_env("UZMANRAPOR_SLOW_QUERY_MS", "1000"))
+SLOW_QUERY_LOG = _env("UZMANRAPOR_SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_MB = float(_env("UZMANRAPOR_SLOW_QUERY_LOG_MB", "10"))
+SLOW_QUERY_LOG_BACKUPS = int(_env("UZMANRAPOR_SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Doğrulama kararı önbelleği (sorgu metni başına). 0 -> kapalı
+VALIDATION_CACHE_SIZE = int(_env("UZMANRAPOR_VALIDATION_CACHE", "512"))
+
+# Kabul kontrolü: ağırlıklı eşzamanlılık sınırı (hafif sorgu 1 birim, ağır sorgu HEAVY_WEIGHT birim). 0 -> kapalı
+ADMISSION_CAPACITY = int(_env("UZMANRAPOR_ADMISSION_CAPACITY", str(DB_THREADS)))
+ADMISSION_HEAVY_WEIGHT = int(_env("UZMANRAPOR_ADMISSION_HEAVY_WEIGHT", "3"))
+# ağır sorgular bu kadar birimi hafif sorgulara (lookup, kayıt) bırakır
+ADMISSION_CHEAP_RESERVE = int(_env("UZMANRAPOR_ADMISSION_CHEAP_RESERVE", "2"))
+# bir client'ın (X-Client-Id, yoksa IP) aynı anda kullanabileceği birim
+ADMISSION_PER_CLIENT = int(_env("UZMANRAPOR_ADMISSION_PER_CLIENT", str(max(1, ADMISSION_CAPACITY // 2))))
+ADMISSION_QUEUE = int(_env("UZMANRAPOR_ADMISSION_QUEUE", "64"))
+ADMISSION_WAIT = float(_env("UZMANRAPOR_ADMISSION_WAIT_SEC", "10"))
+ADMISSION_RETRY_AFTER = int(_env("UZMANRAPOR_ADMISSION_RETRY_AFTER_SEC", "2"))
 
 
 def _require_token(x_token: str | None) -> None:
@@ -67,6 +185,719 @@ def _sql_conn_str() -> str:
     return "".join(parts)
 
 
+# ============================================================
+#  BAĞLANTI HAVUZU
+#  Not: Her istekte pyodbc.connect() tam TDS login el sıkışması demek.
+#  Havuz uygulama ömrü (lifespan) boyunca açık bağlantıları tekrar kullanır.
+# ============================================================
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used", "cursors")
+
+    def __init__(self, conn: Any) -> None:
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        # isimli sorgu -> hazırlanmış cursor (bağlantı kapanınca onlar da kapanır)
+        self.cursors: dict[str, Any] = {}
+
+
+class ConnectionPool:
+    """
+    Sınırlı (min/max) pyodbc bağlantı havuzu.
+      - Boşta `idle_timeout` saniyeden uzun kalan bağlantılar kapatılır (min_size korunur).
+      - Ödünç verirken, `check_after` saniyeden uzun boşta kalmışsa SELECT 1 ile sağlık kontrolü.
+      - Geri alırken rollback ile oturum durumu (açık transaction, kilitler) temizlenir.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 2,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 15.0,
+        check_after: float = 5.0,
+        disconnect_errors: tuple[type[BaseException], ...] = (),
+    ) -> None:
+        self._connect = connect
+        # sürücünün "bağlantı koptu" hataları: bu hatalardan sonra bağlantı havuza geri konmaz
+        self.disconnect_errors = disconnect_errors
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.check_after = check_after
+
+        self._idle: deque[_PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "borrowed": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "reset_failures": 0,
+        }
+
+    # ---------------- yaşam döngüsü ----------------
+    def open(self) -> None:
+        """min_size kadar bağlantıyı önceden aç (hata olursa ilk istekte tekrar denenir)."""
+        for _ in range(self.min_size):
+            with self._cond:
+                self._size += 1
+            try:
+                pc = self._new_connection()
+            except Exception:
+                logger.warning("ön bağlantı açılamadı, ilk istekte tekrar denenecek", exc_info=True)
+                break
+            with self._cond:
+                self._idle.append(pc)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pc in idle:
+            self._discard(pc)
+
+    # ---------------- ödünç / iade ----------------
+    def _new_connection(self) -> _PooledConnection:
+        """Çağıran, _size içinde yeri önceden ayırmış olmalı."""
+        try:
+            conn = self._connect()
+            conn.autocommit = False
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return _PooledConnection(conn)
+
+    def _discard(self, pc: _PooledConnection) -> None:
+        try:
+            pc.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _is_healthy(self, pc: _PooledConnection) -> bool:
+        try:
+            cur = pc.conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            cur.close()
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _reap_idle(self) -> list[_PooledConnection]:
+        """Kilit altında çağrılır: süresi dolan boştaki bağlantıları ayırır."""
+        now = time.monotonic()
+        expired: list[_PooledConnection] = []
+        # en eski bağlantılar deque'nin başında durur
+        while self._idle and (self._size - len(expired)) > self.min_size:
+            pc = self._idle[0]
+            if now - pc.last_used <= self.idle_timeout:
+                break
+            expired.append(self._idle.popleft())
+        return expired
+
+    def acquire(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            pc: _PooledConnection | None = None
+            create = False
+            with self._cond:
+                expired = self._reap_idle()
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                    if self._idle:
+                        # LIFO: en sıcak bağlantı önce
+                        pc = self._idle.pop()
+                        break
+                    if self._size - len(expired) < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No free DB connection within {self.acquire_timeout:.0f}s")
+                    self._stats["waited"] += 1
+                    self._cond.wait(remaining)
+
+            for old in expired:
+                self._discard(old)
+
+            if create:
+                pc = self._new_connection()
+            elif pc is not None:
+                idle_for = time.monotonic() - pc.last_used
+                if idle_for > self.check_after and not self._is_healthy(pc):
+                    self._discard(pc)
+                    continue
+
+            with self._cond:
+                self._stats["borrowed"] += 1
+            return pc
+
+    def release(self, pc: _PooledConnection, broken: bool = False) -> None:
+        if not broken:
+            try:
+                # oturum durumunu sıfırla: yarım kalan transaction/kilitler bırakılsın
+                pc.conn.rollback()
+            except Exception:
+                broken = True
+                with self._cond:
+                    self._stats["reset_failures"] += 1
+
+        with self._cond:
+            if not broken and not self._closed:
+                pc.last_used = time.monotonic()
+                self._idle.append(pc)
+                self._cond.notify()
+                return
+        self._discard(pc)
+
+    @contextmanager
+    def connection(self, timer: PhaseTimer | None = None) -> Iterator[Any]:
+        t0 = time.perf_counter()
+        pc = self.acquire()
+        if timer is not None:
+            timer.add("borrow", time.perf_counter() - t0)
+        broken = False
+        try:
+            yield pc.conn
+        except self.disconnect_errors:
+            # sürücü hatası sonrası bağlantıya güvenme
+            broken = True
+            raise
+        finally:
+            self.release(pc, broken=broken)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            out: dict[str, Any] = dict(self._stats)
+            out.update(
+                {
+                    "size": self._size,
+                    "idle": len(self._idle),
+                    "in_use": self._size - len(self._idle),
+                    "min_size": self.min_size,
+                    "max_size": self.max_size,
+                }
+            )
+        return out
+
+
+class QueryTimeout(RuntimeError):
+    pass
+
+
+class DbExecutor:
+    """
+    pyodbc çağrıları için ayrılmış, boyutu sabit thread havuzu.
+    Async endpoint'ler işi buraya gönderir; event loop ve /health hiç bloklanmaz.
+      - İstek başına zaman aşımı: kuyrukta süresi dolan iş hiç başlatılmaz,
+        çalışan iş için pyodbc sorgu zaman aşımı (conn.timeout) kullanılır.
+      - Kuyruk metrikleri: bekleyen/çalışan iş sayısı, kuyrukta bekleme süreleri.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="uzmanrapor-db")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "expired_in_queue": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float = QUERY_TIMEOUT,
+        on_orphan: Callable[[Any], None] | None = None,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        enqueued = time.monotonic()
+        deadline = enqueued + timeout
+        with self._lock:
+            self._queued += 1
+            self._stats["submitted"] += 1
+
+        def _job() -> Any:
+            started = time.monotonic()
+            waited = started - enqueued
+            with self._lock:
+                self._queued -= 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                if started >= deadline:
+                    self._stats["expired_in_queue"] += 1
+                    raise QueryTimeout(f"Request waited {waited:.1f}s in DB queue")
+                self._running += 1
+            ok = False
+            try:
+                result = fn(*args, deadline)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._stats["completed" if ok else "failed"] += 1
+
+        # thread işi beklenmeden sonradan biterse sonucu sahipsiz kalır (ör. ödünç bağlantı); on_orphan temizler
+        def _orphaned(f: asyncio.Future) -> None:
+            if f.cancelled() or f.exception() is not None:
+                return
+            if on_orphan is not None:
+                on_orphan(f.result())
+
+        fut = loop.run_in_executor(self._executor, _job)
+        try:
+            # sürücü zaman aşımına küçük bir pay bırak; asıl iptal pyodbc tarafında olur
+            return await asyncio.wait_for(asyncio.shield(fut), timeout + 5)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            fut.add_done_callback(_orphaned)
+            raise QueryTimeout(f"Query exceeded {timeout:.0f}s")
+        except asyncio.CancelledError:
+            # istek iptal edildi (client koptu); thread işi sürüyor
+            fut.add_done_callback(_orphaned)
+            raise
+
+    def run_background(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Sonucu beklenmeyen temizlik işleri (ör. stream sonrası bağlantı iadesi)."""
+        try:
+            self._executor.submit(fn, *args)
+        except RuntimeError:
+            # executor kapanmış: aynı thread'de çalıştır
+            fn(*args)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            started = self._stats["submitted"] - self._queued
+            out.update(
+                {
+                    "workers": self.workers,
+                    "queued": self._queued,
+                    "running": self._running,
+                    "queue_wait_avg_ms": round(1000 * self._wait_total / started, 2) if started > 0 else 0.0,
+                    "queue_wait_max_ms": round(1000 * self._wait_max, 2),
+                }
+            )
+        return out
+
+
+# ============================================================
+#  KABUL KONTROLÜ (ADMISSION)
+#  Tüm client'lar aynı token'ı kullandığından sınır client kimliği (X-Client-Id) üzerinden uygulanır.
+#  Her istek doğrulamada belirlenen sınıfına göre birim tüketir; ağır sorgular kapasitenin bir kısmını
+#  hafif sorgulara bırakır. Sığmayan istekler sınırlı bir kuyrukta bekler; kuyruk client'lar arasında
+#  sırayla (round robin) boşaltılır. Kuyruk doluysa ya da bekleme süresi dolarsa 429 + Retry-After.
+#  Sadece event loop'tan çağrılır (kilit yok).
+# ============================================================
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("weight", "heavy", "future")
+
+    def __init__(self, weight: int, heavy: bool, future: asyncio.Future) -> None:
+        self.weight = weight
+        self.heavy = heavy
+        self.future = future
+
+
+class AdmissionTicket:
+    """Kabul edilmiş istek; release() birden çok kez çağrılabilir."""
+
+    __slots__ = ("_owner", "client", "weight")
+
+    def __init__(self, owner: "AdmissionControl | None", client: str, weight: int) -> None:
+        self._owner = owner
+        self.client = client
+        self.weight = weight
+
+    def release(self) -> None:
+        owner, self._owner = self._owner, None
+        if owner is not None:
+            owner._release(self.client, self.weight)
+
+
+class AdmissionControl:
+    def __init__(
+        self,
+        capacity: int,
+        heavy_weight: int,
+        cheap_reserve: int,
+        per_client: int,
+        max_queue: int,
+        wait_timeout: float,
+        retry_after: int,
+    ) -> None:
+        self.capacity = max(0, capacity)
+        # ağır sorguların kullanabileceği üst sınır; tek ağır sorgu her zaman sığar
+        self.heavy_limit = max(1, self.capacity - max(0, cheap_reserve))
+        self.heavy_weight = max(1, min(heavy_weight, self.heavy_limit))
+        self.per_client = max(1, per_client)
+        self.max_queue = max(0, max_queue)
+        self.wait_timeout = wait_timeout
+        self.retry_after = max(1, retry_after)
+        self._in_use = 0
+        self._clients: dict[str, int] = {}
+        self._waiting: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._queued = 0
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timeouts": 0}
+        self._wait_max = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _fits(self, client: str, heavy: bool, weight: int) -> bool:
+        if self._in_use + weight > (self.heavy_limit if heavy else self.capacity):
+            return False
+        used = self._clients.get(client, 0)
+        return used == 0 or used + weight <= self.per_client
+
+    def _grant(self, client: str, weight: int) -> AdmissionTicket:
+        self._in_use += weight
+        self._clients[client] = self._clients.get(client, 0) + weight
+        self._stats["admitted"] += 1
+        return AdmissionTicket(self, client, weight)
+
+    async def acquire(self, client: str, heavy: bool) -> AdmissionTicket:
+        if not self.enabled:
+            return AdmissionTicket(None, client, 0)
+        weight = self.heavy_weight if heavy else 1
+        if not self._waiting and self._fits(client, heavy, weight):
+            return self._grant(client, weight)
+        if self._queued >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise AdmissionRejected("Server busy: admission queue is full", self.retry_after)
+
+        waiter = _Waiter(weight, heavy, asyncio.get_running_loop().create_future())
+        self._waiting.setdefault(client, deque()).append(waiter)
+        self._queued += 1
+        self._stats["queued"] += 1
+        # sırası gelmiş başka client'lar önce; bu istek sığıyorsa hemen geçer
+        self._dispatch()
+        started = time.monotonic()
+        try:
+            if not waiter.future.done():
+                await asyncio.wait({waiter.future}, timeout=self.wait_timeout)
+        except BaseException:
+            self._abandon(client, waiter)
+            raise
+        self._wait_max = max(self._wait_max, time.monotonic() - started)
+        if not waiter.future.done():
+            self._abandon(client, waiter)
+            self._stats["timeouts"] += 1
+            raise AdmissionRejected(f"Server busy: waited {self.wait_timeout:g}s for a slot", self.retry_after)
+        return AdmissionTicket(self, client, weight)
+
+    def _abandon(self, client: str, waiter: _Waiter) -> None:
+        if waiter.future.done():
+            # izin verilmiş ama istek vazgeçti (ör. client koptu)
+            self._release(client, waiter.weight)
+            return
+        waiter.future.cancel()
+        q = self._waiting.get(client)
+        if q is not None:
+            try:
+                q.remove(waiter)
+            except ValueError:
+                pass
+            if not q:
+                del self._waiting[client]
+        self._queued -= 1
+        self._dispatch()
+
+    def _release(self, client: str, weight: int) -> None:
+        self._in_use -= weight
+        left = self._clients.get(client, 0) - weight
+        if left > 0:
+            self._clients[client] = left
+        else:
+            self._clients.pop(client, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # her turda sıradaki client'ın en eski isteği; sığmayan (ör. ağır) baştaki istek diğerlerini bekletmez
+        progressed = True
+        while progressed and self._waiting:
+            progressed = False
+            for client in list(self._waiting):
+                q = self._waiting[client]
+                waiter = q[0]
+                if not self._fits(client, waiter.heavy, waiter.weight):
+                    continue
+                q.popleft()
+                self._queued -= 1
+                if q:
+                    self._waiting.move_to_end(client)
+                else:
+                    del self._waiting[client]
+                self._grant(client, waiter.weight)
+                waiter.future.set_result(None)
+                progressed = True
+                break
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = dict(self._stats)
+        out.update(
+            {
+                "capacity": self.capacity,
+                "heavy_weight": self.heavy_weight,
+                "heavy_limit": self.heavy_limit,
+                "in_use": self._in_use,
+                "waiting": self._queued,
+                "active_clients": len(self._clients),
+                "wait_max_ms": round(1000 * self._wait_max, 2),
+            }
+        )
+        return out
+
+
+# ============================================================
+#  TABLO SÜRÜMLERİ + SONUÇ ÖNBELLEĞİ
+#  API üzerinden yapılan her INSERT/UPDATE/DELETE dokunduğu tabloların sürümünü artırır.
+#  SELECT sonuçları (normalize sorgu + parametre + format) anahtarıyla saklanır; kayıt,
+#  oluşturulduğu andaki sürümler güncel değilse kullanılmaz (write-through invalidation).
+#  Aynı sürümler ETag üretiminde de kullanılır.
+# ============================================================
+
+class TableVersions:
+    """Tablo başına yazım sayacı (küçük harf tablo adı -> sürüm)."""
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, tables: frozenset[str]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in sorted(tables))
+
+    def bump(self, tables: frozenset[str] | None, known: set[str]) -> None:
+        """None -> hangi tabloya dokunulduğu bilinmiyor: bilinen tüm tablolar."""
+        with self._lock:
+            for t in (known | set(self._versions)) if tables is None else tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+
+class _CacheEntry:
+    __slots__ = ("value", "versions", "expires_at")
+
+    def __init__(self, value: Any, versions: tuple[int, ...], expires_at: float) -> None:
+        self.value = value
+        self.versions = versions
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    Boyut sınırlı (LRU) sonuç önbelleği.
+      - Sadece tüm tabloları `tables` içinde olan sorgular önbelleğe alınır.
+      - Sorgu başlamadan alınan sürümler `put` anında değiştiyse sonuç saklanmaz
+        (okuma sürerken commit edilen yazım eski sonucu önbelleğe sokamaz).
+      - `ttl` > 0 ise kayıt en fazla bu kadar yaşar.
+    """
+
+    def __init__(self, versions: TableVersions, tables: set[str], max_entries: int = 256, ttl: float = 60.0) -> None:
+        self.table_versions = versions
+        self.tables = {t.lower() for t in tables}
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "stale": 0, "evictions": 0}
+
+    def cacheable(self, tables: frozenset[str]) -> bool:
+        return self.max_entries > 0 and bool(tables) and tables <= self.tables
+
+    def get(self, key: Any, versions: tuple[int, ...]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.versions != versions or (self.ttl > 0 and now >= entry.expires_at):
+                del self._entries[key]
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def put(self, key: Any, tables: frozenset[str], versions: tuple[int, ...], value: Any) -> None:
+        if self.table_versions.snapshot(tables) != versions:
+            return
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, versions, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            lookups = self._stats["hits"] + self._stats["misses"]
+            out.update(
+                {
+                    "entries": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                }
+            )
+        return out
+
+
+_backend = create_backend(BACKEND, _sql_conn_str, SQLITE_PATH)
+
+
+def _connect() -> Any:
+    return _backend.connect()
+
+
+def _apply_query_timeout(conn: Any, deadline: float) -> None:
+    """Kalan süreyi pyodbc sorgu zaman aşımına çevirir (SQL_ATTR_QUERY_TIMEOUT, saniye)."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise QueryTimeout("Query deadline passed before execution")
+    try:
+        conn.timeout = max(1, int(remaining))
+    except Exception:
+        pass
+
+
+_pool: ConnectionPool | None = None
+_db_executor: DbExecutor | None = None
+_catalog: dict[str, Any] = {}
+_table_versions = TableVersions()
+_etag_stats = {"sent": 0, "not_modified": 0}
+_admission = AdmissionControl(
+    ADMISSION_CAPACITY,
+    ADMISSION_HEAVY_WEIGHT,
+    ADMISSION_CHEAP_RESERVE,
+    ADMISSION_PER_CLIENT,
+    ADMISSION_QUEUE,
+    ADMISSION_WAIT,
+    ADMISSION_RETRY_AFTER,
+)
+_result_cache = ResultCache(
+    _table_versions,
+    {t.strip() for t in CACHE_TABLES.split(",") if t.strip()},
+    max_entries=CACHE_MAX_ENTRIES,
+    ttl=CACHE_TTL,
+)
+
+
+def _get_pool() -> ConnectionPool:
+    if _pool is None:
+        raise HTTPException(status_code=503, detail="Connection pool is not ready")
+    return _pool
+
+
+def _get_executor() -> DbExecutor:
+    if _db_executor is None:
+        raise HTTPException(status_code=503, detail="DB executor is not ready")
+    return _db_executor
+
+
+def _load_catalog() -> dict[str, _QueryInfo]:
+    """İsimli sorguları doğrular; hatalı kayıt varsa servis açılmaz."""
+    catalog: dict[str, _QueryInfo] = {}
+    for name, query in NAMED_QUERIES.items():
+        info = _analyze_query(query)
+        if info.error is not None:
+            raise RuntimeError(f"Named query {name!r} is invalid: {info.error[1]}")
+        if name in NAMED_QUERY_HEAVY:
+            info.heavy = NAMED_QUERY_HEAVY[name]
+        catalog[name] = info
+    return catalog
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    global _pool, _db_executor, _catalog
+    if not CACHE_SINGLE_PROCESS:
+        logger.warning(
+            "sonuç önbelleği ve ETag kapalı: tablo sürümleri process'ler arasında paylaşılmıyor "
+            "(tek process ise UZMANRAPOR_CACHE_SINGLE_PROCESS=1)"
+        )
+    _catalog = _load_catalog()
+    _db_executor = DbExecutor(DB_THREADS)
+    _pool = ConnectionPool(
+        _connect,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+        check_after=POOL_CHECK_AFTER,
+        disconnect_errors=_backend.disconnect_errors,
+    )
+    await asyncio.get_running_loop().run_in_executor(None, _pool.open)
+    try:
+        yield
+    finally:
+        pool, _pool = _pool, None
+        executor, _db_executor = _db_executor, None
+        executor.shutdown()
+        pool.close()
+
+
+app = FastAPI(title="UzmanRapor API", version="1.0", lifespan=_lifespan)
+if GZIP_MIN_BYTES > 0:
+    # büyük lookup/UstaDefteri JSON'ları (ve eski Snapshots.DataHex hex metni) iyi sıkışır
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+
 _FORBIDDEN = re.compile(
     r"\b("
     r"create|alter|drop|truncate|grant|revoke|"
@@ -116,24 +947,115 @@ _EXEC_REF = re.compile(
 )
 
 
-def _validate_query(query: str) -> None:
-    q = query.strip()
+# şema ile nitelenmemiş tablo/CTE referansı: hangi tabloya dokunulduğu kesin bilinemez
+_UNQUALIFIED_REF = re.compile(r"\b(?:from|join|into|update)\s+(?!\[?\w+\]?\.)\[?\w+", re.IGNORECASE)
+
+
+class _QueryInfo:
+    """Bir sorgu metni için doğrulama kararı (önbellekte saklanır)."""
+
+    __slots__ = ("head", "tables", "error", "heavy")
+
+    def __init__(
+        self,
+        head: str = "",
+        tables: frozenset[str] | None = None,
+        error: tuple[int, str] | None = None,
+        heavy: bool = False,
+    ) -> None:
+        self.head = head
+        # dokunulan tablolar (küçük harf); nitelenmemiş referans varsa None
+        self.tables = tables
+        self.error = error
+        # kabul kontrolü sınıfı (bkz. _is_heavy)
+        self.heavy = heavy
+
+
+def _mask_sql(q: str) -> str:
+    """
+    String literal'leri boş literal ('') ile değiştirir, yorumları (--, iç içe /* */) boşluk yapar.
+    Köşeli parantez ve çift tırnaklı tanımlayıcılar olduğu gibi kalır.
+    Regex taramaları bu metin üzerinde yapılır: literal içindeki metin yanlış pozitif üretmez.
+    """
+    out: list[str] = []
+    i, n = 0, len(q)
+    while i < n:
+        ch = q[i]
+        if ch == "'":
+            j = i + 1
+            while True:
+                j = q.find("'", j)
+                if j < 0:
+                    raise ValueError("Unterminated string literal")
+                if j + 1 < n and q[j + 1] == "'":
+                    j += 2
+                    continue
+                break
+            out.append("''")
+            i = j + 1
+        elif ch == "-" and q.startswith("--", i):
+            j = q.find("\n", i)
+            out.append(" ")
+            i = n if j < 0 else j
+        elif ch == "/" and q.startswith("/*", i):
+            depth, j = 1, i + 2
+            while depth:
+                a, b = q.find("/*", j), q.find("*/", j)
+                if b < 0:
+                    raise ValueError("Unterminated comment")
+                if 0 <= a < b:
+                    depth, j = depth + 1, a + 2
+                else:
+                    depth, j = depth - 1, b + 2
+            out.append(" ")
+            i = j
+        elif ch in "[\"":
+            close = "]" if ch == "[" else '"'
+            j = i + 1
+            while True:
+                j = q.find(close, j)
+                if j < 0:
+                    raise ValueError("Unterminated identifier")
+                if j + 1 < n and q[j + 1] == close:
+                    j += 2
+                    continue
+                break
+            out.append(q[i : j + 1])
+            i = j + 1
+        else:
+            # sıradaki özel karaktere kadar olan düz metni tek seferde ekle
+            m = _PLAIN_RUN.match(q, i)
+            out.append(m.group(0) if m and m.end() > i else ch)
+            i = m.end() if m and m.end() > i else i + 1
+    # "dbo . X" / "dbo./**/X" gibi yazımlar da obje referansı olarak yakalansın
+    return _DOT_SPACES.sub(".", "".join(out))
+
+
+_PLAIN_RUN = re.compile(r"[^'\-/\[\"]+")
+_DOT_SPACES = re.compile(r"\s*\.\s*")
+
+
+def _analyze_query(query: str) -> _QueryInfo:
+    try:
+        q = _mask_sql(query).strip()
+    except ValueError as e:
+        return _QueryInfo(error=(403, str(e)))
     if not q:
-        raise HTTPException(status_code=400, detail="Empty query")
+        return _QueryInfo(error=(400, "Empty query"))
 
     if q.endswith(";"):
         q = q[:-1].rstrip()
 
     if _FORBIDDEN.search(q):
-        raise HTTPException(status_code=403, detail="Forbidden SQL keyword")
+        return _QueryInfo(error=(403, "Forbidden SQL keyword"))
 
     if ";" in q:
-        raise HTTPException(status_code=403, detail="Multiple statements are not allowed")
+        return _QueryInfo(error=(403, "Multiple statements are not allowed"))
 
     # izinli komutlar
     head = q.split(None, 1)[0].lower()
     if head not in {"select", "insert", "update", "delete", "exec", "with"}:
-        raise HTTPException(status_code=403, detail="Only SELECT/INSERT/UPDATE/DELETE/EXEC are allowed")
+        return _QueryInfo(error=(403, "Only SELECT/INSERT/UPDATE/DELETE/EXEC are allowed"))
 
     # obje whitelist kontrolü
     objs: set[str] = set()
@@ -147,12 +1069,12 @@ def _validate_query(query: str) -> None:
 
     for obj in objs:
         if obj not in _ALLOWED_OBJECTS and obj not in _ALLOWED_PROCS:
-            raise HTTPException(status_code=403, detail=f"Object not allowed: {obj}")
+            return _QueryInfo(error=(403, f"Object not allowed: {obj}"))
 
     if head == "exec":
         m = _EXEC_REF.search(q)
         if not m:
-            raise HTTPException(status_code=403, detail="EXEC only allowed for dbo stored procedures")
+            return _QueryInfo(error=(403, "EXEC only allowed for dbo stored procedures"))
 
         db = m.group("db")
         proc = m.group("proc")
@@ -160,14 +1082,163 @@ def _validate_query(query: str) -> None:
             db_name = db.strip("[]")
             qualified = f"{db_name}.dbo.{proc}"
             if qualified not in _ALLOWED_PROCS:
-                raise HTTPException(status_code=403, detail=f"Procedure not allowed: {qualified}")
+                return _QueryInfo(error=(403, f"Procedure not allowed: {qualified}"))
         else:
             unqualified = f"dbo.{proc}"
             if unqualified not in _ALLOWED_PROCS:
-                raise HTTPException(status_code=403, detail=f"Procedure not allowed: {unqualified}")
+                return _QueryInfo(error=(403, f"Procedure not allowed: {unqualified}"))
+
+    tables: frozenset[str] | None = None
+    if not _UNQUALIFIED_REF.search(q):
+        tables = frozenset(m.group("table").lower() for m in _OBJ_REF.finditer(q))
+    return _QueryInfo(head=head, tables=tables, heavy=_is_heavy(head, q, tables))
+
+
+_LIGHT_TABLES = frozenset(t.strip().lower() for t in CACHE_TABLES.split(",") if t.strip())
+_TOP_SQL = re.compile(r"^\s*select\s+(?:distinct\s+)?top\b", re.IGNORECASE)
+_HEAVY_SQL = re.compile(r"\b(?:group\s+by|join|union|count|sum|avg|like|between)\b", re.IGNORECASE)
+# aralık karşılaştırması (<, <=, >, >=; `<>` değil) ve solundaki kolon
+_RANGE_SQL = re.compile(r"(?P<col>[\w\]]+)\s*(?:<(?![>=])|>(?!=)|<=|>=)", re.IGNORECASE)
+_WHERE_SQL = re.compile(r"\bwhere\b", re.IGNORECASE)
+
+
+def _is_heavy(head: str, q: str, tables: frozenset[str] | None) -> bool:
+    """
+    Kabul kontrolü sınıfı (maskelenmiş metin üzerinden, sorgu başına bir kez):
+    hafif -> tekil DML, küçük lookup tabloları, TOP ile sınırlı SELECT, filtreli nokta okuma;
+    ağır -> EXEC, gruplama/aggregate/JOIN/LIKE, aralık filtresi (ör. tarih raporu), filtresiz tarama.
+    Anahtar kolonlarda (`Id`, `...Id`) aralık index seek'tir (keyset sayfalama), ağır sayılmaz.
+    """
+    if head == "exec":
+        return True
+    if head in {"insert", "update", "delete"}:
+        return False
+    if tables and tables <= _LIGHT_TABLES:
+        return False
+    if _TOP_SQL.search(q) and not re.search(r"\bgroup\s+by\b", q, re.IGNORECASE):
+        return False
+    if _HEAVY_SQL.search(q):
+        return True
+    for m in _RANGE_SQL.finditer(q):
+        if not m.group("col").strip("[]").lower().endswith("id"):
+            return True
+    return not _WHERE_SQL.search(q)
+
+
+# ============================================================
+#  DOĞRULAMA ÖNBELLEĞİ
+#  Client aynı ~60 sorgu şablonunu tekrar tekrar gönderir; karar (izinli mi, komut,
+#  dokunulan tablolar) sorgu metni anahtarıyla saklanır, sıcak yolda tek dict araması kalır.
+# ============================================================
+
+class _ValidationCache:
+    def __init__(self, size: int) -> None:
+        self.size = max(0, size)
+        self._entries: OrderedDict[str, _QueryInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, query: str) -> _QueryInfo:
+        with self._lock:
+            info = self._entries.get(query)
+            if info is not None:
+                self._entries.move_to_end(query)
+                self._stats["hits"] += 1
+                return info
+            self._stats["misses"] += 1
+        info = _analyze_query(query)
+        if self.size:
+            with self._lock:
+                self._entries[query] = info
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return info
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out.update({"entries": len(self._entries), "max_entries": self.size})
+        return out
+
+
+_validation_cache = _ValidationCache(VALIDATION_CACHE_SIZE)
+
+
+def _validate_query(query: str) -> _QueryInfo:
+    """
+    İzinli değilse HTTPException; izinliyse doğrulama kararı (tek önbellek araması): .head komut,
+    .tables dokunulan tablolar (küçük harf; nitelenmemiş referans varsa None), .heavy kabul sınıfı.
+    """
+    info = _validation_cache.get(query)
+    if info.error is not None:
+        raise HTTPException(status_code=info.error[0], detail=info.error[1])
+    return info
+
+
+def _client_id(request: Request) -> str:
+    # tüm client'lar aynı token'ı kullanır; adillik X-Client-Id (yoksa IP) başına
+    cid = (request.headers.get("x-client-id") or "").strip()[:64]
+    if cid:
+        return cid
+    return request.client.host if request.client else "-"
+
+
+@asynccontextmanager
+async def _admitted(request: Request, heavy: bool, timer: PhaseTimer) -> AsyncIterator[None]:
+    with timer.phase("admit"):
+        ticket = await _admission.acquire(_client_id(request), heavy)
+    try:
+        yield
+    finally:
+        ticket.release()
+
+
+def _tables_written(tables: frozenset[str] | None) -> None:
+    """Yazım sonrası: tablo sürümlerini artırır (önbellek kayıtları ve ETag'ler geçersizleşir)."""
+    _table_versions.bump(tables, {t.lower() for t in _ALLOWED_TABLES})
+    if tables is None:
+        _result_cache.clear()
+
+
+def _cache_key(query: str, params: list[Any], arrow: bool) -> tuple[str, str, bool]:
+    # tırnak dışındaki boşluklar tek boşluğa indirgenir; literal içerikleri aynen kalır
+    parts = query.strip().rstrip(";").split("'")
+    parts[::2] = [" ".join(p.split()) for p in parts[::2]]
+    return "'".join(parts), json.dumps(params, default=_json_default), arrow
+
+
+# süreç yeniden başlarsa sürümler sıfırlanır; eski ETag'ler eşleşmesin
+_ETAG_EPOCH = uuid.uuid4().hex[:8]
+
+
+def _etag(key: tuple[str, str, bool], versions: tuple[int, ...]) -> str:
+    bucket = int(time.time() // ETAG_MAX_AGE)
+    digest = hashlib.blake2b(repr((key, versions)).encode("utf-8"), digest_size=12).hexdigest()
+    # zayıf ETag: aynı içerik gzip'li/gzip'siz farklı baytlarla gidebilir
+    return f'W/"{_ETAG_EPOCH}-{bucket}-{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {c.strip() for c in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+def _binary_param(p: dict[str, Any]) -> bytes:
+    value = p.get("$binary")
+    if len(p) != 1 or not isinstance(value, str):
+        raise HTTPException(status_code=400, detail='Object parameters must be {"$binary": "<base64>"}')
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid $binary parameter: {e}") from e
 
 
 def _adapt_params(query: str, params: list[Any]) -> list[Any]:
+    # ikili parametre: client bytes'ı {"$binary": "<base64>"} olarak gönderir (ör. Snapshots.Data)
+    if any(isinstance(p, dict) for p in params):
+        params = [_binary_param(p) if isinstance(p, dict) else p for p in params]
     # NoteRules varbinary için base64 -> bytes (heuristic)
     q = query.lower()
     if "insert into dbo.noterules" in q and params:
@@ -182,59 +1253,1068 @@ def _adapt_params(query: str, params: list[Any]) -> list[Any]:
     return params
 
 
-def _encode_value(v: Any) -> Any:
+def _json_default(v: Any) -> Any:
+    """json.dumps için: FastAPI'nin jsonable_encoder çıktısıyla aynı gösterim."""
+    if isinstance(v, (dt.datetime, dt.date, dt.time)):
+        return v.isoformat()
+    if isinstance(v, decimal.Decimal):
+        return int(v) if v.as_tuple().exponent >= 0 else float(v)
+    if isinstance(v, uuid.UUID):
+        return str(v)
     if isinstance(v, (bytes, bytearray, memoryview)):
         return base64.b64encode(bytes(v)).decode("ascii")
-    return v
+    raise TypeError(f"Object of type {type(v).__name__} is not JSON serializable")
 
 
-@app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def _dumps(obj: Any) -> bytes:
+    """Cevap gövdesi. orjson varsa onunla; sığmayan değerde (ör. 64 bit üstü int) stdlib'e düşer."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_json_default)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _ndjson(obj: dict[str, Any]) -> bytes:
+    return _dumps(obj) + b"\n"
+
 
+# ============================================================
+#  KOLON TİPİNE GÖRE SATIR KODLAMA
+#  cur.description bir kez okunur; sadece dönüşüm gereken kolonlara (binary, tarih, decimal, uuid)
+#  çevirici uygulanır. Tipi JSON'a doğrudan giden kolonlar (str/int/float/bool) olduğu gibi kalır.
+#  Çıktı _json_default / jsonable_encoder ile aynı gösterimdir.
+# ============================================================
 
-@app.post("/sql")
-def sql(req: SqlRequest, x_token: str | None = Header(default=None)) -> dict[str, Any]:
-    conn_str = _sql_conn_str()
-    params = _adapt_params(req.query, list(req.params or []))
+_PASSTHROUGH_TYPES = (str, int, float, bool)
 
-    conn = None
+# tarih/uuid için doğrudan metot (sıcak yol); gösterim kuralı olan tipler _json_default'tan geçer
+_COLUMN_CONVERTERS: dict[Any, Callable[[Any], Any]] = {
+    bytes: _json_default,
+    bytearray: _json_default,
+    memoryview: _json_default,
+    dt.datetime: dt.datetime.isoformat,
+    dt.date: dt.date.isoformat,
+    dt.time: dt.time.isoformat,
+    decimal.Decimal: _json_default,
+    uuid.UUID: str,
+}
+
+
+def _cell_json(v: Any) -> Any:
+    # tipi bilinmeyen kolon (ör. sql_variant): hücre bazlı
+    if v is None or isinstance(v, _PASSTHROUGH_TYPES):
+        return v
+    return _json_default(v)
+
+
+def _row_encoder(description: Any) -> Callable[[list[Any]], list[Any]]:
+    """description -> satırı JSON'a hazır listeye çeviren fonksiyon (sorgu başına bir kez kurulur)."""
+    converters: list[tuple[int, Callable[[Any], Any]]] = []
+    for i, d in enumerate(description):
+        type_code = d[1]
+        if type_code in _PASSTHROUGH_TYPES:
+            continue
+        converters.append((i, _COLUMN_CONVERTERS.get(type_code, _cell_json)))
+    if not converters:
+        return list
+
+    def encode(row: Any) -> list[Any]:
+        out = list(row)
+        for i, conv in converters:
+            v = out[i]
+            if v is not None:
+                out[i] = conv(v)
+        return out
+
+    return encode
+
+
+def _encode_rows(description: Any, rows: list[Any]) -> list[list[Any]]:
+    encode = _row_encoder(description)
+    return [encode(row) for row in rows]
+
+
+# JSON cevabındaki "types": client DataFrame kolonlarını bu tiplerle kurar (ApiCursor.fetch_dataframe)
+_COLUMN_TYPE_NAMES: dict[Any, str] = {
+    bool: "bool",
+    int: "int",
+    float: "float",
+    decimal.Decimal: "float",
+    dt.datetime: "datetime",
+    dt.date: "date",
+    dt.time: "time",
+    bytes: "binary",
+    bytearray: "binary",
+    str: "str",
+    uuid.UUID: "str",
+}
+
+
+def _column_types(description: Any) -> list[str | None]:
+    """description -> kolon tip adları; bilinmeyen tip (ör. sql_variant) None."""
+    return [_COLUMN_TYPE_NAMES.get(d[1]) for d in description]
+
+
+# ============================================================
+#  COLUMNAR (ARROW IPC) CEVAP
+#  Client "Accept: application/vnd.apache.arrow.stream" gönderirse sonuç satır satır JSON yerine
+#  kolon bazlı Arrow IPC stream olarak döner; client DataFrame'i hücre başına Python nesnesi
+#  üretmeden kurar. pyarrow yoksa her zaman JSON döner.
+# ============================================================
+
+def _wants_arrow(accept: str | None) -> bool:
+    return pa is not None and bool(accept) and ARROW_MEDIA_TYPE in accept
+
+
+def _arrow_type(type_code: Any) -> Any:
+    """pyodbc description type_code (Python tipi) -> Arrow tipi; bilinmiyorsa None (çıkarım)."""
+    if type_code is bool:
+        return pa.bool_()
+    if type_code is int:
+        return pa.int64()
+    if type_code in (float, decimal.Decimal):
+        # JSON yolu ile aynı: decimal -> float
+        return pa.float64()
+    if type_code is dt.datetime:
+        return pa.timestamp("us")
+    if type_code is dt.date:
+        return pa.date32()
+    if type_code is dt.time:
+        return pa.time64("us")
+    if type_code in (bytes, bytearray):
+        return pa.binary()
+    if type_code in (str, uuid.UUID):
+        return pa.string()
+    return None
+
+
+def _arrow_schema(description: Any) -> Any:
+    # tipi bilinmeyen kolonlar (ör. sql_variant) metin olarak gider
+    return pa.schema([pa.field(str(d[0]), _arrow_type(d[1]) or pa.string()) for d in description])
+
+
+def _arrow_column(values: Any, field: Any, type_code: Any) -> Any:
+    if type_code is decimal.Decimal:
+        values = [None if v is None else float(v) for v in values]
+    elif field.type == pa.string() and type_code is not str:
+        values = [None if v is None else str(v) for v in values]
     try:
-        _require_token(x_token)
-        _validate_query(req.query)
+        return pa.array(values, type=field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if field.type != pa.string():
+            raise
+        # sürücü str bildirip farklı tip döndürdüyse
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
 
-        conn = pyodbc.connect(conn_str, timeout=10)
-        cur = conn.cursor()
-        cur.execute(req.query, params)
 
-        if cur.description:
-            cols = [d[0] for d in cur.description]
-            rows = cur.fetchmany(MAX_ROWS + 1)
-            if len(rows) > MAX_ROWS:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"Result too large (>{MAX_ROWS} rows). Please add filters.",
-                )
-            data_rows = [[_encode_value(v) for v in row] for row in rows]
-            return {"columns": cols, "rows": data_rows, "rowcount": len(data_rows)}
+def _arrow_batch(schema: Any, description: Any, rows: list[Any]) -> Any:
+    columns = list(zip(*rows)) if rows else [() for _ in description]
+    arrays = [_arrow_column(values, field, d[1]) for field, d, values in zip(schema, description, columns)]
+    return pa.record_batch(arrays, schema=schema)
+
+
+_ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
 
-        conn.commit()
-        rc = cur.rowcount if cur.rowcount is not None else -1
-        return {"columns": [], "rows": [], "affected_rows": rc}
 
+def _arrow_ipc(description: Any, rows: list[Any]) -> bytes:
+    schema = _arrow_schema(description)
+    batch = _arrow_batch(schema, description, rows)
+    return schema.serialize().to_pybytes() + batch.serialize().to_pybytes() + _ARROW_EOS
+
+
+@contextmanager
+def _sql_errors(query: str, endpoint: str = "sql") -> Iterator[None]:
+    """SQL endpoint'leri için ortak hata eşlemesi (403 log, havuz/sorgu zaman aşımı, diğerleri -> 500)."""
+    try:
+        yield
     except HTTPException as e:
+        _m_errors.inc((endpoint, str(e.status_code)))
         if e.status_code == 403:
-            print("[403 FORBIDDEN SQL]", req.query.strip().replace("\n", " ")[:200])
+            print("[403 FORBIDDEN SQL]", query.strip().replace("\n", " ")[:200])
             print("[403 DETAIL]", e.detail)
         raise
-
+    except AdmissionRejected as e:
+        _m_errors.inc((endpoint, "429"))
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except PoolTimeout as e:
+        _m_errors.inc((endpoint, "503"))
+        raise HTTPException(status_code=503, detail=str(e))
+    except QueryTimeout as e:
+        _m_errors.inc((endpoint, "504"))
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
+        _m_errors.inc((endpoint, "500"))
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _close_cursor(cur: Any) -> None:
+    try:
+        cur.close()
+    except Exception:
+        pass
+
+
+# ============================================================
+#  DB İŞLERİ (DbExecutor thread'lerinde çalışır)
+# ============================================================
+
+def _result_payload(conn: Any, cur: Any, arrow: bool, timer: PhaseTimer) -> tuple[dict[str, Any] | bytes, int]:
+    """Çalışmış cursor'dan cevap; (cevap, sonuç satır sayısı), sonuç kümesi yoksa -1 ve commit."""
+    if cur.description:
+        cols = [d[0] for d in cur.description]
+        with timer.phase("fetch"):
+            rows = cur.fetchmany(MAX_ROWS + 1)
+        if len(rows) > MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Result too large (>{MAX_ROWS} rows). Please add filters.",
+            )
+        timer.rows = len(rows)
+        with timer.phase("encode"):
+            if arrow:
+                return _arrow_ipc(cur.description, rows), len(rows)
+            data_rows = _encode_rows(cur.description, rows)
+        payload = {
+            "columns": cols,
+            "types": _column_types(cur.description),
+            "rows": data_rows,
+            "rowcount": len(data_rows),
+        }
+        return payload, len(data_rows)
+
+    with timer.phase("commit"):
+        conn.commit()
+    rc = cur.rowcount if cur.rowcount is not None else -1
+    return {"columns": [], "rows": [], "affected_rows": rc}, -1
+
+
+def _run_sql(
+    query: str, params: list[Any], arrow: bool, timer: PhaseTimer, deadline: float
+) -> tuple[dict[str, Any] | bytes, int]:
+    """(cevap, sonuç satır sayısı); sonuç kümesi yoksa satır sayısı -1."""
+    with _get_pool().connection(timer) as conn:
+        _apply_query_timeout(conn, deadline)
+        cur = conn.cursor()
+        try:
+            with timer.phase("execute"):
+                cur.execute(query, params)
+            return _result_payload(conn, cur, arrow, timer)
+        finally:
+            _close_cursor(cur)
+
+
+def _run_named(
+    name: str, query: str, params: list[Any], arrow: bool, timer: PhaseTimer, deadline: float
+) -> tuple[dict[str, Any] | bytes, int]:
+    """
+    İsimli sorgu: bağlantı başına saklanan cursor'da çalışır. pyodbc aynı cursor'da aynı metni
+    tekrar SQLPrepare etmez; sadece parametreler gönderilir.
+    Not: sürücü sorgu zaman aşımı cursor oluşturulurken alınır (ilk kullanımdaki kalan süre).
+    """
+    pool = _get_pool()
+    with timer.phase("borrow"):
+        pc = pool.acquire()
+    broken = False
+    try:
+        _apply_query_timeout(pc.conn, deadline)
+        cur = pc.cursors.get(name)
+        if cur is None:
+            cur = pc.cursors[name] = pc.conn.cursor()
+        try:
+            with timer.phase("execute"):
+                cur.execute(query, params)
+            return _result_payload(pc.conn, cur, arrow, timer)
+        except BaseException:
+            # yarım kalmış sonuç kümesi bağlantıyı meşgul etmesin; sonraki çağrı yeni cursor açar
+            pc.cursors.pop(name, None)
+            _close_cursor(cur)
+            raise
+    except pool.disconnect_errors:
+        broken = True
+        raise
     finally:
+        pool.release(pc, broken=broken)
+
+
+def _run_batch(query: str, params_list: list[list[Any]], timer: PhaseTimer, deadline: float) -> dict[str, Any]:
+    with _get_pool().connection(timer) as conn:
+        _apply_query_timeout(conn, deadline)
+        cur = conn.cursor()
+        try:
+            cur.fast_executemany = FAST_EXECUTEMANY
+            with timer.phase("execute"):
+                cur.executemany(query, params_list)
+            with timer.phase("commit"):
+                conn.commit()
+            rc = cur.rowcount if cur.rowcount is not None else -1
+            return {"columns": [], "rows": [], "affected_rows": rc, "batch_size": len(params_list)}
+        finally:
+            _close_cursor(cur)
+
+
+def _run_tx(statements: list[SqlStatement], timer: PhaseTimer, deadline: float) -> dict[str, Any]:
+    # parametreler sql_tx'te _adapt_params'tan geçirilmiş olarak gelir
+    results: list[int] = []
+    with _get_pool().connection(timer) as conn:
+        _apply_query_timeout(conn, deadline)
+        cur = conn.cursor()
+        try:
+            with timer.phase("execute"):
+                for st in statements:
+                    if st.params_list is not None:
+                        if not st.params_list:
+                            results.append(0)
+                            continue
+                        cur.fast_executemany = FAST_EXECUTEMANY
+                        cur.executemany(st.query, st.params_list)
+                    else:
+                        cur.fast_executemany = False
+                        cur.execute(st.query, st.params)
+                    results.append(cur.rowcount if cur.rowcount is not None else -1)
+            with timer.phase("commit"):
+                conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            _close_cursor(cur)
+
+    total = sum(r for r in results if r > 0)
+    return {"columns": [], "rows": [], "affected_rows": total, "results": results}
+
+
+def _open_stream(query: str, params: list[Any], timer: PhaseTimer, deadline: float) -> tuple[Any, Any, Any]:
+    """Bağlantıyı ödünç alır ve sorguyu başlatır; bağlantı stream bitene kadar havuza dönmez."""
+    pool = _get_pool()
+    with timer.phase("borrow"):
+        pc = pool.acquire()
+    cur = None
+    try:
+        _apply_query_timeout(pc.conn, deadline)
+        cur = pc.conn.cursor()
+        with timer.phase("execute"):
+            cur.execute(query, params)
+        if not cur.description:
+            raise HTTPException(status_code=400, detail="Query did not return a result set")
+        return pc, cur, cur.description
+    except BaseException as e:
+        if cur is not None:
+            _close_cursor(cur)
+        pool.release(pc, broken=isinstance(e, pool.disconnect_errors))
+        raise
+
+
+def _fetch_batch(conn: Any, cur: Any, size: int, deadline: float) -> list[Any]:
+    # kalan süre sorgu zaman aşımına çevrilir; süre dolduysa fetchmany hiç çağrılmaz
+    _apply_query_timeout(conn, deadline)
+    return cur.fetchmany(size)
+
+
+def _close_stream(pc: Any, cur: Any, broken: bool) -> None:
+    _close_cursor(cur)
+    pool = _pool
+    if pool is not None:
+        pool.release(pc, broken=broken)
+    else:
         try:
-            if conn is not None:
-                conn.close()
+            pc.conn.close()
         except Exception:
             pass
 
+
+class _StreamSource:
+    """
+    Akışın ödünç aldığı bağlantı + cursor. Client koparsa ya da bir parça zaman aşımına uğrarsa await
+    bırakılır ama fetchmany DbExecutor thread'inde sürer; bağlantı o fetch bitene kadar havuza dönmez.
+    Kapatmayı yarıda kalan fetch'in kendisi yapar ve bağlantı bozuk sayılır (sonuç kümesi yarım).
+    """
+
+    def __init__(self, executor: DbExecutor, pc: Any, cur: Any) -> None:
+        self._executor = executor
+        self._pc = pc
+        self._cur = cur
+        self._deadline = time.monotonic() + STREAM_TIMEOUT if STREAM_TIMEOUT > 0 else None
+        self._lock = threading.Lock()
+        self._fetching = False
+        self._closed = False
+
+    def _fetch(self, size: int, deadline: float) -> list[Any]:
+        with self._lock:
+            if self._closed:
+                # kuyrukta beklerken akış kapandı; cursor'a dokunma
+                return []
+            self._fetching = True
+        try:
+            if self._deadline is not None:
+                deadline = min(deadline, self._deadline)
+            return _fetch_batch(self._pc.conn, self._cur, size, deadline)
+        finally:
+            with self._lock:
+                self._fetching = False
+                orphaned = self._closed
+            if orphaned:
+                _close_stream(self._pc, self._cur, True)
+
+    async def fetch(self, size: int) -> list[Any]:
+        return await self._executor.run(self._fetch, size)
+
+    def close(self, broken: bool) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._fetching:
+                return  # _fetch bitince kapatır
+        # rollback/close event loop'u bloklamasın
+        self._executor.run_background(_close_stream, self._pc, self._cur, broken)
+
+
+class _StreamResponse(StreamingResponse):
+    """
+    StreamingResponse + on_close: cevap gönderimi bitince her durumda çağrılır. Client ilk bayttan önce
+    koparsa gövde üreteci hiç başlamaz ve finally'si çalışmaz; bağlantı/kabul birimi burada bırakılır.
+    (BackgroundTask ClientDisconnect'te çalışmaz.)
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], on_close: Callable[[], None], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+
+async def _ndjson_rows(
+    src: _StreamSource,
+    description: Any,
+    batch_size: int,
+    timer: PhaseTimer,
+    on_done: Callable[[bool, int], None],
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON çerçeveleri:
+      {"columns": [...], "types": [...]} -> ilk satır
+      {"rows": [[...], ...]}             -> fetchmany(batch_size) başına bir satır
+      {"rowcount": n, "done": true}      -> son satır
+      {"error": "..."}                   -> akış ortasında hata (HTTP durumu artık değiştirilemez)
+    """
+    broken = False
+    nbytes = 0
+    encode = _row_encoder(description)
+    try:
+        chunk = _ndjson({"columns": [d[0] for d in description], "types": _column_types(description)})
+        nbytes += len(chunk)
+        yield chunk
+        total = 0
+        while True:
+            with timer.phase("fetch"):
+                rows = await src.fetch(batch_size)
+            if not rows:
+                break
+            total += len(rows)
+            timer.rows = total
+            with timer.phase("encode"):
+                chunk = _ndjson({"rows": [encode(row) for row in rows]})
+            nbytes += len(chunk)
+            yield chunk
+        yield _ndjson({"rowcount": total, "done": True})
+    except Exception as e:
+        broken = isinstance(e, _backend.disconnect_errors)
+        yield _ndjson({"error": str(e)})
+    finally:
+        # istemci yarıda koparsa da buraya gelinir
+        on_done(broken, nbytes)
+
+
+async def _arrow_rows(
+    src: _StreamSource,
+    description: Any,
+    batch_size: int,
+    timer: PhaseTimer,
+    on_done: Callable[[bool, int], None],
+) -> AsyncIterator[bytes]:
+    """Arrow IPC stream: şema mesajı, fetchmany başına bir record batch, sonda EOS.
+    Akış ortasında hata olursa bağlantı EOS yazılmadan kesilir; client eksik stream hatası alır."""
+    broken = False
+    nbytes = 0
+    try:
+        schema = _arrow_schema(description)
+        chunk = schema.serialize().to_pybytes()
+        nbytes += len(chunk)
+        yield chunk
+        while True:
+            with timer.phase("fetch"):
+                rows = await src.fetch(batch_size)
+            if not rows:
+                break
+            timer.rows += len(rows)
+            with timer.phase("encode"):
+                chunk = _arrow_batch(schema, description, rows).serialize().to_pybytes()
+            nbytes += len(chunk)
+            yield chunk
+        yield _ARROW_EOS
+    except Exception as e:
+        broken = isinstance(e, _backend.disconnect_errors)
+        raise
+    finally:
+        on_done(broken, nbytes)
+
+
+# ============================================================
+#  METRİKLER (/metrics, Prometheus metin formatı)
+#  Etiketler: endpoint (sql/q/batch/tx/stream), kind (select/insert/...), object (dokunulan tablolar).
+#  object kümesi whitelist ile sınırlı olduğundan kardinalite küçük kalır.
+# ============================================================
+
+_metrics = Registry()
+_m_phase = _metrics.histogram(
+    "uzmanrapor_sql_phase_seconds",
+    "Aşama süreleri: validate, borrow, execute, fetch, encode, serialize, commit",
+    ("phase", "kind", "object"),
+)
+_m_request = _metrics.histogram(
+    "uzmanrapor_sql_request_seconds",
+    "Uçtan uca SQL isteği süresi (doğrulamadan cevabın hazırlanmasına)",
+    ("endpoint", "kind", "object"),
+)
+_m_rows = _metrics.counter("uzmanrapor_sql_rows_total", "Dönen satır sayısı", ("endpoint", "kind", "object"))
+_m_bytes = _metrics.counter(
+    "uzmanrapor_sql_response_bytes_total", "Dönen gövde baytları (sıkıştırma öncesi)", ("endpoint", "kind", "object")
+)
+_m_errors = _metrics.counter("uzmanrapor_sql_errors_total", "Hata cevapları", ("endpoint", "status"))
+
+
+def _pool_gauges() -> list[tuple[tuple[str, ...], float]]:
+    if _pool is None:
+        return []
+    st = _pool.stats()
+    return [((k,), st[k]) for k in ("size", "idle", "in_use", "max_size")]
+
+
+def _pool_events() -> list[tuple[tuple[str, ...], float]]:
+    if _pool is None:
+        return []
+    st = _pool.stats()
+    return [((k,), st[k]) for k in ("created", "closed", "borrowed", "waited", "timeouts", "health_check_failures")]
+
+
+def _executor_gauges() -> list[tuple[tuple[str, ...], float]]:
+    if _db_executor is None:
+        return []
+    st = _db_executor.stats()
+    return [((k,), st[k]) for k in ("workers", "queued", "running")]
+
+
+def _cache_lookups() -> list[tuple[tuple[str, ...], float]]:
+    res, val = _result_cache.stats(), _validation_cache.stats()
+    return [
+        (("result", "hit"), res["hits"]),
+        (("result", "miss"), res["misses"]),
+        (("validation", "hit"), val["hits"]),
+        (("validation", "miss"), val["misses"]),
+        (("etag", "hit"), _etag_stats["not_modified"]),
+        (("etag", "miss"), _etag_stats["sent"]),
+    ]
+
+
+_metrics.gauge_callback("uzmanrapor_pool_connections", "DB bağlantı havuzu durumu", ("state",), _pool_gauges)
+_metrics.gauge_callback(
+    "uzmanrapor_pool_events_total", "DB bağlantı havuzu olayları", ("event",), _pool_events, kind="counter"
+)
+_metrics.gauge_callback("uzmanrapor_db_executor", "DB thread havuzu (işçi/kuyruk/çalışan)", ("state",), _executor_gauges)
+_metrics.gauge_callback(
+    "uzmanrapor_cache_lookups_total", "Önbellek aramaları", ("cache", "result"), _cache_lookups, kind="counter"
+)
+_metrics.gauge_callback(
+    "uzmanrapor_cache_entries",
+    "Önbellekteki kayıt sayısı",
+    ("cache",),
+    lambda: [(("result",), _result_cache.stats()["entries"]), (("validation",), _validation_cache.stats()["entries"])],
+)
+
+
+def _admission_gauges() -> list[tuple[tuple[str, ...], float]]:
+    st = _admission.stats()
+    return [((k,), st[k]) for k in ("capacity", "in_use", "waiting", "active_clients")]
+
+
+def _admission_events() -> list[tuple[tuple[str, ...], float]]:
+    st = _admission.stats()
+    return [((k,), st[k]) for k in ("admitted", "queued", "rejected", "timeouts")]
+
+
+_metrics.gauge_callback("uzmanrapor_admission", "Kabul kontrolü (birim/bekleyen)", ("state",), _admission_gauges)
+_metrics.gauge_callback(
+    "uzmanrapor_admission_events_total", "Kabul kontrolü olayları", ("event",), _admission_events, kind="counter"
+)
+
+
+def _labels(head: str, tables: frozenset[str] | None) -> tuple[str, str]:
+    if tables is None:
+        return head or "-", "unknown"
+    return head or "-", ",".join(sorted(tables)) or "-"
+
+
+def _observe(
+    endpoint: str,
+    head: str,
+    tables: frozenset[str] | None,
+    timer: PhaseTimer,
+    nbytes: int,
+    query: str = "",
+    nparams: int = 0,
+) -> None:
+    """İstek bitti: metrikler + eşik aşıldıysa yavaş sorgu günlüğü."""
+    kind, obj = _labels(head, tables)
+    elapsed = timer.elapsed()
+    for phase, secs in timer.phases.items():
+        _m_phase.observe((phase, kind, obj), secs)
+    _m_request.observe((endpoint, kind, obj), elapsed)
+    if timer.rows:
+        _m_rows.inc((endpoint, kind, obj), timer.rows)
+    if nbytes:
+        _m_bytes.inc((endpoint, kind, obj), nbytes)
+    if SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS:
+        _log_slow(endpoint, kind, obj, timer, elapsed, nbytes, query, nparams)
+
+
+# ============================================================
+#  SERVER-TIMING + YAVAŞ SORGU GÜNLÜĞÜ
+# ============================================================
+
+def _server_timing(timer: PhaseTimer) -> str:
+    """Ör. `validate;dur=0.05, borrow;dur=0.01, execute;dur=12.3, ..., total;dur=15.2` (ms)."""
+    parts = [f"{phase};dur={secs * 1000:.2f}" for phase, secs in timer.phases.items()]
+    parts.append(f"total;dur={timer.elapsed() * 1000:.2f}")
+    return ", ".join(parts)
+
+
+_slow_logger: logging.Logger | None = None
+
+
+def _get_slow_logger() -> logging.Logger:
+    global _slow_logger
+    if _slow_logger is None:
+        logger = logging.getLogger("uzmanrapor.slow_query")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                SLOW_QUERY_LOG,
+                maxBytes=int(SLOW_QUERY_LOG_MB * 1024 * 1024),
+                backupCount=SLOW_QUERY_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _slow_logger = logger
+    return _slow_logger
+
+
+def _normalize_sql(query: str) -> str:
+    # literal'ler maskelenir (günlüğe veri sızmasın), boşluklar tek boşluğa indirgenir
+    try:
+        masked = _mask_sql(query)
+    except ValueError:
+        masked = query
+    return " ".join(masked.split())[:2000]
+
+
+def _log_slow(
+    endpoint: str,
+    kind: str,
+    obj: str,
+    timer: PhaseTimer,
+    elapsed: float,
+    nbytes: int,
+    query: str,
+    nparams: int,
+) -> None:
+    record = {
+        "ts": dt.datetime.now().isoformat(timespec="milliseconds"),
+        "endpoint": endpoint,
+        "kind": kind,
+        "object": obj,
+        "ms": round(elapsed * 1000, 2),
+        "phases_ms": {phase: round(secs * 1000, 2) for phase, secs in timer.phases.items()},
+        "rows": timer.rows,
+        "bytes": nbytes,
+        "params": nparams,
+        "sql": _normalize_sql(query),
+    }
+    try:
+        _get_slow_logger().info(json.dumps(record, ensure_ascii=False))
+    except Exception:
+        logger.warning("yavaş sorgu kaydı yazılamadı", exc_info=True)
+
+
+# ============================================================
+#  ENDPOINT'LER
+#  Not: async handler'lar sadece doğrulama yapar; pyodbc işi DbExecutor'a gider.
+# ============================================================
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(content=_metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/health")
+async def health() -> dict[str, Any]:
+    out: dict[str, Any] = {"status": "ok", "backend": _backend.describe()}
+    if _pool is not None:
+        out["pool"] = _pool.stats()
+    if _db_executor is not None:
+        out["executor"] = _db_executor.stats()
+    out["cache"] = _result_cache.stats()
+    out["etag"] = {**_etag_stats, "enabled": ETAG_MAX_AGE > 0}
+    out["validation"] = _validation_cache.stats()
+    out["admission"] = _admission.stats()
+    return out
+
+
+async def _execute(
+    request: Request,
+    query: str,
+    params: list[Any],
+    arrow: bool,
+    head: str,
+    tables: frozenset[str] | None,
+    run: Callable[..., Any],
+    *run_args: Any,
+    endpoint: str,
+    timer: PhaseTimer,
+    heavy: bool,
+) -> Response:
+    """
+    Doğrulanmış tek ifadeyi çalıştırır (/sql ve /q/{name}).
+    SELECT cevaplarında ETag döner (sorgu + parametre + dokunulan tabloların sürümleri);
+    If-None-Match aynıysa DB'ye gidilmeden 304. Önbelleğe uygun tablolarda sonuç önbelleği kullanılır.
+    """
+    etag: str | None = None
+    if head in {"select", "with"} and tables:
+        # sürümler sorgudan ÖNCE alınır: okuma sırasında commit edilen yazım yeni ETag'e düşer
+        versions = _table_versions.snapshot(tables)
+        key = _cache_key(query, params, arrow)
+        if ETAG_MAX_AGE > 0:
+            etag = _etag(key, versions)
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                _etag_stats["not_modified"] += 1
+                _observe(endpoint, head, tables, timer, 0, query, len(params))
+                return Response(status_code=304, headers={"ETag": etag, "Server-Timing": _server_timing(timer)})
+
+        result = None
+        if _result_cache.cacheable(tables):
+            result = _result_cache.get(key, versions)
+        if result is None:
+            async with _admitted(request, heavy, timer):
+                result, nrows = await _get_executor().run(run, *run_args, query, params, arrow, timer)
+            if _result_cache.cacheable(tables) and nrows <= CACHE_MAX_ROWS:
+                _result_cache.put(key, tables, versions, result)
+    elif head in {"insert", "update", "delete"}:
+        try:
+            async with _admitted(request, heavy, timer):
+                result, _ = await _get_executor().run(
+                    run,
+                    *run_args,
+                    query,
+                    params,
+                    arrow,
+                    timer,
+                    on_orphan=lambda _r: _tables_written(tables),
+                )
+        finally:
+            # başarısız/zaman aşımına düşen yazım da commit olmuş olabilir
+            _tables_written(tables)
+    else:
+        async with _admitted(request, heavy, timer):
+            result, _ = await _get_executor().run(run, *run_args, query, params, arrow, timer)
+
+    headers = {"ETag": etag} if etag else None
+    if etag:
+        _etag_stats["sent"] += 1
+    with timer.phase("serialize"):
+        if isinstance(result, bytes):
+            response = Response(content=result, media_type=ARROW_MEDIA_TYPE, headers=headers)
+        else:
+            # satırlar _encode_rows ile JSON'a hazır; jsonable_encoder'ın hücre bazlı gezintisi gereksiz
+            response = Response(content=_dumps(result), media_type="application/json", headers=headers)
+    response.headers["Server-Timing"] = _server_timing(timer)
+    _observe(endpoint, head, tables, timer, len(response.body), query, len(params))
+    return response
+
+
+async def _stream(
+    request: Request,
+    query: str,
+    params: list[Any],
+    accept: str | None,
+    endpoint: str,
+    tables: frozenset[str] | None,
+    timer: PhaseTimer,
+) -> StreamingResponse:
+    # akışlar her zaman ağır sınıftadır; birim akış bitene kadar tutulur
+    with timer.phase("admit"):
+        ticket = await _admission.acquire(_client_id(request), True)
+    executor = _get_executor()
+    try:
+        pc, cur, description = await executor.run(
+            _open_stream,
+            query,
+            params,
+            timer,
+            on_orphan=lambda st: _close_stream(st[0], st[1], False),
+        )
+    except BaseException:
+        ticket.release()
+        raise
+
+    src = _StreamSource(executor, pc, cur)
+    closed = False
+
+    def _done(broken: bool, nbytes: int) -> None:
+        # gövde bittiğinde ya da cevap kapandığında (gövde hiç okunmadıysa da); bir kez çalışır
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        src.close(broken)
+        ticket.release()
+        _observe(endpoint, "select", tables, timer, nbytes, query, len(params))
+
+    # akışta başlık gövdeden önce gider: sadece ilk satıra kadarki aşamalar (validate/borrow/execute)
+    headers = {"Server-Timing": _server_timing(timer)}
+    if _wants_arrow(accept):
+        return _StreamResponse(
+            _arrow_rows(src, description, STREAM_BATCH_ROWS, timer, _done),
+            on_close=lambda: _done(False, 0),
+            media_type=ARROW_MEDIA_TYPE,
+            headers=headers,
+        )
+    return _StreamResponse(
+        _ndjson_rows(src, description, STREAM_BATCH_ROWS, timer, _done),
+        on_close=lambda: _done(False, 0),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
+@app.post("/sql", response_model=None)
+async def sql(
+    req: SqlRequest,
+    request: Request,
+    x_token: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
+) -> Response:
+    timer = PhaseTimer()
+    with _sql_errors(req.query):
+        _require_token(x_token)
+        params = _adapt_params(req.query, list(req.params or []))
+        with timer.phase("validate"):
+            info = _validate_query(req.query)
+        return await _execute(
+            request,
+            req.query,
+            params,
+            _wants_arrow(accept),
+            info.head,
+            info.tables,
+            _run_sql,
+            endpoint="sql",
+            timer=timer,
+            heavy=info.heavy,
+        )
+
+
+@app.post("/sql/batch")
+async def sql_batch(
+    req: SqlBatchRequest,
+    request: Request,
+    response: Response,
+    x_token: str | None = Header(default=None),
+) -> dict[str, Any]:
+    """Aynı DML ifadesini çok sayıda parametre setiyle tek round trip + tek transaction'da çalıştırır."""
+    timer = PhaseTimer()
+    with _sql_errors(req.query, "batch"):
+        _require_token(x_token)
+        with timer.phase("validate"):
+            info = _validate_query(req.query)
+        head = info.head
+        if head not in {"insert", "update", "delete"}:
+            raise HTTPException(status_code=403, detail="Batch only allowed for INSERT/UPDATE/DELETE")
+        if len(req.params_list) > MAX_BATCH_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch too large (>{MAX_BATCH_ROWS} rows). Please split it.",
+            )
+        if not req.params_list:
+            return {"columns": [], "rows": [], "affected_rows": 0}
+
+        params_list = [_adapt_params(req.query, list(p)) for p in req.params_list]
+        tables = info.tables
+        try:
+            async with _admitted(request, True, timer):
+                result = await _get_executor().run(
+                    _run_batch, req.query, params_list, timer, on_orphan=lambda _r: _tables_written(tables)
+                )
+        finally:
+            _tables_written(tables)
+        response.headers["Server-Timing"] = _server_timing(timer)
+        _observe("batch", head, tables, timer, 0, req.query, len(params_list))
+        return result
+
+
+@app.post("/sql/tx")
+async def sql_tx(
+    req: SqlTransactionRequest,
+    request: Request,
+    response: Response,
+    x_token: str | None = Header(default=None),
+) -> dict[str, Any]:
+    """
+    Birden çok DML ifadesini tek bağlantıda, tek transaction ile çalıştırır (hepsi ya da hiçbiri).
+    Ör. replace-all kayıtlar: DELETE + toplu INSERT -> okuyucu arada boş tablo görmez.
+    """
+    timer = PhaseTimer()
+    first_query = req.statements[0].query if req.statements else ""
+    with _sql_errors(first_query, "tx"):
+        _require_token(x_token)
+        if len(req.statements) > MAX_TX_STATEMENTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many statements (>{MAX_TX_STATEMENTS}) in one transaction.",
+            )
+
+        # Önce hepsini doğrula; DB'ye hiçbir şey gitmeden reddedilsin
+        touched: set[str] | None = set()
+        for i, st in enumerate(req.statements):
+            try:
+                with timer.phase("validate"):
+                    info = _validate_query(st.query)
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail=f"Statement {i}: {e.detail}") from e
+            if info.head not in {"insert", "update", "delete"}:
+                raise HTTPException(status_code=403, detail="Transaction only allowed for INSERT/UPDATE/DELETE")
+            if st.params_list is not None and len(st.params_list) > MAX_BATCH_ROWS:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Batch too large (>{MAX_BATCH_ROWS} rows). Please split it.",
+                )
+            try:
+                if st.params_list is not None:
+                    st.params_list = [_adapt_params(st.query, list(p)) for p in st.params_list]
+                else:
+                    st.params = _adapt_params(st.query, list(st.params or []))
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail=f"Statement {i}: {e.detail}") from e
+            if touched is not None:
+                touched = None if info.tables is None else touched | info.tables
+        tables = None if touched is None else frozenset(touched)
+        try:
+            # tek ifadelik transaction (ör. tek satır kaydı) hafif, çok ifadeli olan ağır sayılır
+            heavy = len(req.statements) > 1 or any(st.params_list for st in req.statements)
+            async with _admitted(request, heavy, timer):
+                result = await _get_executor().run(
+                    _run_tx, req.statements, timer, on_orphan=lambda _r: _tables_written(tables)
+                )
+        finally:
+            _tables_written(tables)
+        response.headers["Server-Timing"] = _server_timing(timer)
+        _observe("tx", "tx", tables, timer, 0, " | ".join(st.query for st in req.statements), len(req.statements))
+        return result
+
+
+@app.post("/sql/stream")
+async def sql_stream(
+    req: SqlRequest,
+    request: Request,
+    x_token: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
+) -> StreamingResponse:
+    """
+    Büyük SELECT'ler için: satırlar fetchmany ile parça parça okunup geldikçe NDJSON olarak yazılır.
+    MAX_ROWS sınırı uygulanmaz; sunucu belleği parça boyutuyla sınırlı kalır.
+    """
+    timer = PhaseTimer()
+    with _sql_errors(req.query, "stream"):
+        _require_token(x_token)
+        params = _adapt_params(req.query, list(req.params or []))
+        with timer.phase("validate"):
+            info = _validate_query(req.query)
+        if info.head not in {"select", "with"}:
+            raise HTTPException(status_code=403, detail="Streaming only allowed for SELECT")
+        return await _stream(request, req.query, params, accept, "stream", info.tables, timer)
+
+
+# ============================================================
+#  İSİMLİ SORGULAR (/q/{name})
+#  Katalog açılışta bir kez doğrulanır; istek başına doğrulama yapılmaz.
+# ============================================================
+
+def _named_query(name: str) -> _QueryInfo:
+    info = _catalog.get(name)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Unknown named query: {name}")
+    return info
+
+
+@app.get("/q")
+async def named_list(x_token: str | None = Header(default=None)) -> dict[str, Any]:
+    _require_token(x_token)
+    return {"queries": sorted(_catalog)}
+
+
+@app.post("/q/{name}", response_model=None)
+async def named(
+    name: str,
+    req: NamedQueryRequest,
+    request: Request,
+    x_token: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
+) -> Response:
+    timer = PhaseTimer()
+    with _sql_errors(name, "q"):
+        _require_token(x_token)
+        info = _named_query(name)
+        query = NAMED_QUERIES[name]
+        params = _adapt_params(query, list(req.params or []))
+        return await _execute(
+            request,
+            query,
+            params,
+            _wants_arrow(accept),
+            info.head,
+            info.tables,
+            _run_named,
+            name,
+            endpoint="q",
+            timer=timer,
+            heavy=info.heavy,
+        )
+
+
+@app.post("/q/{name}/stream")
+async def named_stream(
+    name: str,
+    req: NamedQueryRequest,
+    request: Request,
+    x_token: str | None = Header(default=None),
+    accept: str | None = Header(default=None),
+) -> StreamingResponse:
+    timer = PhaseTimer()
+    with _sql_errors(name, "q_stream"):
+        _require_token(x_token)
+        info = _named_query(name)
+        if info.head not in {"select", "with"}:
+            raise HTTPException(status_code=403, detail="Streaming only allowed for SELECT")
+        query = NAMED_QUERIES[name]
+        return await _stream(
+            request, query, _adapt_params(query, list(req.params or [])), accept, "q_stream", info.tables, timer
+        )
@@ -0,0 +1,193 @@
+# metrics.py
+"""
+Prometheus metin formatında (text/plain; version=0.0.4) basit metrikler.
+prometheus_client bağımlılığı yok: sayaç, histogram ve scrape anında okunan gauge'lar.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# saniye: sıcak yol (~ms) ile yavaş rapor sorguları (~10 sn+) arasını kapsar
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = tuple[str, ...]
+
+_INF_LE = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), value: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_label_str(self.labelnames, labels)} {_num(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # etiket -> [bucket sayıları..., toplam, adet]
+        self._values: dict[Labels, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                row[idx] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                le = _label_str(self.labelnames, labels, f'le="{_num(bound)}"')
+                yield f"{self.name}_bucket{le} {_num(cumulative)}"
+            yield f"{self.name}_bucket{_label_str(self.labelnames, labels, _INF_LE)} {_num(row[-1])}"
+            yield f"{self.name}_sum{_label_str(self.labelnames, labels)} {_num(row[-2])}"
+            yield f"{self.name}_count{_label_str(self.labelnames, labels)} {_num(row[-1])}"
+
+
+class GaugeCallback:
+    """Scrape anında okunan değerler (havuz doluluğu, önbellek boyutu gibi)."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[Labels, float]]],
+        kind: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.collect():
+            yield f"{self.name}{_label_str(self.labelnames, labels)} {_num(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram | GaugeCallback] = []
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        m = Counter(name, help_text, labelnames)
+        self._metrics.append(m)
+        return m
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        m = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(m)
+        return m
+
+    def gauge_callback(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[Labels, float]]],
+        kind: str = "gauge",
+    ) -> GaugeCallback:
+        m = GaugeCallback(name, help_text, labelnames, collect, kind)
+        self._metrics.append(m)
+        return m
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+class PhaseTimer:
+    """
+    Bir isteğin aşama süreleri (validate, borrow, execute, fetch, encode, serialize).
+    DB thread'inde doldurulur, istek sonunda event loop'ta histograma yazılır.
+    """
+
+    __slots__ = ("phases", "rows", "started")
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - t0)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
@@ -0,0 +1,104 @@
+# queries.py
+"""
+İsimli sorgu kataloğu: POST /q/{name} ile çağrılır.
+
+Client sadece isim + parametre gönderir. Metin sunucuda sabit olduğundan istek başına doğrulama
+yapılmaz (açılışta bir kez doğrulanır). Aynı metin her seferinde aynı bağlantı cursor'unda
+hazırlanmış olarak çalışır; SQL Server plan önbelleği de tek plan görür.
+
+Yeni sorgu eklerken: parametreler `?`, nesneler `dbo.` ile nitelenmiş olmalı (önbellek/ETag için). Veritabanı adı
+yazılmaz; bağlantının veritabanı (`UZMANRAPOR_SQL_DATABASE`) kullanılır.
+"""
+from __future__ import annotations
+
+# client'taki app/usta_defteri.py::_USTA_COLUMNS ile aynı kalmalı (isimli ve filtreli sorguların sayfaları birleşir)
+_USTA_DEFTERI_COLUMNS = """
+    Id AS Id,
+    CONVERT(varchar(10), Tarih, 104) AS Tarih,
+    Vardiya AS Saat,
+    Tezgah AS Tezgah,
+    KokTip AS Takdir,
+    HasisNo AS [Haşıl İşEm],
+    LeventNo AS Levent,
+    EtiketNo AS Etiket,
+    DokumaIsEmri AS [Dokuma İş Emri],
+    Metre AS Metre,
+    HasilNo AS [Haşıl no],
+    IsTanimi AS [İş tanımı],
+    YapilanIslem AS [Yapılan işlem],
+    IslemYapan AS [İşlem Yapan],
+    Aciklama AS [Açıklama]
+"""
+
+NAMED_QUERIES: dict[str, str] = {
+    # ---- Usta Defteri ----
+    # params: n
+    "usta_defteri.last_n": f"""
+        SELECT TOP (?) {_USTA_DEFTERI_COLUMNS}
+        FROM [dbo].[UstaDefteri]
+        ORDER BY Id DESC
+    """,
+    # params: başlangıç tarihi, bitiş tarihi (dahil)
+    "usta_defteri.range": f"""
+        SELECT {_USTA_DEFTERI_COLUMNS}
+        FROM [dbo].[UstaDefteri]
+        WHERE Tarih >= ? AND Tarih <= ?
+    """,
+    # Sayfalama (keyset, Id DESC): ilk sayfada son Id olarak Int64 üst sınırı gönderilir.
+    # OFFSET yerine `Id < son görülen Id`: sayfa derinliğinden bağımsız olarak PK üzerinde seek.
+    # params: n, son Id (hariç)
+    "usta_defteri.page": f"""
+        SELECT TOP (?) {_USTA_DEFTERI_COLUMNS}
+        FROM [dbo].[UstaDefteri]
+        WHERE Id < ?
+        ORDER BY Id DESC
+    """,
+    # params: n, başlangıç tarihi, bitiş tarihi (dahil), son Id (hariç)
+    "usta_defteri.range_page": f"""
+        SELECT TOP (?) {_USTA_DEFTERI_COLUMNS}
+        FROM [dbo].[UstaDefteri]
+        WHERE Tarih >= ? AND Tarih <= ? AND Id < ?
+        ORDER BY Id DESC
+    """,
+    # toplam kayıt (sayfalı listede arka planda)
+    "usta_defteri.count": "SELECT COUNT(*) AS Adet FROM [dbo].[UstaDefteri]",
+    # params: başlangıç tarihi, bitiş tarihi (dahil)
+    "usta_defteri.range_count": """
+        SELECT COUNT(*) AS Adet
+        FROM [dbo].[UstaDefteri]
+        WHERE Tarih >= ? AND Tarih <= ?
+    """,
+    # Kuşbakışı KPI: gün x vardiya x giriş saati ("(23:00)|HH:MM" -> HH) x iş tanımı kırılımında kayıt sayısı
+    # (tek sorgu); client satırları saatine göre vardiya pencerelerine atar (storage.count_usta_by_shift).
+    # params: başlangıç tarihi, bitiş tarihi (hariç). Index önerisi: sql/usta_defteri_kpi_index.sql
+    "usta_defteri.shift_counts": """
+        SELECT Tarih, LEFT(Vardiya, 7) AS Vardiya, SUBSTRING(Vardiya, 9, 2) AS Saat,
+               UPPER(IsTanimi) AS IsTanimi, COUNT(*) AS Adet
+        FROM [dbo].[UstaDefteri]
+        WHERE Tarih >= ? AND Tarih < ?
+        GROUP BY Tarih, LEFT(Vardiya, 7), SUBSTRING(Vardiya, 9, 2), UPPER(IsTanimi)
+    """,
+    # params: liste adı
+    "usta_defteri.lookup": """
+        SELECT Id, Value
+        FROM [dbo].[AppLookupValues]
+        WHERE ListName = ? AND IsActive = 1
+        ORDER BY SortOrder, Value
+    """,
+    # ---- Planlama / Kuşbakışı listeleri ----
+    "looms.blocked": "SELECT LoomNo FROM [dbo].[BlockedLooms] ORDER BY LoomNo",
+    "looms.dummy": "SELECT LoomNo FROM [dbo].[DummyLooms] ORDER BY LoomNo",
+    "looms.cut_map": "SELECT LoomNo, CutType FROM [dbo].[LoomCutMap]",
+    "types.selvedge_map": "SELECT RootType, Selvedge FROM [dbo].[TypeSelvedgeMap]",
+}
+
+# Kabul kontrolü sınıfı (True = ağır). Listede olmayanlar için metinden tahmin edilir (main._is_heavy).
+NAMED_QUERY_HEAVY: dict[str, bool] = {
+    # PK üzerinde seek + TOP: sayfa derinliğinden bağımsız olarak ucuz
+    "usta_defteri.page": False,
+    "usta_defteri.last_n": False,
+    # tarih aralığı boyunca tarama / gruplama
+    "usta_defteri.range": True,
+    "usta_defteri.range_count": True,
+    "usta_defteri.shift_counts": True,
+}
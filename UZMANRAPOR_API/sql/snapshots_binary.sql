@@ -0,0 +1,23 @@
+-- Snapshots ikili biçimi (app/snapshot_format.py): DataFrame'ler Arrow IPC (zstd seviye 1) olarak Data kolonunda tutulur.
+--
+-- Eski client'lar pickle -> zlib(9) -> hex metnini DataHex'e yazıyordu. Yeni client geçiş döneminde varsayılan
+-- olarak DataHex'i de yazar (eski client'lar okumaya devam eder); Data boşsa DataHex'i okur. Tüm client'lar
+-- güncellendikten sonra client'ta UZMANRAPOR_SNAPSHOT_LEGACY_HEX=0 ile DataHex yazımı kapatılır (NULL kalır).
+--
+-- Yeni client'ı dağıtmadan önce bir kez çalıştırın (çalışmamışsa client sadece DataHex okur/yazar).
+-- Tekrar çalıştırılabilir.
+
+USE [UzmanRaporDB];
+GO
+
+IF COL_LENGTH('dbo.Snapshots', 'Data') IS NULL
+    ALTER TABLE [dbo].[Snapshots] ADD Data varbinary(max) NULL;
+GO
+
+-- UZMANRAPOR_SNAPSHOT_LEGACY_HEX=0 iken yeni kayıtlarda DataHex NULL kalır
+IF EXISTS (
+    SELECT 1 FROM sys.columns
+    WHERE object_id = OBJECT_ID('dbo.Snapshots') AND name = 'DataHex' AND is_nullable = 0
+)
+    ALTER TABLE [dbo].[Snapshots] ALTER COLUMN DataHex nvarchar(max) NULL;
+GO
@@ -0,0 +1,183 @@
+-- UZMANRAPOR_BACKEND=sqlite için şema (backends.SqliteBackend açılışta çalıştırır, tekrar çalıştırılabilir).
+--
+-- API whitelist'indeki 13 tablonun SQLite karşılığı. Kolon adları SQL Server'daki ile aynıdır; tipler
+-- SQLite yakınlığına indirgenmiştir (nvarchar -> TEXT, bit -> INTEGER, varbinary -> BLOB).
+-- DATE / DATETIME2 bildirilen kolonlar okunurken date / datetime nesnesine çevrilir (pyodbc ile aynı tip).
+-- Tarihler ISO metin olarak saklanır; `Tarih >= '2024-01-01'` karşılaştırmaları metin sırasıyla doğru çalışır.
+
+CREATE TABLE IF NOT EXISTS AppMeta (
+    MetaKey   TEXT PRIMARY KEY,
+    MetaValue TEXT,
+    UpdatedAt DATETIME2
+);
+
+CREATE TABLE IF NOT EXISTS AppUsers (
+    Username     TEXT PRIMARY KEY,
+    Salt         TEXT NOT NULL,
+    PasswordHash TEXT NOT NULL,
+    Permissions  TEXT,
+    IsActive     INTEGER NOT NULL DEFAULT 1,
+    CreatedAt    DATETIME2 DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS AppLookupValues (
+    Id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    ListName  TEXT NOT NULL,
+    Value     TEXT NOT NULL,
+    IsActive  INTEGER NOT NULL DEFAULT 1,
+    SortOrder INTEGER NOT NULL DEFAULT 0,
+    CreatedBy TEXT,
+    CreatedAt DATETIME2 DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+    UpdatedBy TEXT,
+    UpdatedAt DATETIME2
+);
+CREATE INDEX IF NOT EXISTS IX_AppLookupValues_ListName ON AppLookupValues (ListName, IsActive);
+
+CREATE TABLE IF NOT EXISTS BlockedLooms (
+    LoomNo TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS DummyLooms (
+    LoomNo TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS LoomCutMap (
+    LoomNo  TEXT PRIMARY KEY,
+    CutType TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TypeSelvedgeMap (
+    RootType TEXT PRIMARY KEY,
+    Selvedge TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TipBuzulmeModel (
+    TipKodu       TEXT PRIMARY KEY,
+    GecmisBuzulme REAL,
+    SistemBuzulme REAL,
+    GuvenAraligi  REAL
+);
+
+CREATE TABLE IF NOT EXISTS NoteRules (
+    Id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    RuleData BLOB
+);
+
+-- Data: app/snapshot_format.py ikili biçimi; DataHex: eski pickle+zlib+hex kayıtları (sadece okunur)
+CREATE TABLE IF NOT EXISTS Snapshots (
+    Name    TEXT PRIMARY KEY,
+    DataHex TEXT,
+    Data    BLOB
+);
+
+CREATE TABLE IF NOT EXISTS UstaDefteri (
+    Id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    Tarih          DATE,
+    Vardiya        TEXT,
+    Tezgah         TEXT,
+    KokTip         TEXT,
+    HasisNo        TEXT,
+    LeventNo       TEXT,
+    EtiketNo       TEXT,
+    DokumaIsEmri   TEXT,
+    Metre          REAL,
+    HasilNo        TEXT,
+    IsTanimi       TEXT,
+    TarakGrubu     TEXT,
+    Orgu           TEXT,
+    TipOzellikleri TEXT,
+    IslemYapan     TEXT,
+    Aciklama       TEXT,
+    YapilanIslem   TEXT
+);
+-- usta_defteri.shift_counts / range sorguları (SQL Server'da sql/usta_defteri_kpi_index.sql)
+CREATE INDEX IF NOT EXISTS IX_UstaDefteri_Tarih ON UstaDefteri (Tarih, IsTanimi, Vardiya);
+CREATE INDEX IF NOT EXISTS IX_UstaDefteri_EtiketNo ON UstaDefteri (EtiketNo);
+
+-- ITEMA manuel ayarları (client: app/itema_settings.ITEMA_COLUMNS)
+CREATE TABLE IF NOT EXISTS ItemaAyar (
+    sira_no           INTEGER PRIMARY KEY AUTOINCREMENT,
+    tip               TEXT NOT NULL,
+    tarak             TEXT,
+    telef_ken1        TEXT,
+    telef_ken2        TEXT,
+    firca_secim       TEXT,
+    ufleme_zam_1      TEXT,
+    ufleme_zam_2      TEXT,
+    cimbar_secim      TEXT,
+    coz_tansiyon      TEXT,
+    devir             TEXT,
+    leno              TEXT,
+    ark_desen         TEXT,
+    agizlik           TEXT,
+    derinlik          TEXT,
+    pozisyon          TEXT,
+    testere_uzk       TEXT,
+    testere_yuk       TEXT,
+    tan_yay_pozisyon  TEXT,
+    tan_yay_yukseklik TEXT,
+    tan_yay_konumu    TEXT,
+    tan_yay_bogumu    TEXT,
+    zem_agizlik       TEXT,
+    kapanma_dur_1     TEXT,
+    oturma_duzeyi_1   TEXT,
+    kapanma_dur_2     TEXT,
+    oturma_duzeyi_2   TEXT,
+    rampa_1           TEXT,
+    rampa_2           TEXT,
+    rampa_3           TEXT,
+    rampa_4           TEXT,
+    rampa_5           TEXT,
+    rampa_6           TEXT,
+    aciklama          TEXT,
+    degisiklik_yapan  TEXT
+);
+CREATE INDEX IF NOT EXISTS IX_ItemaAyar_tip ON ItemaAyar (tip);
+
+-- Özellik aralığı -> ITEMA ayarı (client: itema_settings._fetch_makine_ayar_match)
+CREATE TABLE IF NOT EXISTS Makine_Ayar_Tablosu (
+    Id                    INTEGER PRIMARY KEY AUTOINCREMENT,
+    orgu_tipi             TEXT NOT NULL,
+    Cozgu1_Aralik         TEXT,
+    Atki1_Aralik          TEXT,
+    CozguSiklik_Aralik    TEXT,
+    AtkiSiklik_Aralik     TEXT,
+    Dokunabilirlik_Aralik TEXT,
+    TECRUBE_SAYISI        INTEGER,
+    tarak                 TEXT,
+    telef_ken1            TEXT,
+    telef_ken2            TEXT,
+    firca_secim           TEXT,
+    ufleme_zam_1          TEXT,
+    ufleme_zam_2          TEXT,
+    cimbar_secim          TEXT,
+    coz_tansiyon          TEXT,
+    devir                 TEXT,
+    leno                  TEXT,
+    ark_desen             TEXT,
+    agizlik               TEXT,
+    derinlik              TEXT,
+    pozisyon              TEXT,
+    testere_uzk           TEXT,
+    testere_yuk           TEXT,
+    tan_yay_pozisyon      TEXT,
+    tan_yay_yukseklik     TEXT,
+    tan_yay_konumu        TEXT,
+    tan_yay_bogumu        TEXT,
+    zem_agizlik           TEXT,
+    kapanma_dur_1         TEXT,
+    oturma_duzeyi_1       TEXT,
+    kapanma_dur_2         TEXT,
+    oturma_duzeyi_2       TEXT,
+    rampa_1               TEXT,
+    rampa_2               TEXT,
+    rampa_3               TEXT,
+    rampa_4               TEXT,
+    rampa_5               TEXT,
+    rampa_6               TEXT
+);
+CREATE INDEX IF NOT EXISTS IX_Makine_Ayar_Tablosu_orgu ON Makine_Ayar_Tablosu (orgu_tipi);
+
+-- storage._note_rules_table_exists: SELECT 1 FROM sys.objects WHERE object_id = OBJECT_ID('dbo.X') AND type = 'U'
+CREATE VIEW IF NOT EXISTS sys_objects AS
+    SELECT name AS object_id, name, 'U' AS type FROM sqlite_master WHERE type = 'table';
@@ -0,0 +1,24 @@
+-- Usta Defteri vardiya KPI sayımı (usta_defteri.shift_counts, storage.count_usta_by_shift) için önerilen index.
+--
+-- Sorgu UPPER(IsTanimi) ile gruplar. Kolon üzerindeki fonksiyon normal index'i kullanılamaz hale getirir;
+-- aynı ifadeyi PERSISTED hesaplanmış kolon olarak tutup index'lemek, sorguyu değiştirmeden (SQL Server ifadeyi
+-- kolonla eşleştirir) Tarih aralığında seek + kapsayan index okumasına çevirir.
+-- Gereken oturum ayarları (ANSI_NULLS, QUOTED_IDENTIFIER vb. ON) pyodbc/ODBC varsayılanlarıdır.
+--
+-- Bir kez, bakım penceresinde çalıştırın. Tekrar çalıştırılabilir.
+
+USE [UzmanRaporDB];
+GO
+
+IF COL_LENGTH('dbo.UstaDefteri', 'IsTanimiU') IS NULL
+    ALTER TABLE [dbo].[UstaDefteri] ADD IsTanimiU AS UPPER(IsTanimi) PERSISTED;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_UstaDefteri_Tarih_IsTanimiU' AND object_id = OBJECT_ID('dbo.UstaDefteri')
+)
+    CREATE NONCLUSTERED INDEX IX_UstaDefteri_Tarih_IsTanimiU
+        ON [dbo].[UstaDefteri] (Tarih, IsTanimiU)
+        INCLUDE (Vardiya);
+GO
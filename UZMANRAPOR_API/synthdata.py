@@ -0,0 +1,281 @@
+# synthdata.py
+"""
+SQLite arka ucu (UZMANRAPOR_BACKEND=sqlite) için üretim boyutlarında sentetik veri.
+
+  python synthdata.py --db uzmanrapor.sqlite                 # 6 ay Usta Defteri, 2201-2518 tezgah
+  python synthdata.py --db yuk.sqlite --months 24 --per-shift 120
+
+Şema yoksa kurulur (sql/sqlite_schema.sql). Doldurulan tablolar önce boşaltılır; AppUsers, AppMeta,
+NoteRules ve Snapshots'a dokunulmaz (client ilk açılışta admin kullanıcısını, Excel içe aktarımında
+snapshot'ları kendisi yazar). Snapshot'a benzer DataFrame'ler: dinamik_frame() / running_frame() (pandas).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+import string
+import time
+from typing import Any
+
+from backends import SqliteBackend
+
+LOOMS = [str(n) for n in range(2201, 2519)]
+IS_TANIM = [("DÜĞÜM", 45), ("TAKIM", 35), ("BAKIM", 12), ("DİĞER", 8)]
+SHIFTS = [("(07:00)", 7), ("(15:00)", 15), ("(23:00)", 23)]
+CUT_TYPES = ["ISAVER", "ROTOCUT", "ISAVERKit"]
+ORGU_TIPLERI = ["BEZAYAĞI", "DİMİ 2/1", "DİMİ 3/1", "SATEN", "PANAMA", "RİPS"]
+SELVEDGES = ["SÜS KENAR 1", "SÜS KENAR 2", "SÜS KENAR 3", "DÜZ", "LENO"]
+YAPILAN_ISLEM = ["ALINDI", "VERİLDİ", "KONTROL", "AYAR"]
+
+_ITEMA_SETTINGS = [
+    "tarak", "telef_ken1", "telef_ken2", "firca_secim", "ufleme_zam_1", "ufleme_zam_2", "cimbar_secim",
+    "coz_tansiyon", "devir", "leno", "ark_desen", "agizlik", "derinlik", "pozisyon", "testere_uzk",
+    "testere_yuk", "tan_yay_pozisyon", "tan_yay_yukseklik", "tan_yay_konumu", "tan_yay_bogumu", "zem_agizlik",
+    "kapanma_dur_1", "oturma_duzeyi_1", "kapanma_dur_2", "oturma_duzeyi_2",
+    "rampa_1", "rampa_2", "rampa_3", "rampa_4", "rampa_5", "rampa_6",
+]
+
+_SEEDED_TABLES = [
+    "UstaDefteri", "AppLookupValues", "BlockedLooms", "DummyLooms", "LoomCutMap", "TypeSelvedgeMap",
+    "TipBuzulmeModel", "ItemaAyar", "Makine_Ayar_Tablosu",
+]
+
+
+def _word(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(n))
+
+
+def _root_types(rng: random.Random, n: int) -> list[str]:
+    roots: set[str] = set()
+    while len(roots) < n:
+        roots.add(f"{_word(rng, 2)}{rng.randint(100, 9999)}")
+    return sorted(roots)
+
+
+def _tips(rng: random.Random, roots: list[str], per_root: int) -> list[str]:
+    return [f"{r}-{v:02d}" for r in roots for v in range(1, rng.randint(1, per_root) + 1)]
+
+
+def _tarak_grubu(rng: random.Random) -> str:
+    return f"{rng.choice(['60', '67,5', '75', '80', '90'])}/{rng.choice([2, 3, 4])}/{rng.randint(170, 220)}"
+
+
+def _itema_values(rng: random.Random) -> list[Any]:
+    return [str(rng.randint(1, 400)) if rng.random() < 0.9 else None for _ in _ITEMA_SETTINGS]
+
+
+def _usta_defteri_rows(
+    rng: random.Random, start: dt.date, days: int, per_shift: int, tips: list[str], ustalar: list[str],
+    hasil: list[str],
+) -> list[tuple]:
+    weights = [w for _, w in IS_TANIM]
+    names = [n for n, _ in IS_TANIM]
+    rows: list[tuple] = []
+    etiket = 100000
+    for d in range(days):
+        day = start + dt.timedelta(days=d)
+        for label, hour in SHIFTS:
+            for _ in range(max(0, int(rng.gauss(per_shift, per_shift * 0.2)))):
+                minute = rng.randint(0, 8 * 60 - 1)
+                hh, mm = (hour + minute // 60) % 24, minute % 60
+                # 23:00 vardiyasının gece yarısından sonraki kayıtları ertesi güne yazılır
+                tarih = day + dt.timedelta(days=1) if hour == 23 and hh < 7 else day
+                etiket += 1
+                rows.append(
+                    (
+                        tarih.isoformat(),
+                        f"{label}|{hh:02d}:{mm:02d}",
+                        rng.choice(LOOMS),
+                        rng.choice(tips),
+                        f"H{rng.randint(10000, 99999)}",
+                        str(rng.randint(1, 9000)),
+                        str(etiket),
+                        f"D{rng.randint(100000, 999999)}",
+                        round(rng.uniform(200, 4000), 1),
+                        rng.choice(hasil),
+                        rng.choices(names, weights)[0],
+                        _tarak_grubu(rng),
+                        rng.choice(ORGU_TIPLERI),
+                        f"{rng.choice([20, 24, 30, 40])} {rng.choice(['20/1', '30/1', '40/1'])}",
+                        rng.choice(ustalar),
+                        _word(rng, rng.randint(0, 24)) or None,
+                        rng.choice(YAPILAN_ISLEM),
+                    )
+                )
+    return rows
+
+
+# ---------------- snapshot DataFrame'leri (Snapshots tablosu, client save_df_snapshot ile yazar) ----------------
+
+def dinamik_frame(rows: int = 4000, seed: int = 7) -> Any:
+    """Dinamik rapora benzer DataFrame: io_layer.loaders.VISIBLE_COLUMNS + yükleyicinin eklediği iç kolonlar."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    roots = _root_types(rng, 600)
+    yarns = [f"{n} {k}/1 {_word(rng, 2)}" for n in (16, 20, 24, 30, 40) for k in (10, 20, 30)]
+    base = dt.datetime.combine(dt.date.today(), dt.time())
+    termin = [base + dt.timedelta(days=rng.randint(-10, 60)) for _ in range(rows)]
+    tarak = [_tarak_grubu(rng) for _ in range(rows)]
+    return pd.DataFrame(
+        {
+            "Tezgah Numarası": [rng.choice(LOOMS) if rng.random() < 0.3 else "" for _ in range(rows)],
+            "Kök Tip Kodu": [rng.choice(roots) for _ in range(rows)],
+            "Levent No": [str(rng.randint(1, 9000)) for _ in range(rows)],
+            "Levent Etiket FA": [str(rng.randint(100000, 999999)) for _ in range(rows)],
+            "Tarak Grubu": tarak,
+            "Zemin Örgü": [rng.choice(ORGU_TIPLERI) for _ in range(rows)],
+            "Üretim Sipariş No": [f"D{rng.randint(100000, 999999)}" for _ in range(rows)],
+            "Haşıl İş Emri": [f"H{rng.randint(10000, 99999)}" for _ in range(rows)],
+            "Atkı İpliği 1": [rng.choice(yarns) for _ in range(rows)],
+            "Atkı İpliği 2": [rng.choice(yarns) if rng.random() < 0.4 else "" for _ in range(rows)],
+            "Çözgü İpliği 1": [rng.choice(yarns) for _ in range(rows)],
+            "Çözgü İpliği 2": [rng.choice(yarns) if rng.random() < 0.3 else "" for _ in range(rows)],
+            "Parti Metresi": [round(rng.uniform(500, 6000), 1) for _ in range(rows)],
+            "Mamul Termin": termin,
+            "İhzarat Boya Kodu": [rng.choice(["HAM", f"B{rng.randint(100, 999)}"]) for _ in range(rows)],
+            "Süs Kenar": [rng.choice(SELVEDGES) for _ in range(rows)],
+            "NOTLAR": [_word(rng, rng.randint(0, 30)) for _ in range(rows)],
+            "Mamul Tip Kodu": [f"{r}-{rng.randint(1, 6):02d}" for r in (rng.choice(roots) for _ in range(rows))],
+            "(Atkı-1 İşletme Depoları + Atkı-1 İşletme Diğer Depoları)": [
+                round(rng.uniform(0, 20000), 2) for _ in range(rows)
+            ],
+            "(Atkı-2 İşletme Depoları + Atkı-2 İşletme Diğer Depoları)": [
+                round(rng.uniform(0, 8000), 2) for _ in range(rows)
+            ],
+            "Atkı İhtiyaç Miktar 1": [round(rng.uniform(0, 5000), 2) for _ in range(rows)],
+            "Atkı İhtiyaç Miktar 2": [round(rng.uniform(0, 2000), 2) for _ in range(rows)],
+            "Çözgü İpliği 3": ["" for _ in range(rows)],
+            "Çözgü İpliği 4": ["" for _ in range(rows)],
+            "Levent Tipi": [rng.choice(["NORMAL", "ÇİFT", "TEK"]) for _ in range(rows)],
+            "Durum Tanım": [rng.choice(["HAŞILDA", "HAZIR", "TEZGAHTA", "BEKLİYOR"]) for _ in range(rows)],
+            "Levent Haşıl Tarihi": [t - dt.timedelta(days=rng.randint(1, 20)) for t in termin],
+            "_TarakKey": [t.replace(",", ".") for t in tarak],
+            "_DyeCategory": [rng.choice(["HAM", "DENIM"]) for _ in range(rows)],
+        }
+    )
+
+
+def running_frame(seed: int = 11) -> Any:
+    """Running Orders'a benzer DataFrame: tezgah başına bir satır (2201-2518)."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    roots = _root_types(rng, 600)
+    n = len(LOOMS)
+    return pd.DataFrame(
+        {
+            "Tezgah No": LOOMS,
+            "Tip No": [f"{rng.choice(roots)}-{rng.randint(1, 6):02d}" for _ in range(n)],
+            "Durus No": [rng.choice([0, 0, 0, 0, 94, 12, 31]) for _ in range(n)],
+            "Kalan Metre": [round(rng.uniform(0, 4000), 1) for _ in range(n)],
+            "Levent No": [str(rng.randint(1, 9000)) for _ in range(n)],
+            "Tarak Grubu": [_tarak_grubu(rng) for _ in range(n)],
+            "Durum Tanım": [rng.choice(["ÇALIŞIYOR", "DURUŞ", "BİTTİ"]) for _ in range(n)],
+        }
+    )
+
+
+def generate(db: str, months: int, per_shift: int, seed: int) -> dict[str, int]:
+    rng = random.Random(seed)
+    backend = SqliteBackend(db)
+    conn = backend.connect()
+    raw = conn.raw
+
+    roots = _root_types(rng, 600)
+    tips = _tips(rng, roots, 6)
+    ustalar = [f"USTA {_word(rng, 5)}" for _ in range(30)]
+    hasil = [f"HAŞIL {n}" for n in range(1, 41)]
+    days = max(1, months * 30)
+    start = dt.date.today() - dt.timedelta(days=days)
+
+    counts: dict[str, int] = {}
+
+    def insert(table: str, columns: list[str], rows: list[tuple]) -> None:
+        placeholders = ", ".join("?" for _ in columns)
+        raw.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        counts[table] = len(rows)
+
+    try:
+        for table in _SEEDED_TABLES:
+            raw.execute(f"DELETE FROM {table}")
+
+        insert(
+            "UstaDefteri",
+            ["Tarih", "Vardiya", "Tezgah", "KokTip", "HasisNo", "LeventNo", "EtiketNo", "DokumaIsEmri", "Metre",
+             "HasilNo", "IsTanimi", "TarakGrubu", "Orgu", "TipOzellikleri", "IslemYapan", "Aciklama",
+             "YapilanIslem"],
+            _usta_defteri_rows(rng, start, days, per_shift, tips, ustalar, hasil),
+        )
+        insert(
+            "AppLookupValues",
+            ["ListName", "Value", "IsActive", "SortOrder", "CreatedBy"],
+            [("USTA", u, 1, i, "SEED") for i, u in enumerate(ustalar)]
+            + [("HASIL", h, 1, i, "SEED") for i, h in enumerate(hasil)],
+        )
+        insert("BlockedLooms", ["LoomNo"], [(n,) for n in rng.sample(LOOMS, 12)])
+        insert("DummyLooms", ["LoomNo"], [(n,) for n in rng.sample(LOOMS, 6)])
+        insert("LoomCutMap", ["LoomNo", "CutType"], [(n, rng.choice(CUT_TYPES)) for n in LOOMS])
+        insert("TypeSelvedgeMap", ["RootType", "Selvedge"], [(r, rng.choice(SELVEDGES)) for r in roots])
+        insert(
+            "TipBuzulmeModel",
+            ["TipKodu", "GecmisBuzulme", "SistemBuzulme", "GuvenAraligi"],
+            [
+                (t, round(rng.uniform(3, 14), 2), round(rng.uniform(3, 14), 2), round(rng.uniform(0.2, 2.5), 2))
+                for t in tips
+            ],
+        )
+        insert(
+            "ItemaAyar",
+            ["tip", *_ITEMA_SETTINGS, "aciklama", "degisiklik_yapan"],
+            [(t, *_itema_values(rng), None, "SEED") for t in rng.sample(tips, min(150, len(tips)))],
+        )
+
+        makine_rows = []
+        for orgu in ORGU_TIPLERI:
+            for _ in range(60):
+                c1 = rng.choice([16, 20, 24, 30, 40])
+                a1 = rng.choice([16, 20, 24, 30, 40])
+                cs = rng.randint(18, 40)
+                at = rng.randint(15, 35)
+                dk = rng.randint(60, 110)
+                makine_rows.append(
+                    (
+                        orgu, f"{c1 - 2}-{c1 + 2}", f"{a1 - 2}-{a1 + 2}", f"{cs}-{cs + 4}", f"{at}-{at + 3}",
+                        f"{dk}-{dk + 10}", rng.randint(1, 60), *_itema_values(rng),
+                    )
+                )
+        insert(
+            "Makine_Ayar_Tablosu",
+            ["orgu_tipi", "Cozgu1_Aralik", "Atki1_Aralik", "CozguSiklik_Aralik", "AtkiSiklik_Aralik",
+             "Dokunabilirlik_Aralik", "TECRUBE_SAYISI", *_ITEMA_SETTINGS],
+            makine_rows,
+        )
+        conn.commit()
+        raw.execute("ANALYZE")
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="uzmanrapor.sqlite", help="SQLite dosyası (UZMANRAPOR_SQLITE_PATH)")
+    parser.add_argument("--months", type=int, default=6, help="Usta Defteri geçmişi (ay)")
+    parser.add_argument("--per-shift", type=int, default=70, help="vardiya başına ortalama Usta Defteri kaydı")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    counts = generate(args.db, args.months, args.per_shift, args.seed)
+    for table, n in counts.items():
+        print(f"{table:<22}{n:>10}")
+    print(f"{args.db}: {time.perf_counter() - t0:.1f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# main.py ayarları import sırasında okur: testler geçici SQLite dosyası, sabit token ve tek process önbellekle çalışır
+_TMP = tempfile.mkdtemp(prefix="uzmanrapor-test-")
+os.environ.setdefault("UZMANRAPOR_BACKEND", "sqlite")
+os.environ.setdefault("UZMANRAPOR_SQLITE_PATH", os.path.join(_TMP, "api.sqlite"))
+os.environ.setdefault("UZMANRAPOR_API_TOKEN", "test-token")
+os.environ.setdefault("UZMANRAPOR_CACHE_SINGLE_PROCESS", "1")
+os.environ.setdefault("UZMANRAPOR_SLOW_QUERY_MS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOKEN = {"X-Token": os.environ["UZMANRAPOR_API_TOKEN"]}
+
+
+@pytest.fixture(scope="session")
+def api():
+    """Açılış/kapanış (havuz, DB thread'leri) dahil FastAPI test client'ı."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        client.headers.update(TOKEN)
+        yield client
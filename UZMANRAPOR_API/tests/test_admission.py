@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+def _control(**kw):
+    args = dict(
+        capacity=4, heavy_weight=2, cheap_reserve=1, per_client=2, max_queue=8, wait_timeout=1.0, retry_after=3
+    )
+    args.update(kw)
+    return main.AdmissionControl(**args)
+
+
+def test_disabled_admits_everything():
+    async def run():
+        ctl = _control(capacity=0)
+        tickets = [await ctl.acquire("a", True) for _ in range(10)]
+        assert all(t.weight == 0 for t in tickets)
+
+    asyncio.run(run())
+
+
+def test_heavy_leaves_reserve_for_cheap():
+    async def run():
+        ctl = _control(capacity=4, heavy_weight=2, cheap_reserve=1, per_client=4)
+        await ctl.acquire("a", True)  # 2 birim
+        heavy = asyncio.ensure_future(ctl.acquire("b", True))  # 2 + 2 > heavy_limit (3)
+        await asyncio.sleep(0)
+        assert not heavy.done()
+        cheap = await asyncio.wait_for(ctl.acquire("c", False), 0.5)
+        assert cheap.weight == 1
+        assert ctl.stats()["in_use"] == 3
+        heavy.cancel()
+
+    asyncio.run(run())
+
+
+def test_round_robin_between_clients():
+    async def run():
+        ctl = _control(capacity=1, heavy_weight=1, cheap_reserve=0, per_client=1)
+        first = await ctl.acquire("a", False)
+        order = []
+
+        async def req(client, tag):
+            t = await ctl.acquire(client, False)
+            order.append(tag)
+            await asyncio.sleep(0)
+            t.release()
+
+        # "a" kuyruğa üç istek, "b" bir istek koyar; "b" a'nın ikinci isteğinden önce geçmeli
+        tasks = [asyncio.ensure_future(req("a", f"a{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(req("b", "b0")))
+        await asyncio.sleep(0)
+        first.release()
+        await asyncio.gather(*tasks)
+        assert order == ["a0", "b0", "a1", "a2"]
+
+    asyncio.run(run())
+
+
+def test_per_client_limit_lets_other_clients_in():
+    async def run():
+        ctl = _control(capacity=4, per_client=1)
+        await ctl.acquire("a", False)
+        blocked = asyncio.ensure_future(ctl.acquire("a", False))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        other = await asyncio.wait_for(ctl.acquire("b", False), 0.5)
+        assert other.client == "b"
+        blocked.cancel()
+
+    asyncio.run(run())
+
+
+def test_release_is_idempotent():
+    async def run():
+        ctl = _control()
+        t = await ctl.acquire("a", False)
+        t.release()
+        t.release()
+        assert ctl.stats()["in_use"] == 0
+        assert ctl.stats()["active_clients"] == 0
+
+    asyncio.run(run())
+
+
+def test_queue_full_rejects():
+    async def run():
+        ctl = _control(capacity=1, heavy_weight=1, cheap_reserve=0, max_queue=1)
+        await ctl.acquire("a", False)
+        waiting = asyncio.ensure_future(ctl.acquire("b", False))
+        await asyncio.sleep(0)
+        with pytest.raises(main.AdmissionRejected) as exc:
+            await ctl.acquire("c", False)
+        assert exc.value.retry_after == 3
+        assert ctl.stats()["rejected"] == 1
+        waiting.cancel()
+
+    asyncio.run(run())
+
+
+def test_wait_timeout_rejects_and_frees_queue_slot():
+    async def run():
+        ctl = _control(capacity=1, heavy_weight=1, cheap_reserve=0, wait_timeout=0.05)
+        held = await ctl.acquire("a", False)
+        with pytest.raises(main.AdmissionRejected):
+            await ctl.acquire("b", False)
+        st = ctl.stats()
+        assert st["timeouts"] == 1 and st["waiting"] == 0
+        held.release()
+        assert (await ctl.acquire("b", False)).weight == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_units():
+    async def run():
+        ctl = _control(capacity=1, heavy_weight=1, cheap_reserve=0)
+        held = await ctl.acquire("a", False)
+        task = asyncio.ensure_future(ctl.acquire("b", False))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        held.release()
+        st = ctl.stats()
+        assert st["in_use"] == 0 and st["waiting"] == 0
+
+    asyncio.run(run())
+
+
+def test_http_429_with_retry_after(api, monkeypatch):
+    ctl = _control(capacity=1, heavy_weight=1, cheap_reserve=0, max_queue=0, retry_after=7)
+    ctl._grant("someone-else", 1)
+    monkeypatch.setattr(main, "_admission", ctl)
+    r = api.post("/sql", json={"query": "SELECT Id FROM dbo.UstaDefteri WHERE Id = ?", "params": [1]})
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "7"
+
+
+# ---------------- sınıflandırma ----------------
+
+@pytest.mark.parametrize(
+    "query, heavy",
+    [
+        ("SELECT TOP (?) Id FROM dbo.UstaDefteri WHERE Id < ? ORDER BY Id DESC", False),
+        ("SELECT Id FROM dbo.UstaDefteri WHERE Id > ?", False),
+        ("SELECT Id FROM dbo.UstaDefteri WHERE Tezgah <> ?", False),
+        ("SELECT Id FROM dbo.UstaDefteri WHERE Tarih >= ? AND Tarih <= ?", True),
+        ("SELECT COUNT(*) FROM dbo.UstaDefteri WHERE Tezgah = ?", True),
+        ("SELECT Id FROM dbo.UstaDefteri", True),
+        ("SELECT * FROM dbo.AppLookupValues", False),
+        ("UPDATE dbo.UstaDefteri SET Tezgah = ? WHERE Tarih < ?", False),
+        ("EXEC dbo.sp_ItemaOtomatikAyar ?", True),
+    ],
+)
+def test_heavy_classification(query, heavy):
+    assert main._analyze_query(query).heavy is heavy
+
+
+def test_named_query_weight_override():
+    catalog = main._load_catalog()
+    assert catalog["usta_defteri.page"].heavy is False
+    assert catalog["usta_defteri.shift_counts"].heavy is True
@@ -0,0 +1,81 @@
+import pytest
+
+import main
+
+QUERY = "SELECT Id, Tezgah FROM dbo.UstaDefteri WHERE Tezgah = ?"
+
+
+@pytest.fixture(autouse=True)
+def _fixed_bucket(monkeypatch):
+    # ETag zaman dilimi (ETAG_MAX_AGE) test sırasında değişmesin
+    monkeypatch.setattr(main, "ETAG_MAX_AGE", 1e9)
+
+
+def _get(api, etag=None, tezgah="ETAG-1"):
+    headers = {"If-None-Match": etag} if etag else {}
+    return api.post("/sql", json={"query": QUERY, "params": [tezgah]}, headers=headers)
+
+
+def _insert(api, tezgah="ETAG-1"):
+    r = api.post("/sql", json={"query": "INSERT INTO dbo.UstaDefteri (Tezgah) VALUES (?)", "params": [tezgah]})
+    assert r.status_code == 200, r.text
+
+
+def test_matching_etag_returns_304(api):
+    first = _get(api)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    again = _get(api, etag)
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_write_changes_etag(api):
+    etag = _get(api).headers["ETag"]
+    _insert(api)
+    r = _get(api, etag)
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert any(row[1] == "ETAG-1" for row in r.json()["rows"])
+
+
+def test_tx_write_changes_etag(api):
+    etag = _get(api).headers["ETag"]
+    r = api.post(
+        "/sql/tx",
+        json={"statements": [{"query": "UPDATE dbo.UstaDefteri SET Metre = ? WHERE Tezgah = ?", "params": [1, "x"]}]},
+    )
+    assert r.status_code == 200, r.text
+    assert _get(api, etag).status_code == 200
+
+
+def test_other_table_write_keeps_etag(api):
+    etag = _get(api).headers["ETag"]
+    r = api.post(
+        "/sql",
+        json={"query": "INSERT INTO dbo.AppLookupValues (ListName, Value) VALUES (?, ?)", "params": ["etag", "v"]},
+    )
+    assert r.status_code == 200, r.text
+    assert _get(api, etag).status_code == 304
+
+
+def test_etag_depends_on_params_and_format():
+    key = main._cache_key(QUERY, ["a"], False)
+    assert main._etag(key, (1,)) != main._etag(main._cache_key(QUERY, ["b"], False), (1,))
+    assert main._etag(key, (1,)) != main._etag(main._cache_key(QUERY, ["a"], True), (1,))
+    assert main._etag(key, (1,)) != main._etag(key, (2,))
+    # boşluk farkı aynı anahtar
+    assert main._cache_key("SELECT  Id\n FROM dbo.X", [], False) == main._cache_key("SELECT Id FROM dbo.X", [], False)
+
+
+def test_if_none_match_parsing():
+    etag = 'W/"abc"'
+    assert main._etag_matches('W/"abc"', etag)
+    assert main._etag_matches('"x", W/"abc"', etag)
+    assert main._etag_matches('"abc"', etag)
+    assert main._etag_matches("*", etag)
+    assert not main._etag_matches('W/"abd"', etag)
+    assert not main._etag_matches(None, etag)
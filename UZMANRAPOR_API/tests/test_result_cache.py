@@ -0,0 +1,109 @@
+import time
+
+import main
+
+LOOKUP = "SELECT Value FROM dbo.AppLookupValues WHERE ListName = ? ORDER BY Value"
+
+
+def _cache(max_entries=4, ttl=60.0):
+    versions = main.TableVersions()
+    return versions, main.ResultCache(versions, {"AppLookupValues", "LoomCutMap"}, max_entries, ttl)
+
+
+# ---------------- TableVersions / ResultCache ----------------
+
+def test_bump_invalidates_entry():
+    versions, cache = _cache()
+    tables = frozenset({"applookupvalues"})
+    v0 = versions.snapshot(tables)
+    cache.put("k", tables, v0, "old")
+    assert cache.get("k", versions.snapshot(tables)) == "old"
+    versions.bump(tables, set())
+    assert cache.get("k", versions.snapshot(tables)) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_unknown_write_bumps_every_known_table():
+    versions, _ = _cache()
+    before = versions.snapshot(frozenset({"applookupvalues", "loomcutmap"}))
+    versions.bump(None, {"applookupvalues", "loomcutmap"})
+    assert versions.snapshot(frozenset({"applookupvalues", "loomcutmap"})) == tuple(v + 1 for v in before)
+
+
+def test_write_during_read_is_not_cached():
+    # sürüm sorgudan önce alınır; okuma sürerken gelen yazım eski sonucu önbelleğe sokamaz
+    versions, cache = _cache()
+    tables = frozenset({"applookupvalues"})
+    v0 = versions.snapshot(tables)
+    versions.bump(tables, set())
+    cache.put("k", tables, v0, "read-before-write")
+    assert cache.stats()["stores"] == 0
+    assert cache.get("k", versions.snapshot(tables)) is None
+
+
+def test_only_whitelisted_tables_are_cacheable():
+    _, cache = _cache()
+    assert cache.cacheable(frozenset({"applookupvalues"}))
+    assert not cache.cacheable(frozenset({"applookupvalues", "ustadefteri"}))
+    assert not cache.cacheable(frozenset())
+
+
+def test_lru_eviction_and_ttl():
+    versions, cache = _cache(max_entries=2)
+    t = frozenset({"loomcutmap"})
+    v = versions.snapshot(t)
+    for k in "abc":
+        cache.put(k, t, v, k)
+    assert cache.get("a", v) is None and cache.get("c", v) == "c"
+    assert cache.stats()["evictions"] == 1
+
+    versions, cache = _cache(ttl=0.001)
+    cache.put("k", t, v, "x")
+    time.sleep(0.01)
+    assert cache.get("k", v) is None
+
+
+# ---------------- uçtan uca (/sql yazımları önbelleği geçersiz kılar) ----------------
+
+def _values(api, list_name):
+    r = api.post("/sql", json={"query": LOOKUP, "params": [list_name]})
+    assert r.status_code == 200, r.text
+    return [row[0] for row in r.json()["rows"]]
+
+
+def test_insert_through_api_invalidates_cached_select(api):
+    assert _values(api, "rc-test") == []
+    hits = main._result_cache.stats()["hits"]
+    assert _values(api, "rc-test") == []
+    assert main._result_cache.stats()["hits"] == hits + 1
+
+    r = api.post(
+        "/sql",
+        json={"query": "INSERT INTO dbo.AppLookupValues (ListName, Value) VALUES (?, ?)", "params": ["rc-test", "A"]},
+    )
+    assert r.status_code == 200, r.text
+    assert _values(api, "rc-test") == ["A"]
+
+
+def test_batch_and_tx_writes_invalidate(api):
+    assert _values(api, "rc-batch") == []
+    r = api.post(
+        "/sql/batch",
+        json={
+            "query": "INSERT INTO dbo.AppLookupValues (ListName, Value) VALUES (?, ?)",
+            "params_list": [["rc-batch", "B1"], ["rc-batch", "B2"]],
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert _values(api, "rc-batch") == ["B1", "B2"]
+
+    r = api.post(
+        "/sql/tx",
+        json={
+            "statements": [
+                {"query": "DELETE FROM dbo.AppLookupValues WHERE ListName = ? AND Value = ?", "params": ["rc-batch", "B1"]},
+            ]
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert _values(api, "rc-batch") == ["B2"]
@@ -0,0 +1,126 @@
+import datetime as dt
+
+import pytest
+
+import backends
+from backends import translate_sql
+from queries import NAMED_QUERIES
+
+
+# ---------------- translate_sql ----------------
+
+def test_top_parameter_moves_to_limit():
+    sql, top_param = translate_sql("SELECT TOP (?) Id FROM dbo.UstaDefteri WHERE Id < ? ORDER BY Id DESC")
+    assert sql == "SELECT Id FROM UstaDefteri WHERE Id < ? ORDER BY Id DESC LIMIT ?"
+    assert top_param == 0
+
+
+@pytest.mark.parametrize("top", ["TOP 5", "TOP (5)", "TOP(5)"])
+def test_top_literal(top):
+    sql, top_param = translate_sql(f"SELECT {top} Id FROM dbo.UstaDefteri;")
+    assert sql == "SELECT Id FROM UstaDefteri LIMIT 5"
+    assert top_param == -1
+
+
+def test_top_parameter_index_counts_earlier_placeholders():
+    # TOP'tan önce parametre yok; DISTINCT korunur
+    sql, top_param = translate_sql("SELECT DISTINCT TOP (?) Tezgah FROM dbo.UstaDefteri")
+    assert sql == "SELECT DISTINCT Tezgah FROM UstaDefteri LIMIT ?"
+    assert top_param == 0
+
+
+def test_move_param_puts_top_value_last():
+    assert backends._move_param([10, 99], 0) == [99, 10]
+    assert backends._move_param([10, 99], -1) == [10, 99]
+
+
+@pytest.mark.parametrize(
+    "style, expected",
+    [
+        ("104", "strftime('%d.%m.%Y', Tarih)"),
+        ("103", "strftime('%d/%m/%Y', Tarih)"),
+        ("120", "strftime('%Y-%m-%d %H:%M:%S', Tarih)"),
+        ("999", "CAST(Tarih AS TEXT)"),
+    ],
+)
+def test_convert_styles(style, expected):
+    sql, _ = translate_sql(f"SELECT CONVERT(varchar(10), Tarih, {style}) AS T FROM dbo.UstaDefteri")
+    assert sql == f"SELECT {expected} AS T FROM UstaDefteri"
+
+
+def test_object_prefixes_and_functions():
+    sql, _ = translate_sql(
+        "SELECT LEFT(Vardiya, 7), SUBSTRING(Vardiya, 9, 2), LEN(Tezgah), ISNULL(Metre, 0), SYSDATETIME() "
+        "FROM [UzmanRaporDB].[dbo].[UstaDefteri] WHERE Aciklama = N'x'"
+    )
+    assert "dbo" not in sql and "UzmanRaporDB" not in sql
+    assert "substr(Vardiya, 1, 7)" in sql
+    assert "substr(Vardiya, 9, 2)" in sql
+    assert "length(Tezgah)" in sql and "ifnull(Metre, 0)" in sql
+    assert "'localtime'" in sql
+    assert sql.endswith("Aciklama = 'x'")
+
+
+def test_named_queries_translate_and_run(tmp_path):
+    conn = backends.SqliteBackend(str(tmp_path / "t.db")).connect()
+    try:
+        for query in NAMED_QUERIES.values():
+            sql, _ = translate_sql(query)
+            conn.raw.execute("EXPLAIN " + sql, [None] * sql.count("?"))
+    finally:
+        conn.close()
+
+
+# ---------------- SqliteBackend ----------------
+
+@pytest.fixture
+def conn(tmp_path):
+    c = backends.SqliteBackend(str(tmp_path / "t.db")).connect()
+    cur = c.cursor()
+    cur.executemany(
+        "INSERT INTO dbo.UstaDefteri (Tarih, Tezgah) VALUES (?, ?)",
+        [(dt.date(2024, 1, 1) + dt.timedelta(days=i % 10), f"T{i}") for i in range(100)],
+    )
+    c.commit()
+    yield c
+    c.close()
+
+
+def test_keyset_page_runs_with_top_parameter(conn):
+    cur = conn.cursor()
+    cur.execute(NAMED_QUERIES["usta_defteri.page"], [5, 50])
+    rows = cur.fetchall()
+    assert [r[0] for r in rows] == [49, 48, 47, 46, 45]
+    assert rows[0][1] == "09.01.2024"  # CONVERT(..., 104)
+
+
+def test_fetchmany_beyond_probe_rows(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT Id FROM dbo.UstaDefteri ORDER BY Id")
+    seen = []
+    while True:
+        batch = cur.fetchmany(30)
+        if not batch:
+            break
+        seen.extend(r[0] for r in batch)
+    assert seen == list(range(1, 101))
+
+
+def test_description_reports_python_types(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT Id, Tarih, Tezgah FROM dbo.UstaDefteri WHERE Id = ?", [1])
+    assert [d[1] for d in cur.description] == [int, dt.date, str]
+
+
+def test_timeout_interrupts_long_query(conn):
+    conn.timeout = 0.05
+    cur = conn.cursor()
+    with pytest.raises(Exception, match="interrupt"):
+        cur.execute(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT count(*) FROM n"
+        )
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        backends.Backend()
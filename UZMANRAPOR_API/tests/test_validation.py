@@ -0,0 +1,107 @@
+import pytest
+from fastapi import HTTPException
+
+import main
+
+
+# ---------------- _mask_sql ----------------
+
+def test_mask_replaces_string_literals():
+    assert main._mask_sql("SELECT 'drop table x' AS a") == "SELECT '' AS a"
+
+
+def test_mask_handles_escaped_quotes():
+    assert main._mask_sql("SELECT 'it''s; exec' AS a") == "SELECT '' AS a"
+
+
+def test_mask_blanks_line_comments():
+    assert main._mask_sql("SELECT 1 -- drop\nFROM dbo.UstaDefteri") == "SELECT 1  \nFROM dbo.UstaDefteri"
+
+
+def test_mask_blanks_nested_block_comments():
+    masked = main._mask_sql("SELECT /* a /* drop */ still comment */ 1")
+    assert "drop" not in masked and "comment" not in masked
+    assert masked.split() == ["SELECT", "1"]
+
+
+def test_mask_keeps_bracketed_identifiers():
+    assert main._mask_sql("SELECT [it's] FROM [dbo].[UstaDefteri]") == "SELECT [it's] FROM [dbo].[UstaDefteri]"
+
+
+def test_mask_joins_spaced_dots():
+    assert main._mask_sql("SELECT * FROM dbo . AppUsers") == "SELECT * FROM dbo.AppUsers"
+    assert main._mask_sql("SELECT * FROM dbo./**/AppUsers") == "SELECT * FROM dbo.AppUsers"
+
+
+@pytest.mark.parametrize("query", ["SELECT 'abc", "SELECT /* a /* b */ 1", "SELECT [abc"])
+def test_mask_rejects_unterminated(query):
+    with pytest.raises(ValueError):
+        main._mask_sql(query)
+
+
+# ---------------- whitelist ----------------
+
+def _verdict(query):
+    info = main._analyze_query(query)
+    return info.error[0] if info.error else "ok"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM dbo.UstaDefteri WHERE Aciklama = 'drop; exec xp_cmdshell'",
+        "SELECT * FROM dbo.UstaDefteri -- begin end",
+        "SELECT * FROM dbo.UstaDefteri /* declare /* create */ x */",
+        "SELECT * FROM [dbo].[UstaDefteri]",
+        "INSERT INTO dbo.UstaDefteri (Aciklama) VALUES ('if; while')",
+        "EXEC dbo.sp_ItemaOtomatikAyar ?",
+    ],
+)
+def test_allowed(query):
+    assert _verdict(query) == "ok"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "DROP TABLE dbo.UstaDefteri",
+        "SELECT * FROM dbo.UstaDefteri; DELETE FROM dbo.UstaDefteri",
+        "SELECT * FROM dbo.Secrets",
+        "SELECT * FROM dbo . Secrets",
+        "SELECT * FROM dbo./* x */Secrets",
+        "SELECT * FROM [dbo] . [Secrets]",
+        "EXEC dbo.sp_Other",
+        "TRUNCATE TABLE dbo.UstaDefteri",
+    ],
+)
+def test_rejected(query):
+    assert _verdict(query) == 403
+
+
+def test_comment_cannot_hide_second_statement():
+    # yorum içindeki ';' kabul edilir, dışındaki reddedilir
+    assert _verdict("SELECT * FROM dbo.UstaDefteri /* ; */") == "ok"
+    assert _verdict("SELECT * FROM dbo.UstaDefteri /* x */ ; DROP TABLE dbo.UstaDefteri") == 403
+
+
+def test_tables_are_collected():
+    info = main._analyze_query("SELECT * FROM dbo.UstaDefteri u JOIN [dbo].[AppUsers] a ON a.Id = u.Id")
+    assert info.tables == frozenset({"ustadefteri", "appusers"})
+
+
+def test_unqualified_reference_has_unknown_tables():
+    info = main._analyze_query("WITH x AS (SELECT * FROM dbo.UstaDefteri) SELECT * FROM x")
+    assert info.error is None and info.tables is None
+
+
+def test_validate_query_raises_http_error():
+    with pytest.raises(HTTPException) as exc:
+        main._validate_query("SELECT * FROM dbo.Secrets")
+    assert exc.value.status_code == 403
+
+
+def test_validation_cache_returns_same_verdict():
+    cache = main._ValidationCache(4)
+    first = cache.get("SELECT * FROM dbo.AppUsers")
+    assert cache.get("SELECT * FROM dbo.AppUsers") is first
+    assert cache.stats()["hits"] == 1